@@ -1,3 +1,7 @@
-from modules.csvclean.core.clean import clean_csv_text, parse_output_delimiter
+from modules.csvclean.core.clean import (
+    clean_csv_stream,
+    clean_csv_text,
+    parse_output_delimiter,
+)
 
-__all__ = ["clean_csv_text", "parse_output_delimiter"]
+__all__ = ["clean_csv_stream", "clean_csv_text", "parse_output_delimiter"]
@@ -2,28 +2,10 @@ from __future__ import annotations
 
 import csv
 import io
-from typing import Dict, Tuple
+from typing import Any, Dict, Tuple
 
+from modules.sparky_core.core.csv_stream import CsvSource, open_csv
 
-def _default_dialect() -> csv.Dialect:
-    class Default(csv.Dialect):
-        delimiter = ","
-        quotechar = '"'
-        escapechar = None
-        doublequote = True
-        skipinitialspace = False
-        lineterminator = "\n"
-        quoting = csv.QUOTE_MINIMAL
-
-    return Default()
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _default_dialect()
 
 
 DELIMITER_MAP: Dict[str, str | None] = {
@@ -44,19 +26,19 @@ def parse_output_delimiter(value: str | None) -> Tuple[str | None, str | None]:
     return DELIMITER_MAP[key], None
 
 
-def clean_csv_text(
-    raw_text: str,
+def clean_csv_stream(
+    raw_text: CsvSource,
+    output: Any,
     *,
     trim_cells: bool = True,
     remove_empty_rows: bool = True,
     output_delimiter: str | None = None,
-) -> Tuple[str, int, int, str | None]:
-    if not raw_text.strip():
-        return "", 0, 0, "CSV is empty."
+) -> Tuple[int, int, str | None]:
+    table, error = open_csv(raw_text)
+    if error or table is None:
+        return 0, 0, error
 
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    output = io.StringIO()
+    dialect = table.dialect
     delimiter = output_delimiter or dialect.delimiter
     writer = csv.writer(
         output,
@@ -71,7 +53,7 @@ def clean_csv_text(
     kept = 0
     removed = 0
 
-    for row in reader:
+    for row in table.rows:
         if not row:
             if remove_empty_rows:
                 removed += 1
@@ -88,7 +70,27 @@ def clean_csv_text(
         writer.writerow(cleaned)
         kept += 1
 
-    if not output.getvalue():
-        return "", 0, 0, "CSV is empty or invalid."
+    if not kept:
+        return 0, 0, "CSV is empty or invalid."
+
+    return kept, removed, None
 
+
+def clean_csv_text(
+    raw_text: CsvSource,
+    *,
+    trim_cells: bool = True,
+    remove_empty_rows: bool = True,
+    output_delimiter: str | None = None,
+) -> Tuple[str, int, int, str | None]:
+    output = io.StringIO()
+    kept, removed, error = clean_csv_stream(
+        raw_text,
+        output,
+        trim_cells=trim_cells,
+        remove_empty_rows=remove_empty_rows,
+        output_delimiter=output_delimiter,
+    )
+    if error:
+        return "", 0, 0, error
     return output.getvalue(), kept, removed, None
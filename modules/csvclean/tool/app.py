@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import io
 import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from modules.csvclean.core.clean import clean_csv_text, parse_output_delimiter
+from modules.csvclean.core.clean import clean_csv_stream, parse_output_delimiter
+from modules.sparky_core.core.uploads import SpooledOutput, read_chunks
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
 from universe.ads import attach_ads_globals
@@ -57,15 +58,17 @@ async def clean_csv(
     if error:
         return JSONResponse({"error": error}, status_code=400)
 
-    raw_bytes = await file.read()
-    raw_text = raw_bytes.decode("utf-8", errors="replace")
-    output_text, kept, removed, error = clean_csv_text(
-        raw_text,
+    output = SpooledOutput()
+    kept, removed, error = await run_in_threadpool(
+        clean_csv_stream,
+        read_chunks(file.file),
+        output,
         trim_cells=trim_cells,
         remove_empty_rows=remove_empty_rows,
         output_delimiter=output_delimiter,
     )
     if error:
+        output.close()
         return JSONResponse({"error": error}, status_code=400)
 
     headers = {
@@ -74,7 +77,7 @@ async def clean_csv(
         "X-Removed-Count": str(removed),
     }
     return StreamingResponse(
-        io.BytesIO(output_text.encode("utf-8")),
+        output.chunks(),
         media_type="text/csv",
         headers=headers,
     )
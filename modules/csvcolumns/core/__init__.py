@@ -1,3 +1,7 @@
-from modules.csvcolumns.core.extract import extract_csv_text, parse_column_indexes
+from modules.csvcolumns.core.extract import (
+    extract_csv_stream,
+    extract_csv_text,
+    parse_column_indexes,
+)
 
-__all__ = ["extract_csv_text", "parse_column_indexes"]
+__all__ = ["extract_csv_stream", "extract_csv_text", "parse_column_indexes"]
@@ -2,25 +2,9 @@ from __future__ import annotations
 
 import csv
 import io
-from typing import Iterable, List, Tuple
+from typing import Any, Iterable, List, Tuple
 
-
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
+from modules.sparky_core.core.csv_stream import CsvSource, non_blank, open_csv
 
 
 def parse_column_indexes(raw: str | None) -> Tuple[List[int] | None, str | None]:
@@ -56,27 +40,23 @@ def _pick_columns(row: Iterable[str], indexes: List[int]) -> List[str]:
     return [row_list[index] if index < len(row_list) else "" for index in indexes]
 
 
-def extract_csv_text(
-    raw_text: str,
+def extract_csv_stream(
+    raw_text: CsvSource,
+    output: Any,
     *,
     columns: List[int],
     has_header: bool = False,
-) -> Tuple[str, int, str | None]:
-    if not raw_text.strip():
-        return "", 0, "CSV is empty."
+) -> Tuple[int, str | None]:
+    table, error = open_csv(raw_text)
+    if error or table is None:
+        return 0, error
 
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=dialect.delimiter, lineterminator="\n")
+    writer = csv.writer(output, delimiter=table.dialect.delimiter, lineterminator="\n")
 
     extracted = 0
     header_written = False
 
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-
+    for row in non_blank(table.rows):
         if has_header and not header_written:
             writer.writerow(_pick_columns(row, columns))
             header_written = True
@@ -85,7 +65,22 @@ def extract_csv_text(
         writer.writerow(_pick_columns(row, columns))
         extracted += 1
 
-    if not output.getvalue():
-        return "", 0, "CSV is empty or invalid."
+    if not header_written and not extracted:
+        return 0, "CSV is empty or invalid."
 
+    return extracted, None
+
+
+def extract_csv_text(
+    raw_text: CsvSource,
+    *,
+    columns: List[int],
+    has_header: bool = False,
+) -> Tuple[str, int, str | None]:
+    output = io.StringIO()
+    extracted, error = extract_csv_stream(
+        raw_text, output, columns=columns, has_header=has_header
+    )
+    if error:
+        return "", 0, error
     return output.getvalue(), extracted, None
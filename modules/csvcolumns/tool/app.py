@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import io
 import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from modules.csvcolumns.core.extract import extract_csv_text, parse_column_indexes
+from modules.csvcolumns.core.extract import extract_csv_stream, parse_column_indexes
+from modules.sparky_core.core.uploads import SpooledOutput, read_chunks
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
 from universe.ads import attach_ads_globals
@@ -56,12 +57,16 @@ async def extract_columns(
     if error:
         return JSONResponse({"error": error}, status_code=400)
 
-    raw_bytes = await file.read()
-    raw_text = raw_bytes.decode("utf-8", errors="replace")
-    output_text, extracted, error = extract_csv_text(
-        raw_text, columns=column_indexes, has_header=has_header
+    output = SpooledOutput()
+    extracted, error = await run_in_threadpool(
+        extract_csv_stream,
+        read_chunks(file.file),
+        output,
+        columns=column_indexes,
+        has_header=has_header,
     )
     if error:
+        output.close()
         return JSONResponse({"error": error}, status_code=400)
 
     headers = {
@@ -70,7 +75,7 @@ async def extract_columns(
         "X-Column-Count": str(len(column_indexes)),
     }
     return StreamingResponse(
-        io.BytesIO(output_text.encode("utf-8")),
+        output.chunks(),
         media_type="text/csv",
         headers=headers,
     )
@@ -1,3 +1,7 @@
-from modules.csvdedupe.core.dedupe import dedupe_csv_text, parse_column_indexes
+from modules.csvdedupe.core.dedupe import (
+    dedupe_csv_stream,
+    dedupe_csv_text,
+    parse_column_indexes,
+)
 
-__all__ = ["dedupe_csv_text", "parse_column_indexes"]
+__all__ = ["dedupe_csv_stream", "dedupe_csv_text", "parse_column_indexes"]
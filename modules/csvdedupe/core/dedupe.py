@@ -2,25 +2,17 @@ from __future__ import annotations
 
 import csv
 import io
-from typing import Iterable, List, Tuple
+import itertools
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
 
-
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
+from modules.sparky_core.core.csv_stream import CsvSource, non_blank, open_csv
+from modules.sparky_core.core.fingerprints import (
+    DedupeStats,
+    cells_fingerprint,
+    dedupe_stream,
+    fingerprint_bits,
+    normalizer,
+)
 
 
 def parse_column_indexes(raw: str | None) -> Tuple[List[int] | None, str | None]:
@@ -56,44 +48,94 @@ def _row_key(row: Iterable[str], indexes: List[int] | None) -> Tuple[str, ...]:
     return tuple(key)
 
 
-def dedupe_csv_text(
-    raw_text: str,
+def _rewind(source: CsvSource) -> Callable[[], Iterator[List[str]]] | None:
+    # A second read is only possible for pasted text and seekable uploads.
+    if isinstance(source, (str, bytes, bytearray)):
+        seekable = None
+    elif hasattr(source, "seek"):
+        seekable = source
+    else:
+        return None
+
+    def reopen() -> Iterator[List[str]]:
+        if seekable is not None:
+            seekable.seek(0)
+        table, _ = open_csv(source)
+        return non_blank(table.rows) if table is not None else iter(())
+
+    return reopen
+
+
+def dedupe_csv_stream(
+    raw_text: CsvSource,
+    output: Any,
     *,
     columns: List[int] | None = None,
     has_header: bool = False,
-) -> Tuple[str, int, int, str | None]:
-    if not raw_text.strip():
-        return "", 0, 0, "CSV is empty."
+    ignore_case: bool = False,
+    trim_whitespace: bool = False,
+    normalize_unicode: bool = False,
+) -> Tuple[int, int, str | None]:
+    table, error = open_csv(raw_text)
+    if error or table is None:
+        return 0, 0, error
 
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=dialect.delimiter, lineterminator="\n")
+    writer = csv.writer(output, delimiter=table.dialect.delimiter, lineterminator="\n")
 
-    seen: set[Tuple[str, ...]] = set()
-    removed = 0
-    total = 0
+    rows = non_blank(table.rows)
     header_written = False
-
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-
-        if has_header and not header_written:
-            writer.writerow(row)
+    if has_header:
+        header = next(rows, None)
+        if header is not None:
+            writer.writerow(header)
             header_written = True
-            continue
 
+    normalize = normalizer(ignore_case=ignore_case, trim=trim_whitespace, unicode=normalize_unicode)
+    bits = fingerprint_bits()
+
+    def fingerprint(row: List[str]) -> int:
         key = _row_key(row, columns)
-        if key in seen:
-            removed += 1
-            continue
+        if normalize is not None:
+            key = tuple(map(normalize, key))
+        return cells_fingerprint(key, bits)
+
+    reopen = _rewind(raw_text)
+    skip = 1 if header_written else 0
+    stats = DedupeStats()
+    writer.writerows(
+        dedupe_stream(
+            rows,
+            fingerprint,
+            reopen=(lambda: itertools.islice(reopen(), skip, None)) if reopen else None,
+            stats=stats,
+        )
+    )
+
+    if not header_written and not stats.kept:
+        return 0, 0, "CSV is empty or invalid."
 
-        seen.add(key)
-        writer.writerow(row)
-        total += 1
+    return stats.removed, stats.kept, None
 
-    if not output.getvalue():
-        return "", 0, 0, "CSV is empty or invalid."
 
+def dedupe_csv_text(
+    raw_text: CsvSource,
+    *,
+    columns: List[int] | None = None,
+    has_header: bool = False,
+    ignore_case: bool = False,
+    trim_whitespace: bool = False,
+    normalize_unicode: bool = False,
+) -> Tuple[str, int, int, str | None]:
+    output = io.StringIO()
+    removed, total, error = dedupe_csv_stream(
+        raw_text,
+        output,
+        columns=columns,
+        has_header=has_header,
+        ignore_case=ignore_case,
+        trim_whitespace=trim_whitespace,
+        normalize_unicode=normalize_unicode,
+    )
+    if error:
+        return "", 0, 0, error
     return output.getvalue(), removed, total, None
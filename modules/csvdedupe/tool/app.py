@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import io
 import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from modules.csvdedupe.core.dedupe import dedupe_csv_text, parse_column_indexes
+from modules.csvdedupe.core.dedupe import dedupe_csv_stream, parse_column_indexes
+from modules.sparky_core.core.uploads import SpooledOutput
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
 from universe.ads import attach_ads_globals
@@ -48,6 +49,9 @@ async def dedupe_csv(
     file: UploadFile | None = File(None),
     columns: str | None = Form(None),
     has_header: bool = Form(False),
+    ignore_case: bool = Form(False),
+    trim_whitespace: bool = Form(False),
+    normalize_unicode: bool = Form(False),
 ):
     if not file:
         return JSONResponse({"error": "Upload a CSV file."}, status_code=400)
@@ -56,12 +60,19 @@ async def dedupe_csv(
     if error:
         return JSONResponse({"error": error}, status_code=400)
 
-    raw_bytes = await file.read()
-    raw_text = raw_bytes.decode("utf-8", errors="replace")
-    output_text, removed, total, error = dedupe_csv_text(
-        raw_text, columns=column_indexes, has_header=has_header
+    output = SpooledOutput()
+    removed, total, error = await run_in_threadpool(
+        dedupe_csv_stream,
+        file.file,
+        output,
+        columns=column_indexes,
+        has_header=has_header,
+        ignore_case=ignore_case,
+        trim_whitespace=trim_whitespace,
+        normalize_unicode=normalize_unicode,
     )
     if error:
+        output.close()
         return JSONResponse({"error": error}, status_code=400)
 
     headers = {
@@ -70,7 +81,7 @@ async def dedupe_csv(
         "X-Row-Count": str(total),
     }
     return StreamingResponse(
-        io.BytesIO(output_text.encode("utf-8")),
+        output.chunks(),
         media_type="text/csv",
         headers=headers,
     )
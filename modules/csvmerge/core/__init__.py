@@ -1,3 +1,8 @@
-from modules.csvmerge.core.merge import merge_csv_text, parse_column_index
+from modules.csvmerge.core.merge import (
+    merge_csv_stream,
+    merge_csv_text,
+    parse_column_index,
+    parse_column_indexes,
+)
 
-__all__ = ["merge_csv_text", "parse_column_index"]
+__all__ = ["merge_csv_stream", "merge_csv_text", "parse_column_index", "parse_column_indexes"]
@@ -2,25 +2,11 @@ from __future__ import annotations
 
 import csv
 import io
-from typing import Dict, List, Tuple
+import itertools
+from typing import Any, Iterator, List, Tuple
 
-
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
+from modules.sparky_core.core.csv_stream import CsvSource, non_blank, open_csv
+from modules.sparky_core.core.joins import JOIN_TYPES, JoinStats, hash_join, pick_build
 
 
 def parse_column_index(raw: str | None, *, label: str) -> Tuple[int | None, str | None]:
@@ -35,86 +21,150 @@ def parse_column_index(raw: str | None, *, label: str) -> Tuple[int | None, str
     return index - 1, None
 
 
-def _read_rows(raw_text: str) -> Tuple[List[List[str]], csv.Dialect, str | None]:
-    if not raw_text.strip():
-        return [], _DefaultDialect(), "CSV is empty."
+def _read_rows(raw_text: CsvSource) -> Tuple[Iterator[List[str]], Any, str | None]:
+    table, error = open_csv(raw_text)
+    if error or table is None:
+        return iter(()), None, error
 
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    rows = [row for row in reader if row and any(cell.strip() for cell in row)]
-    if not rows:
-        return [], dialect, "CSV is empty or invalid."
-    return rows, dialect, None
+    rows = non_blank(table.rows)
+    first = next(rows, None)
+    if first is None:
+        return iter(()), table.dialect, "CSV is empty or invalid."
+    return itertools.chain([first], rows), table.dialect, None
 
 
-def _build_lookup(
-    rows: List[List[str]],
-    *,
-    key_index: int,
-    has_header: bool,
-) -> Tuple[Dict[str, List[str]], List[str] | None]:
-    start = 1 if has_header else 0
-    lookup: Dict[str, List[str]] = {}
-    for row in rows[start:]:
-        key = row[key_index] if key_index < len(row) else ""
-        if key not in lookup:
-            lookup[key] = row
-    header = rows[0] if has_header and rows else None
-    return lookup, header
+def parse_column_indexes(raw: str | None, *, label: str) -> Tuple[List[int] | None, str | None]:
+    # "1" or a composite key such as "1,3".
+    if not raw or not raw.strip():
+        return None, f"{label} key column is required."
+    indexes: List[int] = []
+    for part in raw.split(","):
+        index, error = parse_column_index(part, label=label)
+        if error or index is None:
+            return None, error
+        indexes.append(index)
+    return indexes, None
 
 
-def merge_csv_text(
-    left_text: str,
-    right_text: str,
+def _pad(row: List[str], width: int) -> List[str]:
+    return row + [""] * (width - len(row)) if len(row) < width else row
+
+
+def _first_width(rows: Iterator[List[str]]) -> Tuple[Iterator[List[str]], int]:
+    first = next(rows, None)
+    if first is None:
+        return rows, 0
+    return itertools.chain([first], rows), len(first)
+
+
+def merge_csv_stream(
+    left_text: CsvSource,
+    right_text: CsvSource,
+    output: Any,
     *,
-    left_key: int,
-    right_key: int,
+    left_key: int | List[int],
+    right_key: int | List[int],
     has_headers: bool = False,
-) -> Tuple[str, int, int, str | None]:
+    how: str = "inner",
+) -> Tuple[int, int, str | None]:
+    left_columns = [left_key] if isinstance(left_key, int) else list(left_key)
+    right_columns = [right_key] if isinstance(right_key, int) else list(right_key)
+    if len(left_columns) != len(right_columns):
+        return 0, 0, "Left and right keys must have the same number of columns."
+    if how not in JOIN_TYPES:
+        return 0, 0, f"Join type must be one of: {', '.join(JOIN_TYPES)}."
+
+    build = pick_build(left_text, right_text)
     left_rows, left_dialect, error = _read_rows(left_text)
     if error:
-        return "", 0, 0, f"Left CSV: {error}"
+        return 0, 0, f"Left CSV: {error}"
 
     right_rows, right_dialect, error = _read_rows(right_text)
     if error:
-        return "", 0, 0, f"Right CSV: {error}"
+        return 0, 0, f"Right CSV: {error}"
+
+    right_header = next(right_rows, None) if has_headers else None
+    left_header = next(left_rows, None) if has_headers else None
+    # Outer rows are padded to a width fixed before any row is written: the
+    # header's, or the first row's without headers. Matched rows are written
+    # as they are, so a row's cells never shift with what came before it.
+    if left_header:
+        left_width = len(left_header)
+    else:
+        left_rows, left_width = _first_width(left_rows)
+    if right_header:
+        right_width = len(right_header)
+    else:
+        right_rows, right_width = _first_width(right_rows)
 
-    left_lookup, left_header = _build_lookup(
-        left_rows, key_index=left_key, has_header=has_headers
-    )
-    right_lookup, right_header = _build_lookup(
-        right_rows, key_index=right_key, has_header=has_headers
-    )
-
-    output = io.StringIO()
     writer = csv.writer(output, delimiter=left_dialect.delimiter, lineterminator="\n")
+    dropped = set(right_columns)
+
+    def right_cells(row: List[str]) -> List[str]:
+        return [cell for idx, cell in enumerate(row) if idx not in dropped]
+
+    right_blank = [""] * sum(1 for idx in range(right_width) if idx not in dropped)
+    stats = JoinStats()
 
+    header_written = False
     if has_headers and left_header:
         merged_header = left_header
-        if right_header:
-            merged_header = left_header + [
-                col for idx, col in enumerate(right_header) if idx != right_key
-            ]
+        if right_header and how != "anti":
+            merged_header = left_header + right_cells(right_header)
         writer.writerow(merged_header)
+        header_written = True
+
+    written = 0
+    for left_row, right_row in hash_join(
+        left_rows,
+        right_rows,
+        left_key=left_columns,
+        right_key=right_columns,
+        how=how,
+        build=build,
+        stats=stats,
+    ):
+        if how == "anti":
+            merged_row = left_row
+        elif right_row is None:
+            merged_row = _pad(left_row, left_width) + right_blank
+        elif left_row is None:
+            # Right-only rows of a full join carry their key in the left
+            # key columns, so the key column stays filled.
+            merged_row = [""] * max(left_width, max(left_columns) + 1)
+            for left_idx, right_idx in zip(left_columns, right_columns):
+                merged_row[left_idx] = right_row[right_idx] if right_idx < len(right_row) else ""
+            merged_row += right_cells(right_row)
+        else:
+            merged_row = left_row + right_cells(right_row)
+        writer.writerow(merged_row)
+        written += 1
 
-    merged = 0
-    unmatched = 0
-
-    left_iter = left_rows[1:] if has_headers else left_rows
-    for row in left_iter:
-        key = row[left_key] if left_key < len(row) else ""
-        right_row = right_lookup.get(key)
-        if not right_row:
-            unmatched += 1
-            continue
+    if not header_written and not written:
+        return 0, 0, "CSV merge produced no output."
 
-        merged_row = row + [
-            cell for idx, cell in enumerate(right_row) if idx != right_key
-        ]
-        writer.writerow(merged_row)
-        merged += 1
+    return stats.matched, stats.left_unmatched, None
 
-    if not output.getvalue():
-        return "", 0, 0, "CSV merge produced no output."
 
+def merge_csv_text(
+    left_text: CsvSource,
+    right_text: CsvSource,
+    *,
+    left_key: int | List[int],
+    right_key: int | List[int],
+    has_headers: bool = False,
+    how: str = "inner",
+) -> Tuple[str, int, int, str | None]:
+    output = io.StringIO()
+    merged, unmatched, error = merge_csv_stream(
+        left_text,
+        right_text,
+        output,
+        left_key=left_key,
+        right_key=right_key,
+        has_headers=has_headers,
+        how=how,
+    )
+    if error:
+        return "", 0, 0, error
     return output.getvalue(), merged, unmatched, None
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import io
 import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from modules.csvmerge.core.merge import merge_csv_text, parse_column_index
+from modules.csvmerge.core.merge import merge_csv_stream, parse_column_indexes
+from modules.sparky_core.core.uploads import SpooledOutput
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
 from universe.ads import attach_ads_globals
@@ -50,40 +51,42 @@ async def merge_csv(
     left_key: str | None = Form(None),
     right_key: str | None = Form(None),
     has_headers: bool = Form(False),
+    join_type: str = Form("inner"),
 ):
     if not left_file or not right_file:
         return JSONResponse({"error": "Upload both CSV files."}, status_code=400)
 
-    left_index, error = parse_column_index(left_key, label="Left")
+    left_columns, error = parse_column_indexes(left_key, label="Left")
     if error:
         return JSONResponse({"error": error}, status_code=400)
 
-    right_index, error = parse_column_index(right_key, label="Right")
+    right_columns, error = parse_column_indexes(right_key, label="Right")
     if error:
         return JSONResponse({"error": error}, status_code=400)
 
-    left_bytes = await left_file.read()
-    right_bytes = await right_file.read()
-    left_text = left_bytes.decode("utf-8", errors="replace")
-    right_text = right_bytes.decode("utf-8", errors="replace")
-
-    output_text, merged, unmatched, error = merge_csv_text(
-        left_text,
-        right_text,
-        left_key=left_index,
-        right_key=right_index,
+    output = SpooledOutput()
+    merged, unmatched, error = await run_in_threadpool(
+        merge_csv_stream,
+        left_file.file,
+        right_file.file,
+        output,
+        left_key=left_columns,
+        right_key=right_columns,
         has_headers=has_headers,
+        how=join_type,
     )
     if error:
+        output.close()
         return JSONResponse({"error": error}, status_code=400)
 
     headers = {
         "Content-Disposition": "attachment; filename=merged.csv",
         "X-Merged-Count": str(merged),
         "X-Unmatched-Count": str(unmatched),
+        "X-Join-Type": join_type,
     }
     return StreamingResponse(
-        io.BytesIO(output_text.encode("utf-8")),
+        output.chunks(),
         media_type="text/csv",
         headers=headers,
     )
@@ -1,3 +1,6 @@
-from modules.csvnormalize.core.normalize import normalize_csv_text
+from modules.csvnormalize.core.normalize import (
+    normalize_csv_stream,
+    normalize_csv_text,
+)
 
-__all__ = ["normalize_csv_text"]
+__all__ = ["normalize_csv_stream", "normalize_csv_text"]
@@ -5,6 +5,8 @@ import io
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Any, Dict, Tuple
 
+from modules.sparky_core.core.csv_stream import CsvSource, non_blank, open_csv
+
 Q4 = Decimal("0.0001")
 Q3 = Decimal("0.001")
 Q2 = Decimal("0.01")
@@ -43,39 +45,22 @@ def _format_number(value: Any) -> Tuple[Dict[str, str] | None, str | None]:
     return result, None
 
 
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        class Default(csv.Dialect):
-            delimiter = ","
-            quotechar = "\""
-            escapechar = None
-            doublequote = True
-            skipinitialspace = False
-            lineterminator = "\n"
-            quoting = csv.QUOTE_MINIMAL
-
-        return Default()
-
-
-def normalize_csv_text(raw_text: str, *, column_index: int = 0) -> Tuple[str, int]:
-    if not raw_text.strip():
-        return "", 0
+def normalize_csv_stream(
+    raw_text: CsvSource,
+    output: Any,
+    *,
+    column_index: int = 0,
+) -> Tuple[int, str | None]:
+    table, error = open_csv(raw_text)
+    if error or table is None:
+        return 0, error
 
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=dialect.delimiter, lineterminator="\n")
+    writer = csv.writer(output, delimiter=table.dialect.delimiter, lineterminator="\n")
 
     processed = 0
     header_checked = False
 
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-
+    for row in non_blank(table.rows):
         if not header_checked:
             header_checked = True
             candidate = row[column_index] if column_index < len(row) else ""
@@ -103,4 +88,15 @@ def normalize_csv_text(raw_text: str, *, column_index: int = 0) -> Tuple[str, in
             )
         processed += 1
 
+    if not header_checked:
+        return 0, "CSV is empty or invalid."
+
+    return processed, None
+
+
+def normalize_csv_text(raw_text: CsvSource, *, column_index: int = 0) -> Tuple[str, int]:
+    output = io.StringIO()
+    processed, error = normalize_csv_stream(raw_text, output, column_index=column_index)
+    if error:
+        return "", 0
     return output.getvalue(), processed
@@ -3,14 +3,15 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-import io
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from modules.csvnormalize.core.normalize import normalize_csv_text
+from modules.csvnormalize.core.normalize import normalize_csv_stream
+from modules.sparky_core.core.uploads import SpooledOutput, read_chunks
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
 from universe.ads import attach_ads_globals
@@ -59,10 +60,15 @@ async def normalize_csv(
         except ValueError:
             return JSONResponse({"error": "Column must be a number."}, status_code=400)
 
-    raw_bytes = await file.read()
-    raw_text = raw_bytes.decode("utf-8", errors="replace")
-    output_text, count = normalize_csv_text(raw_text, column_index=column_index)
-    if not output_text:
+    output = SpooledOutput()
+    count, error = await run_in_threadpool(
+        normalize_csv_stream,
+        read_chunks(file.file),
+        output,
+        column_index=column_index,
+    )
+    if error:
+        output.close()
         return JSONResponse({"error": "CSV is empty or invalid."}, status_code=400)
 
     headers = {
@@ -70,7 +76,7 @@ async def normalize_csv(
         "X-Normalized-Count": str(count),
     }
     return StreamingResponse(
-        io.BytesIO(output_text.encode("utf-8")),
+        output.chunks(),
         media_type="text/csv",
         headers=headers,
     )
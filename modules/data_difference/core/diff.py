@@ -1,18 +1,54 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import hashlib
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+from operator import itemgetter
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
 
-from modules.sparky_core.core.structured_data import parse_structured_text, row_signatures
+from modules.sparky_core.core.structured_data import RecordStream, open_records
 
+DIGEST_SIZE = 16
+RUN_BLOCK = 256
+SAMPLE_LIMIT = 5
 
-def _normalize_columns(rows_a: List[Dict[str, Any]], rows_b: List[Dict[str, Any]]) -> List[str]:
+Key = Tuple[str, ...]
+Entry = Tuple[bytes, Dict[str, Any]]
+
+_first = itemgetter(0)
+
+
+def memory_rows() -> int:
+    raw = os.getenv("SPARKY_DIFF_MEMORY_ROWS", "").strip()
+    try:
+        value = int(raw) if raw else 200_000
+    except ValueError:
+        value = 200_000
+    return max(1, value)
+
+
+def _has_rows(stream: RecordStream) -> bool:
+    first = next(stream.records, None)
+    if first is None:
+        return False
+    stream.records = itertools.chain([first], stream.records)
+    return True
+
+
+def _normalize_columns(*streams: RecordStream) -> List[str]:
     columns: List[str] = []
     seen = set()
-    for row in rows_a + rows_b:
-        for key in row.keys():
-            if key not in seen:
-                seen.add(key)
-                columns.append(key)
+    for stream in streams:
+        if not _has_rows(stream):
+            continue
+        for key in stream.columns:
+            if key in seen:
+                continue
+            seen.add(key)
+            columns.append(key)
     return columns
 
 
@@ -28,13 +64,200 @@ def _parse_keys(raw: str | None, columns: List[str]) -> Tuple[List[str] | None,
     return keys, None
 
 
-def _row_key(row: Dict[str, Any], keys: List[str]) -> Tuple[str, ...]:
-    return tuple(str(row.get(key, "")).strip() for key in keys)
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def _canonical(value: Any) -> Any:
+    # Values that compare equal share one repr: 1, 1.0 and True count as
+    # unchanged as they do under ==, while "1" and a missing cell stay apart.
+    if type(value) is str:
+        return value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return sorted((str(key), _canonical(item)) for key, item in value.items())
+    return value
+
+
+def _cell(record: Dict[str, Any], column: str) -> str:
+    return repr(_canonical(record.get(column, _MISSING)))
+
+
+def _row_digest(record: Dict[str, Any], columns: List[str]) -> bytes:
+    text = repr([_canonical(record.get(column, _MISSING)) for column in columns])
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=DIGEST_SIZE).digest()
+
+
+def _read_run(handle: BinaryIO) -> Iterator[Tuple[Key, Entry]]:
+    handle.seek(0)
+    while True:
+        try:
+            block = pickle.load(handle)
+        except EOFError:
+            return
+        yield from block
+
+
+class _KeyedRows:
+    # Last row per key with a digest of its value columns. Rows stay in a
+    # dict up to the memory budget; past it they go to sorted runs on disk
+    # that are merged back in key order.
+    def __init__(self, keys: List[str], value_columns: List[str], budget: int) -> None:
+        self.keys = keys
+        self.value_columns = value_columns
+        self.budget = budget
+        self.rows: Dict[Key, Entry] = {}
+        self.runs: List[BinaryIO] = []
+        self.count = 0
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> None:
+        keys = self.keys
+        value_columns = self.value_columns
+        for record in records:
+            key = tuple(str(record.get(column, "")).strip() for column in keys)
+            self.rows[key] = (_row_digest(record, value_columns), record)
+            self.count += 1
+            if len(self.rows) >= self.budget:
+                self._spill()
+
+    def _spill(self) -> None:
+        items = sorted(self.rows.items(), key=_first)
+        handle = tempfile.TemporaryFile()
+        for start in range(0, len(items), RUN_BLOCK):
+            pickle.dump(items[start : start + RUN_BLOCK], handle, protocol=pickle.HIGHEST_PROTOCOL)
+        self.runs.append(handle)
+        self.rows = {}
+
+    def in_memory(self) -> bool:
+        return not self.runs
+
+    def sorted_items(self) -> Iterator[Tuple[Key, Entry]]:
+        if not self.runs:
+            yield from sorted(self.rows.items(), key=_first)
+            return
+        if self.rows:
+            self._spill()
+        # merge is stable, so of equal keys the one from the latest run
+        # comes last and wins, as it does in the dict.
+        previous: Tuple[Key, Entry] | None = None
+        for item in heapq.merge(*(_read_run(handle) for handle in self.runs), key=_first):
+            if previous is not None and previous[0] != item[0]:
+                yield previous
+            previous = item
+        if previous is not None:
+            yield previous
+
+    def close(self) -> None:
+        for handle in self.runs:
+            handle.close()
+        self.runs = []
+
+
+def _hash_pairs(
+    rows_a: Dict[Key, Entry], rows_b: Dict[Key, Entry]
+) -> Iterator[Tuple[Key, Entry | None, Entry | None]]:
+    for key, entry_a in rows_a.items():
+        yield key, entry_a, rows_b.get(key)
+    for key, entry_b in rows_b.items():
+        if key not in rows_a:
+            yield key, None, entry_b
+
+
+def _merge_pairs(
+    items_a: Iterator[Tuple[Key, Entry]], items_b: Iterator[Tuple[Key, Entry]]
+) -> Iterator[Tuple[Key, Entry | None, Entry | None]]:
+    item_a = next(items_a, None)
+    item_b = next(items_b, None)
+    while item_a is not None or item_b is not None:
+        if item_b is None or (item_a is not None and item_a[0] < item_b[0]):
+            yield item_a[0], item_a[1], None
+            item_a = next(items_a, None)
+        elif item_a is None or item_b[0] < item_a[0]:
+            yield item_b[0], None, item_b[1]
+            item_b = next(items_b, None)
+        else:
+            yield item_a[0], item_a[1], item_b[1]
+            item_a = next(items_a, None)
+            item_b = next(items_b, None)
+
+
+def _keyed_diff(
+    stream_a: RecordStream,
+    stream_b: RecordStream,
+    keys: List[str],
+    columns: List[str],
+) -> Tuple[Dict[str, Any], List[Any], List[Any], List[Any]]:
+    value_columns = [column for column in columns if column not in keys]
+    budget = memory_rows()
+    side_a = _KeyedRows(keys, value_columns, budget)
+    side_b = _KeyedRows(keys, value_columns, budget)
+    added_samples: List[Any] = []
+    removed_samples: List[Any] = []
+    changed_samples: List[Any] = []
+    column_changes = dict.fromkeys(value_columns, 0)
+    added = removed = changed = 0
+    try:
+        side_a.add(stream_a.records)
+        side_b.add(stream_b.records)
+        if side_a.in_memory() and side_b.in_memory():
+            pairs = _hash_pairs(side_a.rows, side_b.rows)
+        else:
+            pairs = _merge_pairs(side_a.sorted_items(), side_b.sorted_items())
+
+        for key, entry_a, entry_b in pairs:
+            if entry_b is None:
+                removed += 1
+                if len(removed_samples) < SAMPLE_LIMIT:
+                    removed_samples.append({"key": key, "row": entry_a[1]})
+            elif entry_a is None:
+                added += 1
+                if len(added_samples) < SAMPLE_LIMIT:
+                    added_samples.append({"key": key, "row": entry_b[1]})
+            elif entry_a[0] != entry_b[0]:
+                changed += 1
+                before = entry_a[1]
+                after = entry_b[1]
+                for column in value_columns:
+                    if _cell(before, column) != _cell(after, column):
+                        column_changes[column] += 1
+                if len(changed_samples) < SAMPLE_LIMIT:
+                    changed_samples.append({"key": key, "before": before, "after": after})
+        spilled = len(side_a.runs) + len(side_b.runs)
+    finally:
+        side_a.close()
+        side_b.close()
+
+    summary = {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "column_changes": column_changes,
+        "spilled_runs": spilled,
+    }
+    return summary, added_samples, removed_samples, changed_samples
+
+
+def _signatures(stream: RecordStream, columns: List[str]) -> set:
+    return {
+        tuple(str(record.get(column, "")).strip() for column in columns)
+        for record in stream.records
+    }
 
 
 def diff_datasets(
-    raw_a: str | bytes,
-    raw_b: str | bytes,
+    raw_a: str | bytes | BinaryIO,
+    raw_b: str | bytes | BinaryIO,
     *,
     filename_a: str | None = None,
     filename_b: str | None = None,
@@ -42,57 +265,25 @@ def diff_datasets(
     content_type_b: str | None = None,
     key_columns: str | None = None,
 ) -> Tuple[Dict[str, Any] | None, str | None]:
-    rows_a, _, report_a, fmt_a, error_a = parse_structured_text(
-        raw_a, filename=filename_a, content_type=content_type_a
-    )
-    if error_a:
+    stream_a, error_a = open_records(raw_a, filename=filename_a, content_type=content_type_a)
+    if error_a or stream_a is None:
         return None, error_a
-    rows_b, _, report_b, fmt_b, error_b = parse_structured_text(
-        raw_b, filename=filename_b, content_type=content_type_b
-    )
-    if error_b:
+    stream_b, error_b = open_records(raw_b, filename=filename_b, content_type=content_type_b)
+    if error_b or stream_b is None:
         return None, error_b
 
-    columns = _normalize_columns(rows_a, rows_b)
+    columns = _normalize_columns(stream_a, stream_b)
     keys, error = _parse_keys(key_columns, columns)
     if error:
         return None, error
 
-    added_samples: List[Any] = []
-    removed_samples: List[Any] = []
-    changed_samples: List[Any] = []
-
     if keys:
-        map_a = { _row_key(row, keys): row for row in rows_a }
-        map_b = { _row_key(row, keys): row for row in rows_b }
-        keys_a = set(map_a.keys())
-        keys_b = set(map_b.keys())
-        added_keys = keys_b - keys_a
-        removed_keys = keys_a - keys_b
-        shared_keys = keys_a & keys_b
-
-        changed = 0
-        for key in list(shared_keys)[:50]:
-            row_a = map_a[key]
-            row_b = map_b[key]
-            if row_a != row_b:
-                changed += 1
-                if len(changed_samples) < 5:
-                    changed_samples.append({"key": key, "before": row_a, "after": row_b})
-
-        for key in list(added_keys)[:5]:
-            added_samples.append({"key": key, "row": map_b[key]})
-        for key in list(removed_keys)[:5]:
-            removed_samples.append({"key": key, "row": map_a[key]})
-
-        summary = {
-            "added": len(added_keys),
-            "removed": len(removed_keys),
-            "changed": changed,
-        }
+        summary, added_samples, removed_samples, changed_samples = _keyed_diff(
+            stream_a, stream_b, keys, columns
+        )
     else:
-        signatures_a = set(row_signatures(rows_a, columns))
-        signatures_b = set(row_signatures(rows_b, columns))
+        signatures_a = _signatures(stream_a, columns)
+        signatures_b = _signatures(stream_b, columns)
         added = signatures_b - signatures_a
         removed = signatures_a - signatures_b
         summary = {
@@ -100,23 +291,22 @@ def diff_datasets(
             "removed": len(removed),
             "changed": 0,
         }
-        for item in list(added)[:5]:
-            added_samples.append(item)
-        for item in list(removed)[:5]:
-            removed_samples.append(item)
+        added_samples = list(added)[:SAMPLE_LIMIT]
+        removed_samples = list(removed)[:SAMPLE_LIMIT]
+        changed_samples = []
 
     payload = {
-        "format_a": fmt_a,
-        "format_b": fmt_b,
-        "row_count_a": len(rows_a),
-        "row_count_b": len(rows_b),
+        "format_a": stream_a.fmt,
+        "format_b": stream_b.fmt,
+        "row_count_a": stream_a.report.get("row_count", 0),
+        "row_count_b": stream_b.report.get("row_count", 0),
         "columns": columns,
         "summary": summary,
         "added_samples": added_samples,
         "removed_samples": removed_samples,
         "changed_samples": changed_samples,
-        "report_a": report_a,
-        "report_b": report_b,
+        "report_a": stream_a.report,
+        "report_b": stream_b.report,
         "key_columns": keys or [],
     }
     return payload, None
@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -51,11 +52,10 @@ async def diff(
     if not file_a or not file_b:
         return JSONResponse({"error": "Upload two files to compare."}, status_code=400)
 
-    data_a = await file_a.read()
-    data_b = await file_b.read()
-    payload, error = diff_datasets(
-        data_a,
-        data_b,
+    payload, error = await run_in_threadpool(
+        diff_datasets,
+        file_a.file,
+        file_b.file,
         filename_a=file_a.filename,
         filename_b=file_b.filename,
         content_type_a=file_a.content_type,
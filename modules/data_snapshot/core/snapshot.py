@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from typing import Any, BinaryIO, Dict, Tuple
 
 from modules.sparky_core.core.structured_data import (
     parse_structured_text,
@@ -9,12 +9,12 @@ from modules.sparky_core.core.structured_data import (
 
 
 def build_snapshot(
-    raw_text: str | bytes,
+    raw_text: str | bytes | BinaryIO,
     *,
     filename: str | None = None,
     content_type: str | None = None,
 ) -> Tuple[Dict[str, Any] | None, str | None]:
-    rows, columns, report, detected, error = parse_structured_text(
+    table, columns, report, detected, error = parse_structured_text(
         raw_text,
         filename=filename,
         content_type=content_type,
@@ -22,7 +22,7 @@ def build_snapshot(
     if error:
         return None, error
 
-    profile = profile_rows(rows, columns)
+    profile = profile_rows(table, columns)
     summary = {
         "detected_format": detected,
         "row_count": profile["row_count"],
@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -47,9 +48,9 @@ async def snapshot(file: UploadFile | None = File(None)):
     if not file:
         return JSONResponse({"error": "Upload a CSV, JSON, or XLSX file."}, status_code=400)
 
-    data = await file.read()
-    payload, error = build_snapshot(
-        data,
+    payload, error = await run_in_threadpool(
+        build_snapshot,
+        file.file,
         filename=file.filename,
         content_type=file.content_type,
     )
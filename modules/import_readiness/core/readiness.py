@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, BinaryIO, Dict, List, Tuple
 
+from modules.sparky_core.core.datasets import cached_parse, dataset_token
 from modules.sparky_core.core.structured_data import (
     parse_structured_text,
     profile_rows,
     row_signatures,
 )
+from modules.sparky_core.core.table import Table
 
 
 def _value_type(value: Any) -> str | None:
@@ -27,12 +29,12 @@ def _value_type(value: Any) -> str | None:
         return "text"
 
 
-def _column_type_summary(rows: List[Dict[str, Any]], columns: List[str]) -> Dict[str, str]:
+def _column_type_summary(table: Table, columns: List[str]) -> Dict[str, str]:
     summary: Dict[str, str] = {}
     for column in columns:
         types = set()
-        for row in rows:
-            detected = _value_type(row.get(column))
+        for value in table.values(column):
+            detected = _value_type(value)
             if detected:
                 types.add(detected)
             if len(types) > 1:
@@ -47,21 +49,26 @@ def _column_type_summary(rows: List[Dict[str, Any]], columns: List[str]) -> Dict
 
 
 def build_readiness(
-    raw_text: str | bytes,
+    raw_text: str | bytes | BinaryIO,
     *,
     filename: str | None = None,
     content_type: str | None = None,
+    token: str | None = None,
 ) -> Tuple[Dict[str, Any] | None, str | None]:
-    rows, columns, report, detected, error = parse_structured_text(
-        raw_text,
-        filename=filename,
-        content_type=content_type,
+    table, columns, report, detected, error = cached_parse(
+        token or dataset_token(raw_text),
+        ("structured", filename, content_type),
+        lambda: parse_structured_text(
+            raw_text,
+            filename=filename,
+            content_type=content_type,
+        ),
     )
     if error:
         return None, error
 
-    profile = profile_rows(rows, columns)
-    signatures = row_signatures(rows, columns)
+    profile = profile_rows(table, columns)
+    signatures = row_signatures(table, columns)
     total = len(signatures)
     unique = len(set(signatures))
     duplicates = total - unique
@@ -72,7 +79,7 @@ def build_readiness(
         if profile["row_count"] and profile["column_count"]
         else 0
     )
-    type_summary = _column_type_summary(rows, columns)
+    type_summary = _column_type_summary(table, columns)
     mixed_columns = [col for col, typ in type_summary.items() if typ == "mixed"]
 
     verdict = "ok"
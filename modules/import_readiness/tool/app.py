@@ -3,12 +3,14 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-from fastapi import FastAPI, File, Request, UploadFile
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from modules.import_readiness.core.readiness import build_readiness
+from modules.sparky_core.core.datasets import load_dataset, store_upload
 from universe.ads import attach_ads_globals
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
@@ -43,16 +45,41 @@ def index(request: Request):
 
 
 @app.post("/check")
-async def check(file: UploadFile | None = File(None)):
-    if not file:
+async def check(
+    file: UploadFile | None = File(None),
+    dataset: str | None = Form(None),
+):
+    # Browsers submit an empty file part when only a dataset token is sent.
+    if file is not None and (file.filename or not dataset):
+        # The spooled upload is parsed in place; it is only kept as a dataset
+        # for the next tool when it fits the cache.
+        token, kept = await run_in_threadpool(
+            store_upload,
+            file.file,
+            filename=file.filename,
+            content_type=file.content_type,
+        )
+        source = file.file
+        filename, content_type = file.filename, file.content_type
+    elif dataset:
+        stored, error = load_dataset(dataset)
+        if error or stored is None:
+            return JSONResponse({"error": error}, status_code=400)
+        token, kept = stored.token, True
+        source = stored.raw
+        filename, content_type = stored.filename, stored.content_type
+    else:
         return JSONResponse({"error": "Upload a CSV, JSON, or XLSX file."}, status_code=400)
 
-    data = await file.read()
-    payload, error = build_readiness(
-        data,
-        filename=file.filename,
-        content_type=file.content_type,
+    payload, error = await run_in_threadpool(
+        build_readiness,
+        source,
+        filename=filename,
+        content_type=content_type,
+        token=token,
     )
     if error:
         return JSONResponse({"error": error}, status_code=400)
+    if kept:
+        payload["dataset"] = token
     return payload
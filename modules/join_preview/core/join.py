@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import csv
-import io
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
+
+from modules.sparky_core.core.csv_stream import read_table
+from modules.sparky_core.core.joins import key_overlap, row_key
 
 
 MAX_ROWS = 5000
@@ -11,24 +12,6 @@ NULL_TOKENS = {"", "null", "none", "na", "n/a", "nan"}
 SAMPLE_KEYS = 5
 
 
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
-
-
 def _is_null(value: str) -> bool:
     return value.strip().lower() in NULL_TOKENS
 
@@ -36,46 +19,12 @@ def _is_null(value: str) -> bool:
 def _read_csv(
     raw_text: str, *, has_header: bool
 ) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
-    if not raw_text.strip():
-        return None, None, False, "CSV is empty."
-
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    rows: List[List[str]] = []
-    header: List[str] | None = None
-    truncated = False
-
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-        if header is None and has_header:
-            header = [cell.strip() or f"column_{idx + 1}" for idx, cell in enumerate(row)]
-            continue
-        rows.append(row)
-        if len(rows) >= MAX_ROWS:
-            truncated = True
-            break
-
-    if header is None:
-        max_cols = max((len(row) for row in rows), default=0)
-        header = [f"column_{idx + 1}" for idx in range(max_cols)]
-    else:
-        max_cols = max((len(row) for row in rows), default=len(header))
-        if max_cols > len(header):
-            header.extend(
-                f"column_{idx + 1}" for idx in range(len(header), max_cols)
-            )
-
-    if len(header) > MAX_COLS:
-        return None, None, False, f"Too many columns (limit {MAX_COLS})."
-
-    return header, rows, truncated, None
-
-
-def _resolve_key(header: List[str], key_raw: str) -> Tuple[int | None, str | None]:
-    if not key_raw or not key_raw.strip():
-        return None, "Join key is required."
-    token = key_raw.strip()
+    return read_table(
+        raw_text, has_header=has_header, max_rows=MAX_ROWS, max_cols=MAX_COLS
+    )
+
+
+def _resolve_key(header: List[str], token: str) -> Tuple[int | None, str | None]:
     if token.isdigit():
         idx = int(token) - 1
         if idx < 0 or idx >= len(header):
@@ -89,27 +38,47 @@ def _resolve_key(header: List[str], key_raw: str) -> Tuple[int | None, str | Non
     return None, "Join key not found in header."
 
 
-def _collect_keys(rows: List[List[str]], key_idx: int) -> Tuple[set[str], int, int, List[str]]:
-    keys: set[str] = set()
-    missing = 0
-    duplicates = 0
-    samples: List[str] = []
-    for row in rows:
-        value = row[key_idx] if key_idx < len(row) else ""
-        if _is_null(value):
-            missing += 1
-            continue
-        key = value.strip()
-        if not key:
-            missing += 1
-            continue
-        if key in keys:
-            duplicates += 1
-        else:
-            keys.add(key)
-            if len(samples) < SAMPLE_KEYS:
-                samples.append(key)
-    return keys, missing, duplicates, samples
+def _resolve_keys(header: List[str], key_raw: str) -> Tuple[List[int] | None, str | None]:
+    # One name or index, or several comma-separated for a composite key.
+    tokens = [token.strip() for token in (key_raw or "").split(",")]
+    if not any(tokens):
+        return None, "Join key is required."
+    indexes: List[int] = []
+    for token in tokens:
+        if not token:
+            return None, "Join key is required."
+        idx, error = _resolve_key(header, token)
+        if error or idx is None:
+            return None, error
+        indexes.append(idx)
+    return indexes, None
+
+
+class _KeyScan:
+    # Streams the non-null keys of one side, counting what it skips and
+    # remembering the first few distinct keys for the samples.
+    def __init__(self, rows: List[List[str]], key_idxs: List[int]) -> None:
+        self.rows = rows
+        self.key_idxs = key_idxs
+        self.missing = 0
+        self.present = 0
+        self.samples: List[Tuple[str, ...]] = []
+
+    def __iter__(self) -> Iterator[Tuple[str, ...]]:
+        for row in self.rows:
+            values = row_key(row, self.key_idxs)
+            if any(_is_null(value) for value in values):
+                self.missing += 1
+                continue
+            key = tuple(value.strip() for value in values)
+            self.present += 1
+            if len(self.samples) < SAMPLE_KEYS and key not in self.samples:
+                self.samples.append(key)
+            yield key
+
+
+def _show(key: Tuple[str, ...]) -> str | List[str]:
+    return key[0] if len(key) == 1 else list(key)
 
 
 def preview_join(
@@ -133,49 +102,54 @@ def preview_join(
     if error or right_header_list is None or right_rows is None:
         return None, error
 
-    left_idx, error = _resolve_key(left_header_list, left_key)
-    if error or left_idx is None:
+    left_idxs, error = _resolve_keys(left_header_list, left_key)
+    if error or left_idxs is None:
         return None, f"Left key error: {error}"
-    right_idx, error = _resolve_key(right_header_list, right_key)
-    if error or right_idx is None:
+    right_idxs, error = _resolve_keys(right_header_list, right_key)
+    if error or right_idxs is None:
         return None, f"Right key error: {error}"
-
-    left_keys, left_missing, left_duplicates, left_sample = _collect_keys(
-        left_rows, left_idx
-    )
-    right_keys, right_missing, right_duplicates, right_sample = _collect_keys(
-        right_rows, right_idx
-    )
-
-    matches = left_keys & right_keys
-    left_only = left_keys - right_keys
-    right_only = right_keys - left_keys
-
-    left_count = len(left_keys)
-    right_count = len(right_keys)
-    match_count = len(matches)
+    if len(left_idxs) != len(right_idxs):
+        return None, "Left and right keys must have the same number of columns."
+
+    left_scan = _KeyScan(left_rows, left_idxs)
+    right_scan = _KeyScan(right_rows, right_idxs)
+    overlap = key_overlap(left_scan, right_scan, samples=SAMPLE_KEYS)
+
+    # Rows with a null key never match, but left, full and anti joins still
+    # emit them. Keys are compared trimmed and with null tokens set aside,
+    # so keys csvmerge matches only on the raw cell (" a" vs "a", or "" vs
+    # "") can count differently there.
+    join_rows = dict(overlap.rows)
+    join_rows["left"] += left_scan.missing
+    join_rows["full"] += left_scan.missing + right_scan.missing
+    join_rows["anti"] += left_scan.missing
+
+    left_count = overlap.left_unique
+    right_count = overlap.right_unique
+    match_count = overlap.matches
 
     return {
         "left_rows": len(left_rows),
         "right_rows": len(right_rows),
-        "left_key": left_header_list[left_idx],
-        "right_key": right_header_list[right_idx],
+        "left_key": ",".join(left_header_list[idx] for idx in left_idxs),
+        "right_key": ",".join(right_header_list[idx] for idx in right_idxs),
         "left_unique_keys": left_count,
         "right_unique_keys": right_count,
         "matches": match_count,
-        "left_only": len(left_only),
-        "right_only": len(right_only),
-        "left_missing_keys": left_missing,
-        "right_missing_keys": right_missing,
-        "left_duplicates": left_duplicates,
-        "right_duplicates": right_duplicates,
+        "left_only": overlap.left_only,
+        "right_only": overlap.right_only,
+        "left_missing_keys": left_scan.missing,
+        "right_missing_keys": right_scan.missing,
+        "left_duplicates": left_scan.present - left_count,
+        "right_duplicates": right_scan.present - right_count,
         "left_match_rate": round(match_count / left_count, 4) if left_count else 0,
         "right_match_rate": round(match_count / right_count, 4) if right_count else 0,
-        "sample_matches": sorted(matches)[:SAMPLE_KEYS],
-        "sample_left_only": sorted(left_only)[:SAMPLE_KEYS],
-        "sample_right_only": sorted(right_only)[:SAMPLE_KEYS],
-        "left_sample_keys": left_sample,
-        "right_sample_keys": right_sample,
+        "join_rows": join_rows,
+        "sample_matches": [_show(key) for key in overlap.sample_matches],
+        "sample_left_only": [_show(key) for key in overlap.sample_left_only],
+        "sample_right_only": [_show(key) for key in overlap.sample_right_only],
+        "left_sample_keys": [_show(key) for key in left_scan.samples],
+        "right_sample_keys": [_show(key) for key in right_scan.samples],
         "left_truncated": left_truncated,
         "right_truncated": right_truncated,
     }, None
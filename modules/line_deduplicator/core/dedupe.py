@@ -1,6 +1,27 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+import io
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Tuple
+
+from modules.sparky_core.core.fingerprints import (
+    DedupeStats,
+    dedupe_stream,
+    fingerprint_bits,
+    normalizer,
+    text_fingerprint,
+)
+
+
+def _line_fingerprint(
+    *, case_sensitive: bool, trim_whitespace: bool, normalize_unicode: bool
+) -> Callable[[str], int]:
+    normalize = normalizer(
+        ignore_case=not case_sensitive, trim=trim_whitespace, unicode=normalize_unicode
+    )
+    bits = fingerprint_bits()
+    if normalize is None:
+        return lambda line: text_fingerprint(line, bits)
+    return lambda line: text_fingerprint(normalize(line), bits)
 
 
 def dedupe_lines(
@@ -8,35 +29,79 @@ def dedupe_lines(
     *,
     case_sensitive: bool = True,
     trim_whitespace: bool = False,
+    normalize_unicode: bool = False,
 ) -> Tuple[Dict[str, Any] | None, str | None]:
     cleaned = text if text is not None else ""
     if not cleaned.strip():
         return None, "Upload a file or paste text."
 
     lines = cleaned.splitlines()
-    seen: set[str] = set()
-    kept: list[str] = []
-    removed = 0
-
-    for line in lines:
-        key = line
-        if trim_whitespace:
-            key = key.strip()
-        if not case_sensitive:
-            key = key.lower()
-        if key in seen:
-            removed += 1
-            continue
-        seen.add(key)
-        kept.append(line)
+    stats = DedupeStats()
+    kept = list(
+        dedupe_stream(
+            lines,
+            _line_fingerprint(
+                case_sensitive=case_sensitive,
+                trim_whitespace=trim_whitespace,
+                normalize_unicode=normalize_unicode,
+            ),
+            stats=stats,
+        )
+    )
 
     output = "\n".join(kept)
 
     return {
-        "total_lines": len(lines),
-        "unique_lines": len(kept),
-        "removed_lines": removed,
+        "total_lines": stats.total,
+        "unique_lines": stats.kept,
+        "removed_lines": stats.removed,
         "case_sensitive": case_sensitive,
         "trim_whitespace": trim_whitespace,
+        "normalize_unicode": normalize_unicode,
         "output": output,
     }, None
+
+
+def _read_lines(handle: BinaryIO) -> Iterator[str]:
+    handle.seek(0)
+    # Universal newlines; the wrapper is detached so the upload stays open.
+    reader = io.TextIOWrapper(handle, encoding="utf-8", errors="replace")
+    try:
+        for line in reader:
+            yield line[:-1] if line.endswith("\n") else line
+    finally:
+        reader.detach()
+
+
+def dedupe_lines_stream(
+    handle: BinaryIO,
+    output: Any,
+    *,
+    case_sensitive: bool = True,
+    trim_whitespace: bool = False,
+    normalize_unicode: bool = False,
+) -> Tuple[DedupeStats, str | None]:
+    # Upload in, deduped lines out, holding only line fingerprints; large
+    # files fall back to an external sort and a second read of the upload.
+    stats = DedupeStats()
+    kept = dedupe_stream(
+        _read_lines(handle),
+        _line_fingerprint(
+            case_sensitive=case_sensitive,
+            trim_whitespace=trim_whitespace,
+            normalize_unicode=normalize_unicode,
+        ),
+        reopen=lambda: _read_lines(handle),
+        stats=stats,
+    )
+    first = True
+    has_content = False
+    for line in kept:
+        if not first:
+            output.write("\n")
+        output.write(line)
+        first = False
+        has_content = has_content or bool(line.strip())
+    if not has_content:
+        return stats, "Upload a file or paste text."
+    return stats, None
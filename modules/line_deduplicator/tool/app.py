@@ -4,11 +4,13 @@ import os
 from pathlib import Path
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from modules.line_deduplicator.core.dedupe import dedupe_lines
+from modules.line_deduplicator.core.dedupe import dedupe_lines, dedupe_lines_stream
+from modules.sparky_core.core.uploads import SpooledOutput
 from universe.ads import attach_ads_globals
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
@@ -65,6 +67,7 @@ async def dedupe(
     text: str | None = Form(None),
     case_sensitive: str | None = Form("on"),
     trim_whitespace: str | None = Form(None),
+    normalize_unicode: str | None = Form(None),
 ):
     resolved, error = await _read_text(file, text)
     if error:
@@ -74,7 +77,45 @@ async def dedupe(
         resolved,
         case_sensitive=bool(case_sensitive),
         trim_whitespace=bool(trim_whitespace),
+        normalize_unicode=bool(normalize_unicode),
     )
     if error:
         return JSONResponse({"error": error}, status_code=400)
     return payload
+
+
+@app.post("/dedupe/file")
+async def dedupe_file(
+    file: UploadFile | None = File(None),
+    case_sensitive: str | None = Form("on"),
+    trim_whitespace: str | None = Form(None),
+    normalize_unicode: str | None = Form(None),
+):
+    # No 4 MB cap: the upload is streamed and only line fingerprints are kept.
+    if file is None or not file.filename:
+        return JSONResponse({"error": "Upload a file."}, status_code=400)
+
+    output = SpooledOutput()
+    stats, error = await run_in_threadpool(
+        dedupe_lines_stream,
+        file.file,
+        output,
+        case_sensitive=bool(case_sensitive),
+        trim_whitespace=bool(trim_whitespace),
+        normalize_unicode=bool(normalize_unicode),
+    )
+    if error:
+        output.close()
+        return JSONResponse({"error": error}, status_code=400)
+
+    headers = {
+        "Content-Disposition": "attachment; filename=deduped.txt",
+        "X-Line-Count": str(stats.total),
+        "X-Unique-Count": str(stats.kept),
+        "X-Removed-Count": str(stats.removed),
+    }
+    return StreamingResponse(
+        output.chunks(),
+        media_type="text/plain",
+        headers=headers,
+    )
@@ -3,12 +3,13 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-from fastapi import FastAPI, Form, Request
+from fastapi import FastAPI, File, Form, Request, UploadFile
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from modules.null_scan.core.scan import scan_nulls
+from modules.sparky_core.core.datasets import resolve_csv_input
 from universe.flows import resolve_flow_links
 from universe.settings import configure_templates, shared_templates_dir
 from universe.ads import attach_ads_globals
@@ -45,11 +46,23 @@ def index(request: Request):
 @app.post("/scan")
 def scan(
     csv_text: str | None = Form(None),
+    dataset: str | None = Form(None),
+    file: UploadFile | None = File(None),
     has_header: bool = Form(False),
+    approximate: bool = Form(False),
 ):
-    if csv_text is None:
+    # Uploaded files are streamed as they are and not kept as a dataset.
+    if file is not None and file.filename:
+        source, token = file.file, None
+    else:
+        source, token, error = resolve_csv_input(csv_text, dataset)
+        if error:
+            return JSONResponse({"error": error}, status_code=400)
+    if source is None:
         return JSONResponse({"error": "CSV is required."}, status_code=400)
-    result, error = scan_nulls(csv_text, has_header=has_header)
+    result, error = scan_nulls(source, has_header=has_header, approximate=approximate)
     if error:
         return JSONResponse({"error": error}, status_code=400)
+    if token:
+        result["dataset"] = token
     return result
@@ -1,57 +1,22 @@
 from __future__ import annotations
 
-import csv
-import io
-from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Tuple
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import BinaryIO, Dict, List, Tuple
 
+from modules.sparky_core.core.csv_stream import RowBlocks, open_rows
+from modules.sparky_core.core.datasets import cached_read_table
+from modules.sparky_core.core.numeric import column_counts, parse_counts, sort_numbers
+from modules.sparky_core.core.sketches import KLL_K, KllSketch
 
-MAX_ROWS = 5000
+
+MAX_ROWS = 500_000
 MAX_COLS = 200
 MIN_VALUES = 4
 NULL_TOKENS = {"", "null", "none", "na", "n/a", "nan"}
 NUMERIC_RATIO = Decimal("0.8")
-
-
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
-
-
-def _normalize_number(raw: str) -> str:
-    compact = raw.strip().replace(" ", "")
-    if "," in compact and "." in compact:
-        last_comma = compact.rfind(",")
-        last_dot = compact.rfind(".")
-        if last_comma > last_dot:
-            compact = compact.replace(".", "")
-            compact = compact.replace(",", ".")
-        else:
-            compact = compact.replace(",", "")
-    elif "," in compact:
-        compact = compact.replace(",", ".")
-    return compact
-
-
-def _parse_decimal(value: str) -> Decimal | None:
-    normalized = _normalize_number(value)
-    try:
-        return Decimal(normalized)
-    except (InvalidOperation, ValueError):
-        return None
+SAMPLE_OUTLIERS = 5
 
 
 def _is_null(value: str) -> bool:
@@ -59,140 +24,260 @@ def _is_null(value: str) -> bool:
 
 
 def _read_csv(
-    raw_text: str, *, has_header: bool
+    raw_text: str | bytes | BinaryIO, *, has_header: bool
 ) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
-    if not raw_text.strip():
-        return None, None, False, "CSV is empty."
+    return cached_read_table(
+        raw_text, has_header=has_header, max_rows=MAX_ROWS, max_cols=MAX_COLS
+    )
+
+
+def _column_status(
+    idx: int, name: str, non_empty: int, numeric: int
+) -> Dict[str, object] | None:
+    if non_empty == 0:
+        return {"index": idx + 1, "name": name, "status": "empty"}
+    ratio = Decimal(numeric) / Decimal(non_empty) if non_empty else Decimal(0)
+    if ratio < NUMERIC_RATIO:
+        return {
+            "index": idx + 1,
+            "name": name,
+            "status": "non_numeric",
+            "numeric_ratio": float(round(ratio, 3)),
+        }
+    if numeric < MIN_VALUES:
+        return {
+            "index": idx + 1,
+            "name": name,
+            "status": "too_few_values",
+            "numeric_count": numeric,
+        }
+    return None
+
+
+def _fences(q1: Decimal, q3: Decimal) -> Tuple[Decimal, Decimal]:
+    iqr = q3 - q1
+    return q1 - (Decimal("1.5") * iqr), q3 + (Decimal("1.5") * iqr)
+
+
+def _keep_tails(
+    tails: Dict[str, Tuple[float, int]],
+    counts: Dict[str, int],
+    floats: Dict[str, float],
+    *,
+    largest: bool,
+) -> Dict[str, Tuple[float, int]]:
+    # Keeps the SAMPLE_OUTLIERS smallest (and optionally largest) distinct
+    # values with their running counts; a dropped value can never return.
+    for text, count in counts.items():
+        kept = tails.get(text)
+        tails[text] = (floats[text], count + (kept[1] if kept else 0))
+    limit = 2 * SAMPLE_OUTLIERS if largest else SAMPLE_OUTLIERS
+    if len(tails) <= limit:
+        return tails
+    ordered = sorted(tails, key=lambda text: tails[text][0])
+    keep = ordered[:SAMPLE_OUTLIERS] + (ordered[-SAMPLE_OUTLIERS:] if largest else [])
+    return {text: tails[text] for text in keep}
+
+
+def _pick_samples(tails: Dict[str, Tuple[float, int]], low: float, high: float) -> List[str]:
+    picked: List[str] = []
+    for text, (value, count) in sorted(tails.items(), key=lambda item: item[1][0]):
+        if value < low or value > high:
+            picked.extend([text] * min(count, SAMPLE_OUTLIERS - len(picked)))
+        if len(picked) >= SAMPLE_OUTLIERS:
+            break
+    return picked
 
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    rows: List[List[str]] = []
-    header: List[str] | None = None
-    truncated = False
 
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-        if header is None and has_header:
-            header = [cell.strip() or f"column_{idx + 1}" for idx, cell in enumerate(row)]
-            continue
-        rows.append(row)
-        if len(rows) >= MAX_ROWS:
-            truncated = True
-            break
+def _present(block: List[List[str]], idx: int) -> Dict[str, int]:
+    return {cell: count for cell, count in column_counts(block, idx).items() if not _is_null(cell)}
+
+
+@dataclass
+class _NumericStream:
+    non_empty: int = 0
+    sketch: KllSketch = field(default_factory=KllSketch)
+    tails: Dict[str, Tuple[float, int]] = field(default_factory=dict)
 
-    if header is None:
-        max_cols = max((len(row) for row in rows), default=0)
-        header = [f"column_{idx + 1}" for idx in range(max_cols)]
-    else:
-        max_cols = max((len(row) for row in rows), default=len(header))
-        if max_cols > len(header):
-            header.extend(
-                f"column_{idx + 1}" for idx in range(len(header), max_cols)
-            )
+    def add(self, present: Dict[str, int]) -> None:
+        self.non_empty += sum(present.values())
+        counts, floats = parse_counts(present)
+        for text, count in counts.items():
+            self.sketch.update(floats[text], count)
+        self.tails = _keep_tails(self.tails, counts, floats, largest=True)
 
-    if len(header) > MAX_COLS:
-        return None, None, False, f"Too many columns (limit {MAX_COLS})."
 
-    return header, rows, truncated, None
+def _number_text(value: float) -> Decimal:
+    return Decimal(format(value, ".15g"))
+
+
+def _rewind(source: str | bytes | BinaryIO) -> bool:
+    if isinstance(source, (str, bytes, bytearray)):
+        return True
+    seekable = getattr(source, "seekable", None)
+    if seekable is None or not seekable():
+        return False
+    source.seek(0)
+    return True
+
+
+def _stream_columns(
+    raw_text: str | bytes | BinaryIO, *, has_header: bool
+) -> Tuple[List[str] | None, List[_NumericStream], int, str | None]:
+    header, rows, error = open_rows(raw_text, has_header=has_header)
+    if error or rows is None:
+        return None, [], 0, error
+    blocks = RowBlocks(rows, header, max_cols=MAX_COLS)
+    columns: List[_NumericStream] = []
+    for block in blocks:
+        columns.extend(_NumericStream() for _ in range(len(columns), blocks.width))
+        for idx, column in enumerate(columns):
+            column.add(_present(block, idx))
+    if blocks.error:
+        return None, [], 0, blocks.error
+    columns.extend(_NumericStream() for _ in range(len(columns), blocks.width))
+    return blocks.names(), columns, blocks.count, None
+
+
+def _count_outside(
+    raw_text: str | bytes | BinaryIO,
+    *,
+    has_header: bool,
+    fences: Dict[int, Tuple[float, float]],
+) -> Dict[int, Tuple[int, List[str]]]:
+    # Second pass against the sketched cutoffs, so counts and samples are
+    # exact for the cutoffs that are reported.
+    header, rows, error = open_rows(raw_text, has_header=has_header)
+    if error or rows is None:
+        return {}
+    totals = dict.fromkeys(fences, 0)
+    tails: Dict[int, Dict[str, Tuple[float, int]]] = {idx: {} for idx in fences}
+    for block in RowBlocks(rows, header):
+        for idx, (low, high) in fences.items():
+            counts, floats = parse_counts(_present(block, idx))
+            outside = {
+                text: count
+                for text, count in counts.items()
+                if floats[text] < low or floats[text] > high
+            }
+            totals[idx] += sum(outside.values())
+            tails[idx] = _keep_tails(tails[idx], outside, floats, largest=False)
+    return {
+        idx: (totals[idx], _pick_samples(tails[idx], low, high))
+        for idx, (low, high) in fences.items()
+    }
+
+
+def _scan_stream(
+    raw_text: str | bytes | BinaryIO, *, has_header: bool
+) -> Tuple[Dict[str, object] | None, str | None]:
+    header, columns, row_count, error = _stream_columns(raw_text, has_header=has_header)
+    if error or header is None:
+        return None, error
 
+    results: List[Dict[str, object]] = []
+    fences: Dict[int, Tuple[float, float]] = {}
+    for idx, (name, column) in enumerate(zip(header, columns)):
+        numeric = column.sketch.count
+        status = _column_status(idx, name, column.non_empty, numeric)
+        if status is not None:
+            results.append(status)
+            continue
 
-def _median(values: List[Decimal]) -> Decimal:
-    count = len(values)
-    mid = count // 2
-    if count % 2 == 1:
-        return values[mid]
-    return (values[mid - 1] + values[mid]) / Decimal(2)
+        q1 = _number_text(column.sketch.quantile(0.25))
+        q3 = _number_text(column.sketch.quantile(0.75))
+        low, high = _fences(q1, q3)
+        fences[idx] = (float(low), float(high))
+        results.append(
+            {
+                "index": idx + 1,
+                "name": name,
+                "status": "ok",
+                "numeric_count": numeric,
+                "q1": str(q1),
+                "q3": str(q3),
+                "low_cutoff": str(low),
+                "high_cutoff": str(high),
+            }
+        )
 
+    exact: Dict[int, Tuple[int, List[str]]] = {}
+    if fences and _rewind(raw_text):
+        exact = _count_outside(raw_text, has_header=has_header, fences=fences)
+    for result in results:
+        idx = int(result["index"]) - 1
+        if idx not in fences:
+            continue
+        low, high = fences[idx]
+        column = columns[idx]
+        if idx in exact:
+            outlier_count, outliers = exact[idx]
+            count_error = 0
+        else:
+            outlier_count = column.sketch.outside(low, high)
+            outliers = _pick_samples(column.tails, low, high)
+            count_error = math.ceil(2 * column.sketch.rank_error * column.sketch.count)
+        result["outlier_count"] = outlier_count
+        result["outlier_count_error"] = count_error
+        result["sample_outliers"] = [str(Decimal(value)) for value in outliers]
 
-def _quartiles(values: List[Decimal]) -> Tuple[Decimal, Decimal]:
-    count = len(values)
-    mid = count // 2
-    lower = values[:mid]
-    upper = values[mid:] if count % 2 == 0 else values[mid + 1 :]
-    return _median(lower), _median(upper)
+    return {
+        "rows": row_count,
+        "columns": len(header),
+        "null_tokens": sorted(token for token in NULL_TOKENS if token),
+        "numeric_ratio_threshold": float(NUMERIC_RATIO),
+        "truncated": False,
+        "scan": results,
+        "approximate": True,
+        "error_bounds": {"quantile_rank_error": round(KllSketch(KLL_K).rank_error, 4)},
+    }, None
 
 
 def scan_outliers(
-    raw_text: str,
+    raw_text: str | bytes | BinaryIO,
     *,
     has_header: bool = True,
+    approximate: bool = False,
 ) -> Tuple[Dict[str, object] | None, str | None]:
+    if approximate:
+        return _scan_stream(raw_text, has_header=has_header)
+
     header, rows, truncated, error = _read_csv(raw_text, has_header=has_header)
     if error or header is None or rows is None:
         return None, error
 
     col_count = len(header)
-    numeric_values: List[List[Decimal]] = [[] for _ in range(col_count)]
-    non_empty_counts = [0 for _ in range(col_count)]
-    numeric_counts = [0 for _ in range(col_count)]
-
-    for row in rows:
-        for idx in range(col_count):
-            cell = row[idx] if idx < len(row) else ""
-            if _is_null(cell):
-                continue
-            value = cell.strip()
-            if not value:
-                continue
-            non_empty_counts[idx] += 1
-            parsed = _parse_decimal(value)
-            if parsed is not None:
-                numeric_counts[idx] += 1
-                numeric_values[idx].append(parsed)
-
     results: List[Dict[str, object]] = []
     for idx, name in enumerate(header):
-        non_empty = non_empty_counts[idx]
-        numeric = numeric_counts[idx]
-        if non_empty == 0:
-            results.append(
-                {"index": idx + 1, "name": name, "status": "empty"}
-            )
-            continue
-
-        ratio = Decimal(numeric) / Decimal(non_empty) if non_empty else Decimal(0)
-        if ratio < NUMERIC_RATIO:
-            results.append(
-                {
-                    "index": idx + 1,
-                    "name": name,
-                    "status": "non_numeric",
-                    "numeric_ratio": float(round(ratio, 3)),
-                }
-            )
-            continue
-
-        values = sorted(numeric_values[idx])
-        if len(values) < MIN_VALUES:
-            results.append(
-                {
-                    "index": idx + 1,
-                    "name": name,
-                    "status": "too_few_values",
-                    "numeric_count": len(values),
-                }
-            )
+        present: Dict[str, int] = {}
+        for cell, count in column_counts(rows, idx).items():
+            if not _is_null(cell):
+                present[cell] = count
+        non_empty = sum(present.values())
+        counts, floats = parse_counts(present)
+        numbers = sort_numbers(counts, floats)
+        numeric = numbers.count
+        status = _column_status(idx, name, non_empty, numeric)
+        if status is not None:
+            results.append(status)
             continue
 
-        q1, q3 = _quartiles(values)
-        iqr = q3 - q1
-        low = q1 - (Decimal("1.5") * iqr)
-        high = q3 + (Decimal("1.5") * iqr)
+        q1, q3 = numbers.quartiles()
+        low, high = _fences(q1, q3)
 
-        outliers = [value for value in values if value < low or value > high]
+        outlier_count, outliers = numbers.outside(float(low), float(high))
         results.append(
             {
                 "index": idx + 1,
                 "name": name,
                 "status": "ok",
-                "numeric_count": len(values),
+                "numeric_count": numeric,
                 "q1": str(q1),
                 "q3": str(q3),
                 "low_cutoff": str(low),
                 "high_cutoff": str(high),
-                "outlier_count": len(outliers),
-                "sample_outliers": [str(value) for value in outliers[:5]],
+                "outlier_count": outlier_count,
+                "sample_outliers": [str(Decimal(value)) for value in outliers],
             }
         )
 
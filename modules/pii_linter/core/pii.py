@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import csv
-import io
 import re
 from typing import Dict, List, Tuple
 
+from modules.sparky_core.core.csv_stream import read_table
+
 
 MAX_ROWS = 5000
 MAX_COLS = 200
@@ -19,24 +19,6 @@ CARD_RE = re.compile(r"(?:\d[ -]?){13,19}")
 IP_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
 
 
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
-
-
 def _is_null(value: str) -> bool:
     return value.strip().lower() in NULL_TOKENS
 
@@ -134,40 +116,9 @@ def _valid_ip(value: str) -> bool:
 def _read_csv(
     raw_text: str, *, has_header: bool
 ) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
-    if not raw_text.strip():
-        return None, None, False, "CSV is empty."
-
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    rows: List[List[str]] = []
-    header: List[str] | None = None
-    truncated = False
-
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-        if header is None and has_header:
-            header = [cell.strip() or f"column_{idx + 1}" for idx, cell in enumerate(row)]
-            continue
-        rows.append(row)
-        if len(rows) >= MAX_ROWS:
-            truncated = True
-            break
-
-    if header is None:
-        max_cols = max((len(row) for row in rows), default=0)
-        header = [f"column_{idx + 1}" for idx in range(max_cols)]
-    else:
-        max_cols = max((len(row) for row in rows), default=len(header))
-        if max_cols > len(header):
-            header.extend(
-                f"column_{idx + 1}" for idx in range(len(header), max_cols)
-            )
-
-    if len(header) > MAX_COLS:
-        return None, None, False, f"Too many columns (limit {MAX_COLS})."
-
-    return header, rows, truncated, None
+    return read_table(
+        raw_text, has_header=has_header, max_rows=MAX_ROWS, max_cols=MAX_COLS
+    )
 
 
 def scan_pii(
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-import csv
-import io
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Tuple
+from decimal import Decimal
+from typing import BinaryIO, Dict, List, Tuple
 
+from modules.sparky_core.core.csv_stream import RowBlocks, open_rows
+from modules.sparky_core.core.datasets import cached_read_table
+from modules.sparky_core.core.numeric import column_counts, normalize_number
+from modules.sparky_core.core.sketches import DistinctCounter
 
-MAX_ROWS = 5000
+
+MAX_ROWS = 500_000
 MAX_COLS = 200
 MAX_UNIQUE = 2000
 MAX_EXAMPLES = 3
@@ -18,39 +22,6 @@ INT_RE = re.compile(r"^[+-]?\d+$")
 FLOAT_RE = re.compile(r"^[+-]?(?:\d+\.\d+|\d+|\.\d+)(?:[eE][+-]?\d+)?$")
 
 
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
-
-
-def _normalize_number(raw: str) -> str:
-    compact = raw.strip().replace(" ", "")
-    if "," in compact and "." in compact:
-        last_comma = compact.rfind(",")
-        last_dot = compact.rfind(".")
-        if last_comma > last_dot:
-            compact = compact.replace(".", "")
-            compact = compact.replace(",", ".")
-        else:
-            compact = compact.replace(",", "")
-    elif "," in compact:
-        compact = compact.replace(",", ".")
-    return compact
-
-
 def _is_null(value: str) -> bool:
     return value.strip().lower() in NULL_TOKENS
 
@@ -59,185 +30,202 @@ def _looks_like_date(value: str) -> bool:
     return "-" in value or "T" in value
 
 
-def _classify(value: str) -> Tuple[str, Decimal | None]:
-    lowered = value.strip().lower()
+def _classify(value: str) -> Tuple[str, str | None, float | None]:
+    lowered = value.lower()
     if lowered in BOOL_TOKENS:
-        return "bool", None
+        return "bool", None, None
 
-    normalized = _normalize_number(value)
+    normalized = normalize_number(value)
     if INT_RE.match(normalized):
-        try:
-            return "int", Decimal(normalized)
-        except (InvalidOperation, ValueError):
-            return "string", None
+        return "int", normalized, float(normalized)
     if FLOAT_RE.match(normalized):
-        try:
-            return "float", Decimal(normalized)
-        except (InvalidOperation, ValueError):
-            return "string", None
+        return "float", normalized, float(normalized)
 
     if _looks_like_date(value):
         try:
-            datetime.fromisoformat(value.strip())
-            return "date", None
+            datetime.fromisoformat(value)
+            return "date", None, None
         except ValueError:
             pass
 
-    return "string", None
+    return "string", None, None
+
+
+def _column_values(rows: List[List[str]], idx: int) -> Tuple[Dict[str, int], int]:
+    values: Dict[str, int] = {}
+    empty = 0
+    for cell, count in column_counts(rows, idx).items():
+        if _is_null(cell):
+            empty += count
+            continue
+        value = cell.strip()
+        values[value] = values.get(value, 0) + count
+    return values, empty
+
+
+def _unique_overflow(rows: List[List[str]], idx: int, values: Dict[str, int]) -> bool:
+    # Distinct values are tracked until MAX_UNIQUE are seen; any non-empty
+    # cell after that point marks the count as capped.
+    if len(values) != MAX_UNIQUE:
+        return len(values) > MAX_UNIQUE
+    last = next(reversed(values))
+    if values[last] > 1:
+        return True
+    for row in reversed(rows):
+        cell = row[idx] if idx < len(row) else ""
+        if not _is_null(cell):
+            return cell.strip() != last
+    return False
 
 
 def _read_csv(
-    raw_text: str, *, has_header: bool
+    raw_text: str | bytes | BinaryIO, *, has_header: bool
 ) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
-    if not raw_text.strip():
-        return None, None, False, "CSV is empty."
-
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    rows: List[List[str]] = []
-    header: List[str] | None = None
-    truncated = False
+    return cached_read_table(
+        raw_text, has_header=has_header, max_rows=MAX_ROWS, max_cols=MAX_COLS
+    )
+
+
+@dataclass
+class _ColumnStats:
+    # Everything but the distinct count is fixed-size, so the same stats
+    # serve one pass over all rows or many passes over streamed blocks.
+    empty: int = 0
+    types: Dict[str, int] = field(
+        default_factory=lambda: {"int": 0, "float": 0, "bool": 0, "date": 0, "string": 0}
+    )
+    low: Tuple[str, float] | None = None
+    high: Tuple[str, float] | None = None
+    min_len: int | None = None
+    max_len: int | None = None
+    examples: List[str] = field(default_factory=list)
+
+    def add(self, values: Dict[str, int], empty: int) -> None:
+        self.empty += empty
+        types = self.types
+        for value, count in values.items():
+            kind, normalized, numeric = _classify(value)
+            types[kind] += count
+            if numeric is not None:
+                # Strict comparisons keep the first of equal extremes.
+                if self.low is None or numeric < self.low[1]:
+                    self.low = (normalized, numeric)
+                if self.high is None or numeric > self.high[1]:
+                    self.high = (normalized, numeric)
+            elif kind == "string":
+                size = len(value)
+                if self.min_len is None or size < self.min_len:
+                    self.min_len = size
+                if self.max_len is None or size > self.max_len:
+                    self.max_len = size
+            if len(self.examples) < MAX_EXAMPLES and value not in self.examples:
+                self.examples.append(value)
+
+    def profile(self, idx: int, name: str, unique_count: object) -> Dict[str, object]:
+        types = self.types
+        non_empty = sum(types.values())
+        detected = "empty" if non_empty == 0 else "mixed"
+        if non_empty:
+            if types["int"] + types["float"] == non_empty:
+                detected = "int" if types["float"] == 0 else "float"
+            elif types["bool"] == non_empty:
+                detected = "bool"
+            elif types["date"] == non_empty:
+                detected = "date"
+            elif types["string"] == non_empty:
+                detected = "string"
 
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-        if header is None and has_header:
-            header = [cell.strip() or f"column_{idx + 1}" for idx, cell in enumerate(row)]
-            continue
-        rows.append(row)
-        if len(rows) >= MAX_ROWS:
-            truncated = True
-            break
+        top_count = max(types.values()) if non_empty else 0
+        confidence = round(top_count / non_empty, 3) if non_empty else 0
 
-    if header is None:
-        max_cols = max((len(row) for row in rows), default=0)
-        header = [f"column_{idx + 1}" for idx in range(max_cols)]
-    else:
-        max_cols = max((len(row) for row in rows), default=len(header))
-        if max_cols > len(header):
-            header.extend(
-                f"column_{idx + 1}" for idx in range(len(header), max_cols)
-            )
+        return {
+            "index": idx + 1,
+            "name": name,
+            "type": detected,
+            "confidence": confidence,
+            "non_empty": non_empty,
+            "empty": self.empty,
+            "unique": unique_count,
+            "min": str(Decimal(self.low[0])) if self.low is not None else None,
+            "max": str(Decimal(self.high[0])) if self.high is not None else None,
+            "min_len": self.min_len,
+            "max_len": self.max_len,
+            "examples": list(self.examples),
+        }
+
+
+def _profile_stream(
+    raw_text: str | bytes | BinaryIO, *, has_header: bool
+) -> Tuple[Dict[str, object] | None, str | None]:
+    header, rows, error = open_rows(raw_text, has_header=has_header)
+    if error or rows is None:
+        return None, error
+    blocks = RowBlocks(rows, header, max_cols=MAX_COLS)
+    stats: List[_ColumnStats] = []
+    distinct: List[DistinctCounter] = []
+    for block in blocks:
+        for _ in range(len(stats), blocks.width):
+            # Rows before a column first appeared count as empty cells.
+            stats.append(_ColumnStats(empty=blocks.count - len(block)))
+            distinct.append(DistinctCounter(MAX_UNIQUE))
+        for idx, (column, seen) in enumerate(zip(stats, distinct)):
+            values, empty = _column_values(block, idx)
+            column.add(values, empty)
+            seen.update(values)
+    if blocks.error:
+        return None, blocks.error
+    for _ in range(len(stats), blocks.width):
+        stats.append(_ColumnStats(empty=blocks.count))
+        distinct.append(DistinctCounter(MAX_UNIQUE))
 
-    if len(header) > MAX_COLS:
-        return None, None, False, f"Too many columns (limit {MAX_COLS})."
+    columns: List[Dict[str, object]] = []
+    for idx, (name, column, seen) in enumerate(zip(blocks.names(), stats, distinct)):
+        profile = column.profile(idx, name, seen.count())
+        profile["unique_exact"] = seen.exact
+        columns.append(profile)
 
-    return header, rows, truncated, None
+    return {
+        "rows": blocks.count,
+        "columns": len(columns),
+        "null_tokens": sorted(token for token in NULL_TOKENS if token),
+        "truncated": False,
+        "profile": columns,
+        "approximate": True,
+        "error_bounds": {
+            "unique_relative_error": round(
+                max((seen.relative_error for seen in distinct), default=0.0), 4
+            ),
+        },
+    }, None
 
 
 def profile_schema(
-    raw_text: str,
+    raw_text: str | bytes | BinaryIO,
     *,
     has_header: bool = True,
+    approximate: bool = False,
 ) -> Tuple[Dict[str, object] | None, str | None]:
+    if approximate:
+        return _profile_stream(raw_text, has_header=has_header)
+
     header, rows, truncated, error = _read_csv(raw_text, has_header=has_header)
     if error or header is None or rows is None:
         return None, error
 
     col_count = len(header)
-    stats: List[Dict[str, object]] = []
-    for _ in range(col_count):
-        stats.append(
-            {
-                "empty": 0,
-                "non_empty": 0,
-                "types": {"int": 0, "float": 0, "bool": 0, "date": 0, "string": 0},
-                "min": None,
-                "max": None,
-                "min_len": None,
-                "max_len": None,
-                "unique": set(),
-                "unique_overflow": False,
-                "examples": [],
-            }
-        )
-
-    for row in rows:
-        for idx in range(col_count):
-            cell = row[idx] if idx < len(row) else ""
-            if _is_null(cell):
-                stats[idx]["empty"] += 1
-                continue
-
-            value = cell.strip()
-            if not value:
-                stats[idx]["empty"] += 1
-                continue
-
-            stats[idx]["non_empty"] += 1
-            types = stats[idx]["types"]
-            kind, numeric = _classify(value)
-            types[kind] += 1
-
-            if kind in {"int", "float"} and numeric is not None:
-                current_min = stats[idx]["min"]
-                current_max = stats[idx]["max"]
-                if current_min is None or numeric < current_min:
-                    stats[idx]["min"] = numeric
-                if current_max is None or numeric > current_max:
-                    stats[idx]["max"] = numeric
-            elif kind == "string":
-                length = len(value)
-                min_len = stats[idx]["min_len"]
-                max_len = stats[idx]["max_len"]
-                if min_len is None or length < min_len:
-                    stats[idx]["min_len"] = length
-                if max_len is None or length > max_len:
-                    stats[idx]["max_len"] = length
-
-            unique = stats[idx]["unique"]
-            if not stats[idx]["unique_overflow"]:
-                if len(unique) < MAX_UNIQUE:
-                    unique.add(value)
-                else:
-                    stats[idx]["unique_overflow"] = True
-
-            if len(stats[idx]["examples"]) < MAX_EXAMPLES:
-                if value not in stats[idx]["examples"]:
-                    stats[idx]["examples"].append(value)
-
     columns: List[Dict[str, object]] = []
     for idx, name in enumerate(header):
-        meta = stats[idx]
-        non_empty = meta["non_empty"]
-        empty = meta["empty"]
-        types = meta["types"]
-        detected = "empty" if non_empty == 0 else "mixed"
-        if non_empty:
-            if types["int"] + types["float"] == non_empty:
-                detected = "int" if types["float"] == 0 else "float"
-            elif types["bool"] == non_empty:
-                detected = "bool"
-            elif types["date"] == non_empty:
-                detected = "date"
-            elif types["string"] == non_empty:
-                detected = "string"
-
-        top_count = max(types.values()) if non_empty else 0
-        confidence = round(top_count / non_empty, 3) if non_empty else 0
+        values, empty = _column_values(rows, idx)
+        column = _ColumnStats()
+        column.add(values, empty)
 
         unique_count: object
-        if meta["unique_overflow"]:
+        if _unique_overflow(rows, idx, values):
             unique_count = f">={MAX_UNIQUE}"
         else:
-            unique_count = len(meta["unique"])
-
-        columns.append(
-            {
-                "index": idx + 1,
-                "name": name,
-                "type": detected,
-                "confidence": confidence,
-                "non_empty": non_empty,
-                "empty": empty,
-                "unique": unique_count,
-                "min": str(meta["min"]) if meta["min"] is not None else None,
-                "max": str(meta["max"]) if meta["max"] is not None else None,
-                "min_len": meta["min_len"],
-                "max_len": meta["max_len"],
-                "examples": meta["examples"],
-            }
-        )
+            unique_count = len(values)
+
+        columns.append(column.profile(idx, name, unique_count))
 
     return {
         "rows": len(rows),
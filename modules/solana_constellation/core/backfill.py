@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from modules.solana_constellation.core.config import load_config, load_rpc_urls
+from modules.solana_constellation.core.detectors import compile_watch
+from modules.solana_constellation.core.ingest import derive_entry
+from modules.solana_constellation.core.rpc import (
+    SolanaRpcError,
+    get_signatures_for_address,
+    get_transactions,
+)
+from modules.solana_constellation.core.snapshot import invalidate_snapshot
+from modules.solana_constellation.core.storage import get_cursor, record_ingest
+
+MAX_PAGE_SIZE = 1000
+BACKFILL_RETRIES = 3
+
+T = TypeVar("T")
+
+
+class RateBudget:
+    def __init__(self, per_second: float) -> None:
+        self._rate = per_second
+        self._allowance = per_second
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: int = 1) -> None:
+        if self._rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(
+                self._rate,
+                self._allowance + (now - self._last) * self._rate,
+            )
+            self._last = now
+            # Callers may overdraw; the debt is paid back by waiting.
+            self._allowance -= cost
+            wait = -self._allowance / self._rate if self._allowance < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _cursor_key(address: str) -> str:
+    return f"backfill:{address}"
+
+
+def _epoch(value: datetime | int | None) -> int | None:
+    if value is None or isinstance(value, int):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _position(entry: Dict[str, Any], bounds: Dict[str, Any]) -> str:
+    slot = entry.get("slot")
+    block_time = entry.get("blockTime")
+    if slot is not None:
+        if bounds["since_slot"] is not None and slot < bounds["since_slot"]:
+            return "older"
+        if bounds["until_slot"] is not None and slot > bounds["until_slot"]:
+            return "newer"
+    if block_time is not None:
+        if bounds["since_time"] is not None and block_time < bounds["since_time"]:
+            return "older"
+        if bounds["until_time"] is not None and block_time > bounds["until_time"]:
+            return "newer"
+    return "inside"
+
+
+def _with_retries(call: Callable[[], T]) -> T:
+    for attempt in range(BACKFILL_RETRIES):
+        try:
+            return call()
+        except SolanaRpcError:
+            if attempt == BACKFILL_RETRIES - 1:
+                raise
+            time.sleep(2**attempt)
+    raise SolanaRpcError("Backfill request failed.")
+
+
+def backfill_progress(address: str) -> Optional[Dict[str, Any]]:
+    return get_cursor(_cursor_key(address.strip()))
+
+
+def backfill_address(
+    address: str,
+    *,
+    since_slot: int | None = None,
+    until_slot: int | None = None,
+    since_time: datetime | int | None = None,
+    until_time: datetime | int | None = None,
+    before: str | None = None,
+    resume: bool = True,
+    on_progress: Callable[[Dict[str, Any]], None] | None = None,
+) -> Dict[str, Any]:
+    config = load_config()
+    if not load_rpc_urls():
+        raise SolanaRpcError("SOLANA_RPC_URL is not configured.")
+    address = address.strip()
+    key = _cursor_key(address)
+    bounds = {
+        "since_slot": since_slot,
+        "until_slot": until_slot,
+        "since_time": _epoch(since_time),
+        "until_time": _epoch(until_time),
+        "before": before or "",
+    }
+
+    progress = get_cursor(key) or {}
+    if not (resume and progress.get("bounds") == bounds):
+        progress = {
+            "address": address,
+            "status": "running",
+            "bounds": bounds,
+            "before": bounds["before"],
+            "pages": 0,
+            "signatures": 0,
+            "transactions": 0,
+            "missing": 0,
+            "oldest_slot": None,
+            "oldest_time": None,
+            "started_at": time.time(),
+        }
+    result: Dict[str, Any] = {"ok": True, "raw_added": 0, "events_added": 0}
+    if progress["status"] == "done":
+        return {**result, "detail": "Backfill already complete.", "progress": progress}
+
+    watch = compile_watch(config)
+    budget = RateBudget(config.backfill_rps)
+    page_size = min(max(1, config.backfill_page_size), MAX_PAGE_SIZE)
+    dispatch_size = max(1, config.rpc_batch_size) * max(1, config.rpc_concurrency)
+
+    def fetch_page(cursor: str) -> List[Dict[str, Any]]:
+        def call() -> List[Dict[str, Any]]:
+            budget.acquire()
+            return get_signatures_for_address(address, limit=page_size, before=cursor or None)
+
+        return _with_retries(call)
+
+    def fetch_transactions(signatures: List[str]) -> List[Optional[Dict[str, Any]]]:
+        def call() -> List[Optional[Dict[str, Any]]]:
+            budget.acquire(len(signatures))
+            return get_transactions(signatures, batch_size=config.rpc_batch_size)
+
+        return _with_retries(call)
+
+    # Signature pages form a chain through `before`; the next page is fetched
+    # in the background while this page's transactions are downloaded.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="solana-backfill") as pager:
+        pending = pager.submit(fetch_page, progress["before"])
+        while pending is not None:
+            try:
+                page = pending.result()
+            except SolanaRpcError as exc:
+                return {**result, "ok": False, "detail": f"Backfill stopped: {exc}", "progress": progress}
+            pending = None
+            finished = len(page) < page_size
+            signatures: List[Tuple[int, str]] = []
+            for entry in page:
+                position = _position(entry, bounds)
+                if position == "older":
+                    finished = True
+                    break
+                signature = str(entry.get("signature") or "").strip()
+                if position == "inside" and signature:
+                    signatures.append((int(entry.get("slot") or 0), signature))
+            last_signature = str(page[-1].get("signature") or "").strip() if page else ""
+            if not last_signature:
+                finished = True
+            if not finished:
+                pending = pager.submit(fetch_page, last_signature)
+
+            signatures.sort()
+            ordered = [signature for _, signature in signatures]
+            entries: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+            try:
+                for start in range(0, len(ordered), dispatch_size):
+                    chunk = ordered[start : start + dispatch_size]
+                    for signature, entry in zip(chunk, fetch_transactions(chunk)):
+                        if entry:
+                            entries.append(derive_entry(signature, entry, watch))
+            except SolanaRpcError as exc:
+                if pending is not None:
+                    pending.cancel()
+                return {**result, "ok": False, "detail": f"Backfill stopped: {exc}", "progress": progress}
+
+            progress = dict(progress)
+            progress["pages"] += 1
+            progress["signatures"] += len(ordered)
+            progress["transactions"] += len(entries)
+            progress["missing"] += len(ordered) - len(entries)
+            if last_signature:
+                progress["before"] = last_signature
+            if page:
+                progress["oldest_slot"] = page[-1].get("slot")
+                progress["oldest_time"] = page[-1].get("blockTime")
+            if finished:
+                progress["status"] = "done"
+                progress["finished_at"] = time.time()
+            # The checkpoint commits in the same transaction as the page's rows.
+            raw_added, events_added = record_ingest(entries, {key: progress})
+            result["raw_added"] += raw_added
+            result["events_added"] += events_added
+            if raw_added:
+                invalidate_snapshot()
+            if on_progress is not None:
+                on_progress(progress)
+
+    return {**result, "detail": "Backfill complete.", "progress": progress}
@@ -27,6 +27,12 @@ class SolanaConfig:
     refresh_token: str
     signature_batch_limit: int
     signature_max_pages: int
+    rpc_batch_size: int
+    rpc_concurrency: int
+    rpc_breaker_failures: int
+    rpc_breaker_cooldown: int
+    backfill_rps: float
+    backfill_page_size: int
 
 
 def _split_env(name: str) -> List[str]:
@@ -156,4 +162,10 @@ def load_config() -> SolanaConfig:
         refresh_token=os.getenv("SPARKY_SOLANA_REFRESH_TOKEN", "").strip(),
         signature_batch_limit=_int_env("SOLANA_SIGNATURE_BATCH_LIMIT", 100),
         signature_max_pages=_int_env("SOLANA_SIGNATURE_MAX_PAGES", 0),
+        rpc_batch_size=_int_env("SOLANA_RPC_BATCH_SIZE", 20),
+        rpc_concurrency=_int_env("SOLANA_RPC_CONCURRENCY", 4),
+        rpc_breaker_failures=_int_env("SOLANA_RPC_BREAKER_FAILURES", 3),
+        rpc_breaker_cooldown=_int_env("SOLANA_RPC_BREAKER_COOLDOWN", 30),
+        backfill_rps=_float_env("SOLANA_BACKFILL_RPS", 10.0),
+        backfill_page_size=_int_env("SOLANA_BACKFILL_PAGE_SIZE", 1000),
     )
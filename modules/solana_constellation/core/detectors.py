@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from modules.solana_constellation.core.config import (
+    LAMPORTS_PER_SOL,
+    TOKEN_PROGRAM_ID,
+    UPGRADEABLE_LOADER_ID,
+    SolanaConfig,
+)
+from modules.solana_constellation.core.stars import STAR_DEFS
+
+GOVERNANCE_ACTIONS: Tuple[Tuple[str, str, int], ...] = (
+    ("createproposal", "proposal_created", 4),
+    ("updateproposal", "proposal_updated", 3),
+    ("editproposal", "proposal_updated", 3),
+    ("castvote", "vote_cast", 2),
+    ("execut", "proposal_executed", 4),
+    ("finalize", "proposal_finalized", 4),
+    ("setgovernance", "rules_changed", 4),
+)
+
+
+@dataclass(frozen=True)
+class WatchConfig:
+    governance_programs: FrozenSet[str]
+    governance_realms: FrozenSet[str]
+    tracked_programs: FrozenSet[str]
+    tracked_mints: FrozenSet[str]
+    tracked_mint_order: Tuple[str, ...]
+    treasury_accounts: FrozenSet[str]
+    treasury_threshold_sol: float
+    treasury_critical_sol: float
+    supply_unlock_threshold: float
+    supply_allow_mint: bool
+    program_triggers: Dict[str, Tuple[str, ...]]
+    account_triggers: Dict[str, Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class TxIndex:
+    signature: str
+    block_time: Optional[int]
+    message: Dict[str, Any]
+    meta: Dict[str, Any]
+    accounts: List[str]
+    account_positions: Dict[str, int]
+    program_ids: List[str]
+    program_set: FrozenSet[str]
+    log_text: str
+
+    def has_log(self, token: str) -> bool:
+        return token in self.log_text
+
+
+def _iso_time(block_time: Optional[int]) -> str:
+    if not block_time:
+        return datetime.now(timezone.utc).isoformat()
+    return datetime.fromtimestamp(block_time, tz=timezone.utc).isoformat()
+
+
+def compile_watch(config: SolanaConfig) -> WatchConfig:
+    program_triggers: Dict[str, List[str]] = {}
+    account_triggers: Dict[str, List[str]] = {}
+
+    def add(table: Dict[str, List[str]], key: str, detector: str) -> None:
+        names = table.setdefault(key, [])
+        if detector not in names:
+            names.append(detector)
+
+    for program_id in config.governance_programs:
+        add(program_triggers, program_id, "governance")
+    add(program_triggers, UPGRADEABLE_LOADER_ID, "program")
+    add(program_triggers, TOKEN_PROGRAM_ID, "supply")
+    for account in config.treasury_accounts:
+        add(account_triggers, account, "treasury")
+
+    return WatchConfig(
+        governance_programs=frozenset(config.governance_programs),
+        governance_realms=frozenset(config.governance_realms),
+        tracked_programs=frozenset(config.tracked_programs),
+        tracked_mints=frozenset(config.tracked_mints),
+        tracked_mint_order=tuple(config.tracked_mints),
+        treasury_accounts=frozenset(config.treasury_accounts),
+        treasury_threshold_sol=config.treasury_threshold_sol,
+        treasury_critical_sol=config.treasury_critical_sol,
+        supply_unlock_threshold=config.supply_unlock_threshold,
+        supply_allow_mint=config.supply_allow_mint,
+        program_triggers={key: tuple(value) for key, value in program_triggers.items()},
+        account_triggers={key: tuple(value) for key, value in account_triggers.items()},
+    )
+
+
+def index_transaction(signature: str, entry: Dict[str, Any]) -> TxIndex:
+    message = (entry.get("transaction") or {}).get("message") or {}
+    meta = entry.get("meta") or {}
+
+    accounts: List[str] = []
+    for item in message.get("accountKeys") or []:
+        if isinstance(item, dict) and "pubkey" in item:
+            accounts.append(str(item["pubkey"]))
+        else:
+            accounts.append(str(item))
+    loaded = meta.get("loadedAddresses") or {}
+    accounts.extend(loaded.get("writable") or [])
+    accounts.extend(loaded.get("readonly") or [])
+
+    positions: Dict[str, int] = {}
+    for position, account in enumerate(accounts):
+        positions.setdefault(account, position)
+
+    program_ids: List[str] = []
+    for instr in message.get("instructions") or []:
+        if isinstance(instr, dict):
+            program_id = instr.get("programId")
+            if not program_id and "programIdIndex" in instr:
+                idx = instr.get("programIdIndex")
+                if isinstance(idx, int) and 0 <= idx < len(accounts):
+                    program_id = accounts[idx]
+            if program_id:
+                program_ids.append(str(program_id))
+
+    logs = meta.get("logMessages") or []
+    return TxIndex(
+        signature=signature,
+        block_time=entry.get("blockTime"),
+        message=message,
+        meta=meta,
+        accounts=accounts,
+        account_positions=positions,
+        program_ids=program_ids,
+        program_set=frozenset(program_ids),
+        log_text="\n".join(str(line) for line in logs).lower(),
+    )
+
+
+def _base_event(
+    tx: TxIndex,
+    *,
+    star: str,
+    action: str,
+    impact_level: int,
+    extra: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    info = STAR_DEFS.get(star, {})
+    payload: Dict[str, Any] = {
+        "constellation": "solana",
+        "star": star,
+        "entity": f"{star}_event",
+        "action": action,
+        "scope": "protocol",
+        "impact_level": impact_level,
+        "affected_roles": info.get("roles", []),
+        "valid_from": _iso_time(tx.block_time),
+        "valid_to": None,
+        "source_refs": [tx.signature],
+    }
+    if extra:
+        payload["details"] = extra
+    return payload
+
+
+def _detect_governance(tx: TxIndex, watch: WatchConfig) -> List[Dict[str, Any]]:
+    if watch.governance_realms and watch.governance_realms.isdisjoint(tx.account_positions):
+        return []
+    for token, action, impact in GOVERNANCE_ACTIONS:
+        if tx.has_log(token):
+            return [_base_event(tx, star="governance", action=action, impact_level=impact)]
+    return []
+
+
+def _detect_program(tx: TxIndex, watch: WatchConfig) -> List[Dict[str, Any]]:
+    if watch.tracked_programs and watch.tracked_programs.isdisjoint(tx.program_set):
+        return []
+    if tx.has_log("instruction: upgrade"):
+        return [_base_event(tx, star="program", action="program_upgraded", impact_level=4)]
+    if tx.has_log("instruction: setauthority"):
+        return [
+            _base_event(tx, star="program", action="program_authority_changed", impact_level=3)
+        ]
+    return []
+
+
+def _authority_action(authority_type: str) -> str:
+    lowered = authority_type.lower()
+    if "mint" in lowered:
+        return "mint_authority_changed"
+    if "freeze" in lowered:
+        return "freeze_authority_changed"
+    return "authority_changed"
+
+
+def _supply_authority_events(tx: TxIndex, watch: WatchConfig) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    for instr in tx.message.get("instructions") or []:
+        if not isinstance(instr, dict):
+            continue
+        program = instr.get("program") or ""
+        program_id = instr.get("programId") or ""
+        if program != "spl-token" and program_id != TOKEN_PROGRAM_ID:
+            continue
+        parsed = instr.get("parsed") or {}
+        if parsed.get("type") != "setAuthority":
+            continue
+        info = parsed.get("info") or {}
+        account = str(info.get("account") or info.get("mint") or "").strip()
+        if watch.tracked_mints and account not in watch.tracked_mints:
+            continue
+        events.append(
+            _base_event(
+                tx,
+                star="supply",
+                action=_authority_action(str(info.get("authorityType") or "")),
+                impact_level=4,
+                extra={
+                    "authority_type": info.get("authorityType"),
+                    "account": account,
+                },
+            )
+        )
+    return events
+
+
+def _token_balance_total(entries: List[Dict[str, Any]]) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for item in entries:
+        mint = item.get("mint")
+        amount_info = item.get("uiTokenAmount") or {}
+        raw_amount = amount_info.get("amount")
+        decimals = amount_info.get("decimals", 0)
+        if mint is None or raw_amount is None:
+            continue
+        try:
+            amount = int(raw_amount) / (10 ** int(decimals))
+        except (ValueError, TypeError):
+            continue
+        totals[mint] = totals.get(mint, 0.0) + amount
+    return totals
+
+
+def _supply_unlock_event(tx: TxIndex, watch: WatchConfig) -> Dict[str, Any] | None:
+    pre_totals = _token_balance_total(tx.meta.get("preTokenBalances") or [])
+    post_totals = _token_balance_total(tx.meta.get("postTokenBalances") or [])
+    for mint in watch.tracked_mint_order:
+        delta = post_totals.get(mint, 0.0) - pre_totals.get(mint, 0.0)
+        if delta >= watch.supply_unlock_threshold:
+            return _base_event(
+                tx,
+                star="supply",
+                action="supply_unlocked",
+                impact_level=4,
+                extra={"mint": mint, "delta": round(delta, 4)},
+            )
+    return None
+
+
+def _detect_supply(tx: TxIndex, watch: WatchConfig) -> List[Dict[str, Any]]:
+    if watch.tracked_mints and watch.tracked_mints.isdisjoint(tx.account_positions):
+        return []
+    events = _supply_authority_events(tx, watch)
+    if not events and tx.has_log("instruction: setauthority"):
+        events.append(
+            _base_event(
+                tx,
+                star="supply",
+                action="authority_changed",
+                impact_level=4,
+                extra={"instruction": "setAuthority"},
+            )
+        )
+    if not events and watch.supply_allow_mint and tx.has_log("instruction: mintto"):
+        events.append(_base_event(tx, star="supply", action="minted", impact_level=3))
+    if watch.supply_unlock_threshold > 0:
+        unlock_event = _supply_unlock_event(tx, watch)
+        if unlock_event:
+            events.append(unlock_event)
+    return events
+
+
+def _detect_treasury(tx: TxIndex, watch: WatchConfig) -> List[Dict[str, Any]]:
+    pre = tx.meta.get("preBalances") or []
+    post = tx.meta.get("postBalances") or []
+    deltas: List[float] = []
+    for address in watch.treasury_accounts:
+        idx = tx.account_positions.get(address)
+        if idx is None or idx >= len(pre) or idx >= len(post):
+            continue
+        deltas.append(abs(post[idx] - pre[idx]) / LAMPORTS_PER_SOL)
+    if deltas:
+        max_delta = max(deltas)
+        if max_delta >= watch.treasury_critical_sol:
+            impact = 4
+        elif max_delta >= watch.treasury_threshold_sol:
+            impact = 3
+        else:
+            return []
+        return [
+            _base_event(
+                tx,
+                star="treasury",
+                action="treasury_move",
+                impact_level=impact,
+                extra={"largest_delta_sol": round(max_delta, 3)},
+            )
+        ]
+    return [_base_event(tx, star="treasury", action="treasury_activity", impact_level=1)]
+
+
+DETECTORS: Tuple[Tuple[str, Callable[[TxIndex, WatchConfig], List[Dict[str, Any]]]], ...] = (
+    ("governance", _detect_governance),
+    ("program", _detect_program),
+    ("supply", _detect_supply),
+    ("treasury", _detect_treasury),
+)
+
+
+def triggered_detectors(tx: TxIndex, watch: WatchConfig) -> FrozenSet[str]:
+    names: set[str] = set()
+    for program_id in tx.program_set:
+        names.update(watch.program_triggers.get(program_id, ()))
+    if watch.account_triggers:
+        for account in tx.account_positions:
+            names.update(watch.account_triggers.get(account, ()))
+    return frozenset(names)
+
+
+def detect_events(tx: TxIndex, watch: WatchConfig) -> List[Dict[str, Any]]:
+    triggered = triggered_detectors(tx, watch)
+    if not triggered:
+        return []
+    events: List[Dict[str, Any]] = []
+    for name, detector in DETECTORS:
+        if name in triggered:
+            events.extend(detector(tx, watch))
+    return events
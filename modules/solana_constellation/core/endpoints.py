@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from modules.solana_constellation.core.config import load_config, load_rpc_urls
+
+EWMA_ALPHA = 0.3
+DEFAULT_LATENCY_MS = 250.0
+URL_REFRESH_SECONDS = 30
+MAX_RETRY_AFTER_SECONDS = 300
+MAX_COOLDOWN_SECONDS = 300
+ERROR_RATE_OPEN = 0.5
+ERROR_RATE_MIN_REQUESTS = 5
+
+
+@dataclass
+class EndpointState:
+    url: str
+    ewma_ms: float | None = None
+    error_rate: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    state: str = "closed"
+    opened_at: float = 0.0
+    cooldown_seconds: float = 0.0
+    probe_in_flight: bool = False
+    retry_after_until: float = 0.0
+    last_error: str = ""
+
+    def score(self) -> float:
+        latency = self.ewma_ms if self.ewma_ms is not None else DEFAULT_LATENCY_MS
+        return (1.0 - self.error_rate) ** 2 / max(latency, 1.0)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = "…" if parts.query else ""
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+class EndpointManager:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._states: Dict[str, EndpointState] = {}
+        self._urls: List[str] = []
+        self._urls_loaded_at = 0.0
+        self._load_breaker()
+
+    def _load_breaker(self) -> None:
+        config = load_config()
+        self.failure_limit = max(1, config.rpc_breaker_failures)
+        self.cooldown = max(1, config.rpc_breaker_cooldown)
+
+    def _refresh_urls(self, now: float) -> List[str]:
+        if self._urls and now - self._urls_loaded_at < URL_REFRESH_SECONDS:
+            return self._urls
+        urls = load_rpc_urls()
+        self._urls = urls
+        self._urls_loaded_at = now
+        self._load_breaker()
+        for url in urls:
+            self._states.setdefault(url, EndpointState(url=url))
+        for url in list(self._states):
+            if url not in urls:
+                del self._states[url]
+        return urls
+
+    def candidates(self) -> List[str]:
+        now = time.time()
+        with self._lock:
+            urls = self._refresh_urls(now)
+            healthy: List[EndpointState] = []
+            probe: EndpointState | None = None
+            waiting: List[Tuple[float, str]] = []
+            for url in urls:
+                state = self._states[url]
+                if state.retry_after_until > now:
+                    waiting.append((state.retry_after_until, url))
+                    continue
+                if state.state == "closed":
+                    healthy.append(state)
+                    continue
+                ready_at = state.opened_at + state.cooldown_seconds
+                if probe is None and not state.probe_in_flight and now >= ready_at:
+                    # Half-open: exactly one caller probes a recovering endpoint.
+                    state.state = "half_open"
+                    state.probe_in_flight = True
+                    probe = state
+                    continue
+                waiting.append((max(ready_at, state.retry_after_until), url))
+
+            ordered: List[str] = []
+            if probe is not None:
+                ordered.append(probe.url)
+            if healthy:
+                weights = [state.score() for state in healthy]
+                first = random.choices(healthy, weights=weights, k=1)[0]
+                ordered.append(first.url)
+                rest = sorted(
+                    (state for state in healthy if state is not first),
+                    key=lambda state: state.score(),
+                    reverse=True,
+                )
+                ordered.extend(state.url for state in rest)
+            if not ordered:
+                # Every endpoint is open or rate limited; try the one that
+                # recovers first rather than failing without a request.
+                ordered.extend(url for _, url in sorted(waiting)[:1])
+            return ordered
+
+    def record_success(self, url: str, latency_ms: float) -> None:
+        with self._lock:
+            state = self._states.get(url)
+            if state is None:
+                return
+            state.requests += 1
+            state.consecutive_failures = 0
+            state.error_rate *= 1 - EWMA_ALPHA
+            if state.ewma_ms is None:
+                state.ewma_ms = latency_ms
+            else:
+                state.ewma_ms += EWMA_ALPHA * (latency_ms - state.ewma_ms)
+            state.state = "closed"
+            state.probe_in_flight = False
+            state.cooldown_seconds = 0.0
+
+    def record_failure(
+        self,
+        url: str,
+        detail: str,
+        *,
+        retry_after: float | None = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            failure_limit = self.failure_limit
+            cooldown = self.cooldown
+            state = self._states.get(url)
+            if state is None:
+                return
+            state.requests += 1
+            state.failures += 1
+            state.last_error = detail
+            if retry_after is not None:
+                # Rate limiting says nothing about endpoint health: back off
+                # for the requested window without tripping the breaker.
+                state.retry_after_until = now + retry_after
+                if state.state == "half_open":
+                    state.state = "open"
+                    state.probe_in_flight = False
+                return
+            state.consecutive_failures += 1
+            state.error_rate += EWMA_ALPHA * (1.0 - state.error_rate)
+            if state.state == "half_open":
+                state.cooldown_seconds = min(
+                    state.cooldown_seconds * 2 or cooldown,
+                    MAX_COOLDOWN_SECONDS,
+                )
+                state.state = "open"
+                state.opened_at = now
+                state.probe_in_flight = False
+                return
+            trip = state.consecutive_failures >= failure_limit or (
+                state.requests >= ERROR_RATE_MIN_REQUESTS
+                and state.error_rate >= ERROR_RATE_OPEN
+            )
+            if state.state == "closed" and trip:
+                state.state = "open"
+                state.opened_at = now
+                state.cooldown_seconds = cooldown
+
+    def health(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            urls = self._refresh_urls(now)
+            rows: List[Dict[str, Any]] = []
+            for url in urls:
+                state = self._states[url]
+                reopen_in = 0
+                if state.state == "open":
+                    reopen_in = max(0, int(state.opened_at + state.cooldown_seconds - now))
+                rows.append(
+                    {
+                        "url": redact_url(url),
+                        "state": state.state,
+                        "latency_ms": round(state.ewma_ms, 1) if state.ewma_ms is not None else None,
+                        "error_rate": round(state.error_rate, 3),
+                        "requests": state.requests,
+                        "failures": state.failures,
+                        "reopen_in": reopen_in,
+                        "retry_after_in": max(0, int(state.retry_after_until - now)),
+                        "last_error": state.last_error,
+                    }
+                )
+            return rows
+
+
+_MANAGER = EndpointManager()
+
+
+def endpoint_manager() -> EndpointManager:
+    return _MANAGER
+
+
+def endpoint_health() -> List[Dict[str, Any]]:
+    return _MANAGER.health()
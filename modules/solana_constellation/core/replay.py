@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules.solana_constellation.core.config import load_config
+from modules.solana_constellation.core.detectors import (
+    WatchConfig,
+    compile_watch,
+    detect_events,
+    index_transaction,
+)
+from modules.solana_constellation.core.snapshot import invalidate_snapshot
+from modules.solana_constellation.core.storage import (
+    ReplayRow,
+    begin_replay,
+    decode_raw,
+    finish_replay,
+    iter_replay_batches,
+    write_replay_batch,
+)
+
+REPLAY_BATCH_SIZE = 2000
+
+_WATCH: WatchConfig | None = None
+
+
+def _init_worker(watch: WatchConfig) -> None:
+    global _WATCH
+    _WATCH = watch
+
+
+WorkRow = Tuple[str, Optional[bytes], Optional[str], Optional[str]]
+
+
+def _derive_chunk(rows: List[WorkRow]) -> List[List[Dict[str, Any]]]:
+    derived: List[List[Dict[str, Any]]] = []
+    for signature, blob, codec, legacy in rows:
+        # Decompression happens in the worker so it scales with the pool.
+        entry = decode_raw(blob, codec, legacy)
+        if not entry:
+            derived.append([])
+            continue
+        derived.append(detect_events(index_transaction(signature, entry), _WATCH))
+    return derived
+
+
+def _fingerprint(watch: WatchConfig) -> str:
+    # Sets are sorted: their repr order changes with per-process hash seeds.
+    canonical = json.dumps(
+        asdict(watch),
+        sort_keys=True,
+        default=lambda value: sorted(value),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _split(rows: List[WorkRow], parts: int) -> List[List[WorkRow]]:
+    size = max(1, -(-len(rows) // parts))
+    return [rows[start : start + size] for start in range(0, len(rows), size)]
+
+
+def replay_events(
+    *,
+    workers: int | None = None,
+    batch_size: int = REPLAY_BATCH_SIZE,
+    resume: bool = True,
+    on_progress: Callable[[Dict[str, Any]], None] | None = None,
+) -> Dict[str, Any]:
+    watch = compile_watch(load_config())
+    workers = max(1, workers or os.cpu_count() or 1)
+    progress, error = begin_replay(_fingerprint(watch), resume=resume)
+    if progress is None:
+        return {"ok": False, "detail": error}
+    if on_progress is not None:
+        on_progress(progress)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(watch,),
+    ) as executor:
+
+        def derive(batch: List[ReplayRow]) -> List[List[Dict[str, Any]]]:
+            rows = [(row[0], row[2], row[3], row[4]) for row in batch]
+            derived: List[List[Dict[str, Any]]] = []
+            for chunk in executor.map(_derive_chunk, _split(rows, workers)):
+                derived.extend(chunk)
+            return derived
+
+        for batch in iter_replay_batches(progress, batch_size):
+            progress = write_replay_batch(progress, batch, derive(batch))
+            if on_progress is not None:
+                on_progress(progress)
+        progress = finish_replay(progress, derive)
+
+    invalidate_snapshot()
+    if on_progress is not None:
+        on_progress(progress)
+    return {
+        "ok": True,
+        "detail": "Replay complete.",
+        "generation": progress["generation"],
+        "processed": progress["processed"],
+        "events": progress["events"],
+    }
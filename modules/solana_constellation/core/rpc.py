@@ -1,53 +1,177 @@
 from __future__ import annotations
 
+import http.client
 import json
-from typing import Any, Dict, List, Optional
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
 
-from modules.solana_constellation.core.config import load_rpc_urls
+from modules.solana_constellation.core.config import load_config
+from modules.solana_constellation.core.endpoints import endpoint_manager, parse_retry_after
+
+RPC_TIMEOUT = 15
+RETRYABLE_STATUS = {401, 403, 404, 429, 500, 502, 503, 504}
+TRANSACTION_OPTIONS = {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}
+
+_LOCAL = threading.local()
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
 
 
 class SolanaRpcError(RuntimeError):
     pass
 
 
-def _rpc_request(method: str, params: list[Any]) -> Dict[str, Any]:
-    urls = load_rpc_urls()
+class _BatchUnsupported(SolanaRpcError):
+    pass
+
+
+class _RpcHttpError(Exception):
+    def __init__(self, status: int, retry_after: float | None = None) -> None:
+        super().__init__(f"HTTP Error {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _connection(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = {}
+        _LOCAL.connections = connections
+    key = (scheme, netloc)
+    conn = connections.get(key)
+    if conn is None:
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc, timeout=RPC_TIMEOUT)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=RPC_TIMEOUT)
+        connections[key] = conn
+    return conn
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    connections = getattr(_LOCAL, "connections", None) or {}
+    conn = connections.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _post(url: str, body: bytes) -> Any:
+    parts = urlsplit(url)
+    if parts.scheme not in {"http", "https"}:
+        raise SolanaRpcError(f"Unsupported RPC URL scheme: {parts.scheme or url}")
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+    # Keep-alive sockets can be closed by the provider between calls; retry
+    # once on a fresh connection before treating the endpoint as failed.
+    for attempt in range(2):
+        conn = _connection(parts.scheme, parts.netloc)
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except (http.client.RemoteDisconnected, ConnectionError, BrokenPipeError):
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt:
+                raise
+            continue
+        except Exception:
+            _drop_connection(parts.scheme, parts.netloc)
+            raise
+        if resp.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        if resp.status >= 400:
+            retry_after = None
+            if resp.status == 429:
+                retry_after = parse_retry_after(resp.getheader("Retry-After"))
+                if retry_after is None:
+                    retry_after = float(endpoint_manager().cooldown)
+            raise _RpcHttpError(resp.status, retry_after)
+        return json.loads(raw.decode("utf-8"))
+    raise SolanaRpcError(f"RPC request failed: {url}")
+
+
+def _send(payload: Any) -> Any:
+    manager = endpoint_manager()
+    urls = manager.candidates()
     if not urls:
         raise SolanaRpcError("SOLANA_RPC_URL is not configured.")
 
-    payload = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
-    retryable_status = {401, 403, 404, 429, 500, 502, 503, 504}
+    body = json.dumps(payload).encode("utf-8")
     last_error: Exception | None = None
 
     for url in urls:
+        start = time.perf_counter()
         try:
-            req = Request(
-                url,
-                data=payload.encode("utf-8"),
-                headers={"Content-Type": "application/json"},
-            )
-            with urlopen(req, timeout=15) as resp:
-                raw = resp.read().decode("utf-8")
-            data = json.loads(raw)
-            if "error" in data:
-                raise SolanaRpcError(str(data["error"]))
-            return data
-        except HTTPError as exc:
+            data = _post(url, body)
+        except _RpcHttpError as exc:
             last_error = exc
-            if exc.code in retryable_status:
+            if exc.status in RETRYABLE_STATUS:
+                manager.record_failure(url, str(exc), retry_after=exc.retry_after)
                 continue
-            raise SolanaRpcError(f"RPC HTTP error {exc.code}.") from exc
-        except (URLError, TimeoutError) as exc:
+            manager.record_success(url, (time.perf_counter() - start) * 1000)
+            raise SolanaRpcError(f"RPC HTTP error {exc.status}.") from exc
+        except (OSError, http.client.HTTPException, ValueError, SolanaRpcError) as exc:
             last_error = exc
+            manager.record_failure(url, str(exc))
             continue
+        manager.record_success(url, (time.perf_counter() - start) * 1000)
+        return data
 
     if last_error is not None:
         raise SolanaRpcError(f"RPC request failed: {last_error}") from last_error
     raise SolanaRpcError("RPC request failed.")
 
 
+def _rpc_request(method: str, params: list[Any]) -> Dict[str, Any]:
+    data = _send({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    if not isinstance(data, dict):
+        raise SolanaRpcError("Unexpected RPC response.")
+    if "error" in data:
+        raise SolanaRpcError(str(data["error"]))
+    return data
+
+
+def _rpc_batch(method: str, params_list: Sequence[list[Any]]) -> List[Any]:
+    payload = [
+        {"jsonrpc": "2.0", "id": index, "method": method, "params": params}
+        for index, params in enumerate(params_list)
+    ]
+    data = _send(payload)
+    if not isinstance(data, list):
+        # Providers without batch support answer with a single error object.
+        detail = data.get("error") if isinstance(data, dict) else data
+        raise _BatchUnsupported(f"RPC batch rejected: {detail}")
+
+    results: List[Any] = [None] * len(params_list)
+    answered = [False] * len(params_list)
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        index = item.get("id")
+        if not isinstance(index, int) or not 0 <= index < len(results):
+            continue
+        if "error" in item:
+            error = item["error"]
+            code = error.get("code") if isinstance(error, dict) else None
+            if code == 429 or code == -32429:
+                raise SolanaRpcError(f"RPC rate limited: {error}")
+            continue
+        results[index] = item.get("result")
+        answered[index] = True
+    # Items the batch errored on or left out go through the single-call path,
+    # which fails over across endpoints and raises if they still fail, so no
+    # caller moves a cursor past a transaction it never got.
+    for index, ok in enumerate(answered):
+        if not ok:
+            results[index] = _rpc_request(method, list(params_list[index])).get("result")
+    return results
+
+
 def get_signatures_for_address(
     address: str,
     *,
@@ -62,9 +186,53 @@ def get_signatures_for_address(
 
 
 def get_transaction(signature: str) -> Optional[Dict[str, Any]]:
-    params = [
-        signature,
-        {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0},
-    ]
+    params = [signature, dict(TRANSACTION_OPTIONS)]
     response = _rpc_request("getTransaction", params)
     return response.get("result")
+
+
+def _transaction_batch(signatures: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+    if len(signatures) == 1:
+        return [get_transaction(signatures[0])]
+    params_list = [[signature, dict(TRANSACTION_OPTIONS)] for signature in signatures]
+    try:
+        return _rpc_batch("getTransaction", params_list)
+    except _BatchUnsupported:
+        return [get_transaction(signature) for signature in signatures]
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            # Long-lived workers keep their keep-alive connections between refreshes.
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(1, load_config().rpc_concurrency),
+                thread_name_prefix="solana-rpc",
+            )
+        return _EXECUTOR
+
+
+def get_transactions(
+    signatures: Sequence[str],
+    *,
+    batch_size: int | None = None,
+) -> List[Optional[Dict[str, Any]]]:
+    if not signatures:
+        return []
+    if batch_size is None:
+        batch_size = load_config().rpc_batch_size
+    batch_size = max(1, batch_size)
+    chunks = [
+        list(signatures[start : start + batch_size])
+        for start in range(0, len(signatures), batch_size)
+    ]
+    if len(chunks) == 1:
+        batches = [_transaction_batch(chunks[0])]
+    else:
+        batches = list(_executor().map(_transaction_batch, chunks))
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for batch in batches:
+        results.extend(batch)
+    return results
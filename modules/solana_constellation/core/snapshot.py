@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict
+
+from modules.solana_constellation.core.stars import (
+    STAR_ORDER,
+    build_risk_snapshot,
+    build_star_snapshot,
+    recent_window,
+)
+from modules.solana_constellation.core.storage import last_ingest_at, star_states, totals
+
+# Ingest in this process invalidates immediately; the TTL covers refreshes
+# run by other workers and keeps the 7-day window rolling.
+SNAPSHOT_TTL_SECONDS = 30
+RECENT_WINDOW_HOURS = 24 * 7
+
+_CACHE: Dict[str, Any] = {"body": None, "expires_at": 0.0}
+_LOCK = threading.Lock()
+
+
+def build_constellation_snapshot() -> Dict[str, Any]:
+    star_ids = [star_id for star_id in STAR_ORDER if star_id != "risk"]
+    states = star_states(star_ids, recent_window(RECENT_WINDOW_HOURS))
+    stars = []
+    for star_id in star_ids:
+        state = states[star_id]
+        stars.append(
+            build_star_snapshot(
+                star_id,
+                state["history"],
+                recent_count=state["recent_count"],
+            )
+        )
+    risk = build_risk_snapshot(stars)
+    stars.append(risk)
+    counts = totals()
+    return {
+        "constellation": "solana",
+        "stars": stars,
+        "meta": {
+            "raw_events": counts["raw"],
+            "canonical_events": counts["events"],
+            "last_ingest_at": last_ingest_at(),
+        },
+    }
+
+
+def constellation_snapshot_json() -> bytes:
+    now = time.time()
+    body = _CACHE["body"]
+    if body is not None and now < _CACHE["expires_at"]:
+        return body
+    with _LOCK:
+        if _CACHE["body"] is not None and time.time() < _CACHE["expires_at"]:
+            return _CACHE["body"]
+        body = json.dumps(build_constellation_snapshot()).encode("utf-8")
+        _CACHE["body"] = body
+        _CACHE["expires_at"] = time.time() + SNAPSHOT_TTL_SECONDS
+        return body
+
+
+def invalidate_snapshot() -> None:
+    _CACHE["expires_at"] = 0.0
@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_PATH = "solana_constellation.sqlite3"
+WRITE_BATCH_SIZE = 500
+REPLAY_TABLE = "sparky_solana_events_next"
+
+_LOCAL = threading.local()
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMA_READY: set[str] = set()
+
+
+def database_path() -> str:
+    return os.getenv("SPARKY_SOLANA_SQLITE_PATH", "").strip() or DEFAULT_PATH
+
+
+def _events_table(name: str) -> str:
+    return f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY,
+            star TEXT NOT NULL,
+            impact_level INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            source_signature TEXT,
+            valid_from TEXT,
+            created_at TEXT NOT NULL
+        );
+    """
+
+
+def _create_event_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_solana_events_star_created
+        ON sparky_solana_events (star, created_at DESC, id DESC);
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_solana_events_star_valid
+        ON sparky_solana_events (star, valid_from);
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_solana_events_signature
+        ON sparky_solana_events (source_signature);
+        """
+    )
+
+
+def _ensure_schema(conn: sqlite3.Connection, path: str) -> None:
+    with _SCHEMA_LOCK:
+        if path in _SCHEMA_READY:
+            return
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sparky_solana_raw_events (
+                signature TEXT PRIMARY KEY,
+                slot INTEGER,
+                block_time TEXT,
+                program_ids TEXT,
+                tx_blob BLOB,
+                tx_codec TEXT,
+                created_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_solana_raw_slot
+            ON sparky_solana_raw_events ((COALESCE(slot, -1)), signature);
+            """
+        )
+        conn.execute(_events_table("sparky_solana_events"))
+        _create_event_indexes(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sparky_solana_totals (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO sparky_solana_totals (key, value)
+            SELECT 'raw', count(*) FROM sparky_solana_raw_events
+            UNION ALL
+            SELECT 'events', count(*) FROM sparky_solana_events;
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sparky_solana_cursors (
+                key TEXT PRIMARY KEY,
+                cursor TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            """
+        )
+        _SCHEMA_READY.add(path)
+
+
+def _connect() -> sqlite3.Connection:
+    path = database_path()
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = {}
+        _LOCAL.connections = connections
+    conn = connections.get(path)
+    if conn is None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; writes open explicit IMMEDIATE transactions.
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        _ensure_schema(conn, path)
+        connections[path] = conn
+    return conn
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK;")
+        raise
+    conn.execute("COMMIT;")
+
+
+def _stamp(value: Any) -> str | None:
+    # Fixed-width UTC text so timestamps compare correctly as strings.
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+def _now() -> str:
+    return _stamp(datetime.now(timezone.utc)) or ""
+
+
+def _raw_values(row: Tuple[Any, ...], created_at: str) -> Tuple[Any, ...]:
+    signature, slot, block_time, program_ids, blob, codec = row
+    return (signature, slot, _stamp(block_time), program_ids, blob, codec, created_at)
+
+
+def _event_values(row: Tuple[Any, ...], created_at: Any) -> Tuple[Any, ...]:
+    star, impact_level, event, source_signature, valid_from = row
+    return (star, impact_level, event, source_signature, _stamp(valid_from), created_at)
+
+
+def _insert_events(
+    conn: sqlite3.Connection,
+    table: str,
+    rows: List[Tuple[Any, ...]],
+) -> None:
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        conn.executemany(
+            f"""
+            INSERT INTO {table} (
+                star, impact_level, event, source_signature, valid_from, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            rows[start : start + WRITE_BATCH_SIZE],
+        )
+
+
+def _add_totals(conn: sqlite3.Connection, raw_added: int, events_added: int) -> None:
+    conn.executemany(
+        """
+        INSERT INTO sparky_solana_totals (key, value) VALUES (?, ?)
+        ON CONFLICT (key) DO UPDATE SET value = value + excluded.value;
+        """,
+        [("raw", raw_added), ("events", events_added)],
+    )
+
+
+def _write_cursor(conn: sqlite3.Connection, key: str, cursor: Dict[str, Any]) -> None:
+    conn.execute(
+        """
+        INSERT INTO sparky_solana_cursors (key, cursor, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT (key)
+        DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at;
+        """,
+        (key, json.dumps(cursor), _now()),
+    )
+
+
+def _decode_events(rows: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    for row in rows:
+        try:
+            events.append(json.loads(row[0]))
+        except (TypeError, json.JSONDecodeError):
+            events.append({"raw": row[0]})
+    return events
+
+
+def record_ingest(
+    entries: List[Tuple[Tuple[Any, ...], List[Tuple[Any, ...]]]],
+    cursors: Dict[str, Dict[str, Any]] | None = None,
+) -> Tuple[int, int]:
+    conn = _connect()
+    created_at = _now()
+    raw_added = 0
+    event_rows: List[Tuple[Any, ...]] = []
+    with _transaction(conn):
+        for start in range(0, len(entries), WRITE_BATCH_SIZE):
+            chunk = entries[start : start + WRITE_BATCH_SIZE]
+            signatures = [row[0] for row, _ in chunk]
+            placeholders = ",".join("?" * len(signatures))
+            existing = {
+                found[0]
+                for found in conn.execute(
+                    f"""
+                    SELECT signature FROM sparky_solana_raw_events
+                    WHERE signature IN ({placeholders});
+                    """,
+                    signatures,
+                )
+            }
+            fresh = [(row, events) for row, events in chunk if row[0] not in existing]
+            conn.executemany(
+                """
+                INSERT INTO sparky_solana_raw_events (
+                    signature, slot, block_time, program_ids, tx_blob, tx_codec, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?);
+                """,
+                [_raw_values(row, created_at) for row, _ in fresh],
+            )
+            raw_added += len(fresh)
+            event_rows.extend(
+                _event_values(event, created_at) for _, events in fresh for event in events
+            )
+        _insert_events(conn, "sparky_solana_events", event_rows)
+        for key, cursor in (cursors or {}).items():
+            _write_cursor(conn, key, cursor)
+        _add_totals(conn, raw_added, len(event_rows))
+    return raw_added, len(event_rows)
+
+
+def list_events(star: str, limit: int = 20) -> List[Dict[str, Any]]:
+    rows = _connect().execute(
+        """
+        SELECT event FROM sparky_solana_events
+        WHERE star = ?
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?;
+        """,
+        (star, limit),
+    ).fetchall()
+    return _decode_events(rows)
+
+
+def list_recent_events(star: str, since: datetime) -> List[Dict[str, Any]]:
+    rows = _connect().execute(
+        """
+        SELECT event FROM sparky_solana_events
+        WHERE star = ? AND valid_from >= ?
+        ORDER BY created_at DESC, id DESC;
+        """,
+        (star, _stamp(since)),
+    ).fetchall()
+    return _decode_events(rows)
+
+
+def get_cursor(key: str) -> Optional[Dict[str, Any]]:
+    row = _connect().execute(
+        "SELECT cursor FROM sparky_solana_cursors WHERE key = ?;",
+        (key,),
+    ).fetchone()
+    if not row:
+        return None
+    try:
+        return json.loads(row[0])
+    except json.JSONDecodeError:
+        return None
+
+
+def set_cursor(key: str, cursor: Dict[str, Any]) -> None:
+    _write_cursor(_connect(), key, cursor)
+
+
+def raw_count() -> int:
+    row = _connect().execute("SELECT count(*) FROM sparky_solana_raw_events;").fetchone()
+    return int(row[0]) if row else 0
+
+
+def event_count() -> int:
+    row = _connect().execute("SELECT count(*) FROM sparky_solana_events;").fetchone()
+    return int(row[0]) if row else 0
+
+
+def star_states(
+    stars: List[str],
+    since: datetime,
+    history_limit: int,
+) -> Dict[str, Dict[str, Any]]:
+    conn = _connect()
+    since_stamp = _stamp(since)
+    states: Dict[str, Dict[str, Any]] = {}
+    for star in stars:
+        history = conn.execute(
+            """
+            SELECT event FROM sparky_solana_events
+            WHERE star = ?
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?;
+            """,
+            (star, history_limit),
+        ).fetchall()
+        recent = conn.execute(
+            """
+            SELECT count(*) FROM sparky_solana_events
+            WHERE star = ? AND valid_from >= ?;
+            """,
+            (star, since_stamp),
+        ).fetchone()
+        states[star] = {
+            "history": _decode_events(history),
+            "recent_count": int(recent[0] or 0),
+        }
+    return states
+
+
+def totals() -> Dict[str, int]:
+    rows = _connect().execute("SELECT key, value FROM sparky_solana_totals;").fetchall()
+    values = {key: int(value) for key, value in rows}
+    return {"raw": values.get("raw", 0), "events": values.get("events", 0)}
+
+
+def begin_replay(fingerprint: str, *, resume: bool = True) -> Dict[str, Any]:
+    conn = _connect()
+    with _transaction(conn):
+        progress = get_cursor("replay") or {}
+        staged = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;",
+            (REPLAY_TABLE,),
+        ).fetchone()
+        if (
+            resume
+            and staged is not None
+            and progress.get("status") == "running"
+            and progress.get("fingerprint") == fingerprint
+        ):
+            return progress
+
+        conn.execute(f"DROP TABLE IF EXISTS {REPLAY_TABLE};")
+        conn.execute(_events_table(REPLAY_TABLE))
+        progress = {
+            "status": "running",
+            "generation": int(progress.get("generation") or 0) + 1,
+            "fingerprint": fingerprint,
+            "last_slot": -2,
+            "last_signature": "",
+            "processed": 0,
+            "events": 0,
+            "total": totals()["raw"],
+            "started_at": time.time(),
+        }
+        _write_cursor(conn, "replay", progress)
+    return progress
+
+
+def _replay_rows_after(
+    conn: sqlite3.Connection,
+    last_slot: int,
+    last_signature: str,
+    limit: int = -1,
+) -> List[Tuple[Any, ...]]:
+    return conn.execute(
+        """
+        SELECT signature, COALESCE(slot, -1), tx_blob, tx_codec, NULL, created_at
+        FROM sparky_solana_raw_events
+        WHERE (COALESCE(slot, -1), signature) > (?, ?)
+        ORDER BY COALESCE(slot, -1), signature
+        LIMIT ?;
+        """,
+        (last_slot, last_signature, limit),
+    ).fetchall()
+
+
+def _replay_rows_late(conn: sqlite3.Connection, progress: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+    # Rows written during the replay below its cursor (backfill loads older
+    # slots) that have not been derived into the new generation yet.
+    started_at = datetime.fromtimestamp(float(progress.get("started_at") or 0), timezone.utc)
+    return conn.execute(
+        f"""
+        SELECT signature, COALESCE(slot, -1), tx_blob, tx_codec, NULL, created_at
+        FROM sparky_solana_raw_events
+        WHERE created_at >= ?
+          AND (COALESCE(slot, -1), signature) <= (?, ?)
+          AND signature NOT IN (
+              SELECT source_signature FROM {REPLAY_TABLE}
+              WHERE source_signature IS NOT NULL
+          )
+        ORDER BY COALESCE(slot, -1), signature;
+        """,
+        (_stamp(started_at), progress["last_slot"], progress["last_signature"]),
+    ).fetchall()
+
+
+def iter_replay_batches(
+    progress: Dict[str, Any],
+    batch_size: int,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    conn = _connect()
+    last_slot, last_signature = progress["last_slot"], progress["last_signature"]
+    # Keyset pages rather than one long read, so WAL checkpoints keep up.
+    while True:
+        batch = _replay_rows_after(conn, last_slot, last_signature, batch_size)
+        if not batch:
+            break
+        yield batch
+        last_slot, last_signature = batch[-1][1], batch[-1][0]
+
+
+def write_replay_batch(
+    progress: Dict[str, Any],
+    batch: List[Tuple[Any, ...]],
+    rows: List[Tuple[Any, ...]],
+) -> Dict[str, Any]:
+    progress = dict(progress)
+    conn = _connect()
+    with _transaction(conn):
+        _insert_events(conn, REPLAY_TABLE, [_event_values(row[:5], row[5]) for row in rows])
+        progress["last_slot"] = batch[-1][1]
+        progress["last_signature"] = batch[-1][0]
+        progress["processed"] += len(batch)
+        progress["events"] += len(rows)
+        _write_cursor(conn, "replay", progress)
+    return progress
+
+
+def finish_replay(
+    progress: Dict[str, Any],
+    derive_rows: Callable[[List[Tuple[Any, ...]]], List[Tuple[Any, ...]]],
+) -> Dict[str, Any]:
+    progress = dict(progress)
+    conn = _connect()
+    # IMMEDIATE holds the write lock, so ingest waits while the rows written
+    # since the cursor opened are derived and the generations are swapped.
+    with _transaction(conn):
+        tail = _replay_rows_after(conn, progress["last_slot"], progress["last_signature"])
+        tail += _replay_rows_late(conn, progress)
+        if tail:
+            rows = derive_rows(tail)
+            _insert_events(
+                conn, REPLAY_TABLE, [_event_values(row[:5], row[5]) for row in rows]
+            )
+            progress["processed"] += len(tail)
+            progress["events"] += len(rows)
+        conn.execute("DROP TABLE sparky_solana_events;")
+        conn.execute(f"ALTER TABLE {REPLAY_TABLE} RENAME TO sparky_solana_events;")
+        _create_event_indexes(conn)
+        conn.execute(
+            """
+            UPDATE sparky_solana_totals
+            SET value = (SELECT count(*) FROM sparky_solana_events)
+            WHERE key = 'events';
+            """
+        )
+        progress["status"] = "done"
+        progress["finished_at"] = time.time()
+        _write_cursor(conn, "replay", progress)
+    return progress
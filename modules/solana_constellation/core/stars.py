@@ -64,7 +64,7 @@ def build_star_snapshot(
     star_id: str,
     history: List[Dict[str, Any]],
     *,
-    recent_events: List[Dict[str, Any]],
+    recent_count: int,
 ) -> Dict[str, Any]:
     base = 0
     last_change = None
@@ -73,7 +73,7 @@ def build_star_snapshot(
         base = int(latest.get("impact_level", 0) or 0)
         last_change = latest.get("valid_from") or latest.get("created_at")
 
-    impact = adjust_impact(base, len(recent_events))
+    impact = adjust_impact(base, recent_count)
     state = state_for_impact(impact)
     info = STAR_DEFS.get(star_id, {})
     return {
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import gzip
 import json
 import os
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from modules.solana_constellation.core import sqlite_storage
 
 try:  # Optional if running without DB.
     import psycopg
 except Exception:  # pragma: no cover
     psycopg = None
 
+try:  # Optional; gzip is used when zstd is unavailable.
+    import zstandard
+except Exception:  # pragma: no cover
+    zstandard = None
+
 
 _MEMORY: Dict[str, Any] = {
     "raw": {},
@@ -18,6 +26,24 @@ _MEMORY: Dict[str, Any] = {
 }
 _SCHEMA_READY = False
 
+INGEST_BATCH_SIZE = 500
+HISTORY_LIMIT = 25
+REPLAY_TABLE = "sparky_solana_events_next"
+COMPACT_BATCH_SIZE = 500
+REPLAY_CLOCK_SLACK_SECONDS = 60
+
+ReplayRow = Tuple[str, int, Optional[bytes], Optional[str], Optional[str], datetime]
+
+_EVENTS_COLUMNS = """
+    id BIGSERIAL PRIMARY KEY,
+    star TEXT NOT NULL,
+    impact_level INTEGER NOT NULL,
+    event JSONB NOT NULL,
+    source_signature TEXT,
+    valid_from TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+"""
+
 
 def _dsn() -> str | None:
     return (
@@ -27,8 +53,23 @@ def _dsn() -> str | None:
     )
 
 
+def _backend() -> str:
+    choice = os.getenv("SPARKY_SOLANA_STORAGE", "auto").strip().lower()
+    if choice in {"memory", "sqlite"}:
+        return choice
+    if _dsn() and psycopg is not None:
+        return "postgres"
+    if choice == "auto" and os.getenv("SPARKY_SOLANA_SQLITE_PATH", "").strip():
+        return "sqlite"
+    return "memory"
+
+
 def _db_available() -> bool:
-    return bool(_dsn()) and psycopg is not None
+    return _backend() == "postgres"
+
+
+def _sqlite_available() -> bool:
+    return _backend() == "sqlite"
 
 
 def _utc_now() -> datetime:
@@ -54,25 +95,67 @@ def _ensure_schema(conn: Any) -> None:
         );
         """
     )
+    # Compact format: the full transaction lives once in tx_blob; the legacy
+    # accounts/instructions/logs/payload columns stay NULL for new rows.
     conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS sparky_solana_events (
-            id BIGSERIAL PRIMARY KEY,
-            star TEXT NOT NULL,
-            impact_level INTEGER NOT NULL,
-            event JSONB NOT NULL,
-            source_signature TEXT,
-            valid_from TIMESTAMPTZ,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
-        );
+        ALTER TABLE sparky_solana_raw_events
+        ADD COLUMN IF NOT EXISTS tx_blob BYTEA,
+        ADD COLUMN IF NOT EXISTS tx_codec TEXT;
         """
     )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_solana_raw_slot
+        ON sparky_solana_raw_events ((COALESCE(slot, -1)), signature);
+        """
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS sparky_solana_events ({_EVENTS_COLUMNS});")
     conn.execute(
         """
         CREATE INDEX IF NOT EXISTS idx_solana_events_star_created
         ON sparky_solana_events (star, created_at DESC);
         """
     )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_solana_events_star_valid
+        ON sparky_solana_events (star, valid_from);
+        """
+    )
+    state_missing = (
+        conn.execute("SELECT to_regclass('sparky_solana_star_counts')").fetchone()[0]
+        is None
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sparky_solana_star_counts (
+            star TEXT NOT NULL,
+            bucket TIMESTAMPTZ NOT NULL,
+            count BIGINT NOT NULL,
+            PRIMARY KEY (star, bucket)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sparky_solana_star_state (
+            star TEXT PRIMARY KEY,
+            latest JSONB NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sparky_solana_totals (
+            key TEXT PRIMARY KEY,
+            value BIGINT NOT NULL
+        );
+        """
+    )
+    if state_missing:
+        _seed_star_state(conn)
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS sparky_solana_cursors (
@@ -85,61 +168,547 @@ def _ensure_schema(conn: Any) -> None:
     _SCHEMA_READY = True
 
 
-def record_raw(payload: Dict[str, Any]) -> bool:
-    signature = str(payload.get("signature") or "").strip()
-    if not signature:
-        return False
-    if _db_available():
-        with psycopg.connect(_dsn(), autocommit=True) as conn:
-            _ensure_schema(conn)
-            conn.execute(
+def _seed_star_state(conn: Any) -> None:
+    conn.execute(
+        """
+        INSERT INTO sparky_solana_star_counts (star, bucket, count)
+        SELECT star, date_trunc('hour', COALESCE(valid_from, created_at)), count(*)
+        FROM sparky_solana_events
+        GROUP BY 1, 2
+        ON CONFLICT (star, bucket) DO NOTHING;
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO sparky_solana_totals (key, value)
+        SELECT 'raw', count(*) FROM sparky_solana_raw_events
+        UNION ALL
+        SELECT 'events', count(*) FROM sparky_solana_events
+        ON CONFLICT (key) DO NOTHING;
+        """
+    )
+    stars = [
+        row[0]
+        for row in conn.execute("SELECT DISTINCT star FROM sparky_solana_events").fetchall()
+    ]
+    _refresh_star_state(conn, stars)
+
+
+def _rebuild_star_state(conn: Any) -> None:
+    conn.execute("DELETE FROM sparky_solana_star_counts;")
+    conn.execute("DELETE FROM sparky_solana_star_state;")
+    conn.execute("DELETE FROM sparky_solana_totals;")
+    _seed_star_state(conn)
+
+
+def _refresh_star_state(conn: Any, stars: List[str]) -> None:
+    if not stars:
+        return
+    conn.execute(
+        """
+        INSERT INTO sparky_solana_star_state (star, latest, updated_at)
+        SELECT s.star,
+               COALESCE(
+                   (
+                       SELECT jsonb_agg(latest.event ORDER BY latest.created_at DESC, latest.id DESC)
+                       FROM (
+                           SELECT id, event, created_at
+                           FROM sparky_solana_events
+                           WHERE star = s.star
+                           ORDER BY created_at DESC, id DESC
+                           LIMIT %s
+                       ) AS latest
+                   ),
+                   '[]'::jsonb
+               ),
+               now()
+        FROM unnest(%s::text[]) AS s (star)
+        ON CONFLICT (star)
+        DO UPDATE SET latest = EXCLUDED.latest, updated_at = now();
+        """,
+        (HISTORY_LIMIT, stars),
+    )
+
+
+def _hour_bucket(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value))
+        except ValueError:
+            moment = _utc_now()
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _update_star_state(
+    conn: Any,
+    events: List[Dict[str, Any]],
+    raw_added: int,
+) -> None:
+    buckets: Dict[Tuple[str, datetime], int] = {}
+    for event in events:
+        key = (str(event.get("star")), _hour_bucket(event.get("valid_from")))
+        buckets[key] = buckets.get(key, 0) + 1
+    with conn.cursor() as cur:
+        if buckets:
+            cur.executemany(
                 """
-                INSERT INTO sparky_solana_raw_events (
-                    signature, slot, block_time, program_ids, accounts,
-                    instructions, logs, payload
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (signature) DO NOTHING;
+                INSERT INTO sparky_solana_star_counts (star, bucket, count)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (star, bucket)
+                DO UPDATE SET count = sparky_solana_star_counts.count + EXCLUDED.count;
                 """,
-                (
-                    signature,
-                    payload.get("slot"),
-                    payload.get("block_time"),
-                    json.dumps(payload.get("program_ids") or []),
-                    json.dumps(payload.get("accounts") or []),
-                    json.dumps(payload.get("instructions") or []),
-                    json.dumps(payload.get("logs") or []),
-                    json.dumps(payload),
-                ),
+                [(star, bucket, count) for (star, bucket), count in buckets.items()],
             )
-        return True
+        cur.executemany(
+            """
+            INSERT INTO sparky_solana_totals (key, value)
+            VALUES (%s, %s)
+            ON CONFLICT (key)
+            DO UPDATE SET value = sparky_solana_totals.value + EXCLUDED.value;
+            """,
+            [("raw", raw_added), ("events", len(events))],
+        )
+    _refresh_star_state(conn, sorted({star for star, _ in buckets}))
+
+
+def _block_time(value: Any) -> datetime | None:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromtimestamp(int(value), tz=timezone.utc)
+    except (TypeError, ValueError, OverflowError):
+        return None
 
-    if signature in _MEMORY["raw"]:
-        return False
-    _MEMORY["raw"][signature] = payload
-    return True
+
+def _raw_codec() -> str:
+    requested = os.getenv("SOLANA_RAW_CODEC", "").strip().lower()
+    if requested == "gzip" or zstandard is None:
+        return "gzip"
+    return "zstd"
+
+
+def encode_raw(tx: Any) -> Tuple[bytes, str]:
+    data = json.dumps(tx, separators=(",", ":")).encode("utf-8")
+    codec = _raw_codec()
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data), codec
+    return gzip.compress(data, compresslevel=6), codec
+
+
+def decode_raw(
+    blob: bytes | None,
+    codec: str | None,
+    legacy: Any = None,
+) -> Optional[Dict[str, Any]]:
+    if blob is None:
+        if isinstance(legacy, str):
+            return json.loads(legacy) if legacy else None
+        return legacy
+    data = bytes(blob)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd raw events.")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "gzip":
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def _raw_row(signature: str, payload: Dict[str, Any]) -> Tuple[Any, ...]:
+    blob, codec = encode_raw(payload.get("raw"))
+    return (
+        signature,
+        payload.get("slot"),
+        _block_time(payload.get("block_time")),
+        json.dumps(payload.get("program_ids") or []),
+        blob,
+        codec,
+    )
+
+
+def _event_row(event: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        event.get("star"),
+        int(event.get("impact_level", 0)),
+        json.dumps(event),
+        (event.get("source_refs") or [None])[0],
+        event.get("valid_from"),
+    )
 
 
-def record_event(event: Dict[str, Any]) -> None:
+def _insert_raw_batch(conn: Any, rows: List[Tuple[Any, ...]]) -> set[str]:
+    columns = list(zip(*rows))
+    result = conn.execute(
+        """
+        INSERT INTO sparky_solana_raw_events (
+            signature, slot, block_time, program_ids, tx_blob, tx_codec
+        )
+        SELECT signature, slot, block_time, program_ids::jsonb, tx_blob, tx_codec
+        FROM unnest(
+            %s::text[], %s::bigint[], %s::timestamptz[], %s::text[],
+            %s::bytea[], %s::text[]
+        ) AS batch (signature, slot, block_time, program_ids, tx_blob, tx_codec)
+        ON CONFLICT (signature) DO NOTHING
+        RETURNING signature;
+        """,
+        [list(column) for column in columns],
+    ).fetchall()
+    return {row[0] for row in result}
+
+
+def record_ingest(
+    entries: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    cursors: Dict[str, Dict[str, Any]] | None = None,
+) -> Tuple[int, int]:
+    rows: Dict[str, Tuple[Any, ...]] = {}
+    events_by_signature: Dict[str, List[Dict[str, Any]]] = {}
+    for payload, events in entries:
+        signature = str(payload.get("signature") or "").strip()
+        if not signature or signature in rows:
+            continue
+        rows[signature] = _raw_row(signature, payload)
+        events_by_signature[signature] = events
+
     if _db_available():
-        with psycopg.connect(_dsn(), autocommit=True) as conn:
+        # One connection and one transaction per refresh: raw rows, their
+        # events and the cursors that point past them land together.
+        with psycopg.connect(_dsn()) as conn:
             _ensure_schema(conn)
-            conn.execute(
+            inserted: set[str] = set()
+            ordered = list(rows.values())
+            for start in range(0, len(ordered), INGEST_BATCH_SIZE):
+                inserted |= _insert_raw_batch(conn, ordered[start : start + INGEST_BATCH_SIZE])
+            new_events = [
+                event
+                for signature in rows
+                if signature in inserted
+                for event in events_by_signature[signature]
+            ]
+            event_rows = [_event_row(event) for event in new_events]
+            with conn.cursor() as cur:
+                if event_rows:
+                    cur.executemany(
+                        """
+                        INSERT INTO sparky_solana_events (
+                            star, impact_level, event, source_signature, valid_from
+                        ) VALUES (%s, %s, %s, %s, %s);
+                        """,
+                        event_rows,
+                    )
+                if cursors:
+                    cur.executemany(
+                        """
+                        INSERT INTO sparky_solana_cursors (key, cursor, updated_at)
+                        VALUES (%s, %s, now())
+                        ON CONFLICT (key)
+                        DO UPDATE SET cursor = EXCLUDED.cursor, updated_at = now();
+                        """,
+                        [(key, json.dumps(cursor)) for key, cursor in cursors.items()],
+                    )
+            _update_star_state(conn, new_events, len(inserted))
+            conn.commit()
+        return len(inserted), len(event_rows)
+    if _sqlite_available():
+        return sqlite_storage.record_ingest(
+            [
+                (row, [_event_row(event) for event in events_by_signature[signature]])
+                for signature, row in rows.items()
+            ],
+            cursors,
+        )
+
+    raw_added = 0
+    events_added = 0
+    for payload, _ in entries:
+        signature = str(payload.get("signature") or "").strip()
+        if signature not in rows or signature in _MEMORY["raw"]:
+            continue
+        _MEMORY["raw"][signature] = payload
+        _MEMORY["events"].extend(events_by_signature[signature])
+        raw_added += 1
+        events_added += len(events_by_signature[signature])
+    if cursors:
+        _MEMORY.setdefault("cursor", {}).update(cursors)
+    return raw_added, events_added
+
+
+def compact_raw_events(
+    batch_size: int = COMPACT_BATCH_SIZE,
+    on_batch: Callable[[int], None] | None = None,
+) -> int:
+    if not _db_available():
+        return 0
+    compacted = 0
+    with psycopg.connect(_dsn()) as conn:
+        _ensure_schema(conn)
+        conn.commit()
+        while True:
+            rows = conn.execute(
                 """
-                INSERT INTO sparky_solana_events (
-                    star, impact_level, event, source_signature, valid_from
-                ) VALUES (%s, %s, %s, %s, %s);
+                SELECT signature, (payload->'raw')::text
+                FROM sparky_solana_raw_events
+                WHERE tx_blob IS NULL AND payload IS NOT NULL
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED;
                 """,
-                (
-                    event.get("star"),
-                    int(event.get("impact_level", 0)),
-                    json.dumps(event),
-                    (event.get("source_refs") or [None])[0],
-                    event.get("valid_from"),
-                ),
-            )
+                (batch_size,),
+            ).fetchall()
+            if not rows:
+                conn.commit()
+                break
+            updates = []
+            for signature, raw_text in rows:
+                blob, codec = encode_raw(json.loads(raw_text) if raw_text else None)
+                updates.append((blob, codec, signature))
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    UPDATE sparky_solana_raw_events
+                    SET tx_blob = %s, tx_codec = %s,
+                        accounts = NULL, instructions = NULL, logs = NULL, payload = NULL
+                    WHERE signature = %s;
+                    """,
+                    updates,
+                )
+            conn.commit()
+            compacted += len(rows)
+            if on_batch is not None:
+                on_batch(compacted)
+    return compacted
+
+
+def replay_progress() -> Optional[Dict[str, Any]]:
+    return get_cursor("replay")
+
+
+def begin_replay(
+    fingerprint: str,
+    *,
+    resume: bool = True,
+) -> Tuple[Optional[Dict[str, Any]], str | None]:
+    if _sqlite_available():
+        return sqlite_storage.begin_replay(fingerprint, resume=resume), None
+    if not _db_available():
+        return None, "Replay requires a configured database."
+    with psycopg.connect(_dsn(), autocommit=True) as conn:
+        _ensure_schema(conn)
+        progress = get_cursor("replay") or {}
+        staged = conn.execute("SELECT to_regclass(%s)", (REPLAY_TABLE,)).fetchone()[0]
+        if (
+            resume
+            and staged is not None
+            and progress.get("status") == "running"
+            and progress.get("fingerprint") == fingerprint
+        ):
+            return progress, None
+
+        conn.execute(f"DROP TABLE IF EXISTS {REPLAY_TABLE};")
+        conn.execute(f"CREATE TABLE {REPLAY_TABLE} ({_EVENTS_COLUMNS});")
+        total = conn.execute("SELECT value FROM sparky_solana_totals WHERE key = 'raw'").fetchone()
+        progress = {
+            "status": "running",
+            "generation": int(progress.get("generation") or 0) + 1,
+            "fingerprint": fingerprint,
+            "last_slot": -2,
+            "last_signature": "",
+            "processed": 0,
+            "events": 0,
+            "total": int(total[0]) if total else 0,
+            "started_at": time.time(),
+        }
+    set_cursor("replay", progress)
+    return progress, None
+
+
+def iter_replay_batches(
+    progress: Dict[str, Any],
+    batch_size: int,
+) -> Iterator[List[ReplayRow]]:
+    if _sqlite_available():
+        yield from sqlite_storage.iter_replay_batches(progress, batch_size)
         return
-
-    _MEMORY["events"].append(event)
+    with psycopg.connect(_dsn()) as conn:
+        with conn.cursor(name="sparky_solana_replay") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                """
+                SELECT signature, COALESCE(slot, -1), tx_blob, tx_codec,
+                       (payload->'raw')::text, created_at
+                FROM sparky_solana_raw_events
+                WHERE (COALESCE(slot, -1), signature) > (%s, %s)
+                ORDER BY COALESCE(slot, -1), signature;
+                """,
+                (progress["last_slot"], progress["last_signature"]),
+            )
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+
+
+def _replay_rows(
+    batch: List[ReplayRow],
+    derived: List[List[Dict[str, Any]]],
+) -> List[Tuple[Any, ...]]:
+    return [
+        _event_row(event) + (row[-1],)
+        for row, events in zip(batch, derived)
+        for event in events
+    ]
+
+
+def _insert_replay_events(conn: Any, rows: List[Tuple[Any, ...]]) -> int:
+    if rows:
+        with conn.cursor() as cur:
+            cur.executemany(
+                f"""
+                INSERT INTO {REPLAY_TABLE} (
+                    star, impact_level, event, source_signature, valid_from, created_at
+                ) VALUES (%s, %s, %s, %s, %s, %s);
+                """,
+                rows,
+            )
+    return len(rows)
+
+
+def write_replay_batch(
+    progress: Dict[str, Any],
+    batch: List[ReplayRow],
+    derived: List[List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    if _sqlite_available():
+        return sqlite_storage.write_replay_batch(
+            progress, batch, _replay_rows(batch, derived)
+        )
+    progress = dict(progress)
+    with psycopg.connect(_dsn()) as conn:
+        # Events and the resume position commit together, so a crash never
+        # double-writes or skips a batch.
+        added = _insert_replay_events(conn, _replay_rows(batch, derived))
+        progress["last_slot"] = batch[-1][1]
+        progress["last_signature"] = batch[-1][0]
+        progress["processed"] += len(batch)
+        progress["events"] += added
+        conn.execute(
+            """
+            INSERT INTO sparky_solana_cursors (key, cursor, updated_at)
+            VALUES ('replay', %s, now())
+            ON CONFLICT (key)
+            DO UPDATE SET cursor = EXCLUDED.cursor, updated_at = now();
+            """,
+            (json.dumps(progress),),
+        )
+        conn.commit()
+    return progress
+
+
+def finish_replay(
+    progress: Dict[str, Any],
+    derive: Callable[[List[ReplayRow]], List[List[Dict[str, Any]]]],
+) -> Dict[str, Any]:
+    if _sqlite_available():
+        return sqlite_storage.finish_replay(
+            progress, lambda tail: _replay_rows(tail, derive(tail))
+        )
+    progress = dict(progress)
+    with psycopg.connect(_dsn()) as conn:
+        # Block ingest while the rows written since the cursor opened are
+        # derived in place and the generations are swapped.
+        conn.execute("LOCK TABLE sparky_solana_raw_events IN SHARE MODE;")
+        conn.execute("LOCK TABLE sparky_solana_events IN ACCESS EXCLUSIVE MODE;")
+        tail = conn.execute(
+            """
+            SELECT signature, COALESCE(slot, -1), tx_blob, tx_codec,
+                   (payload->'raw')::text, created_at
+            FROM sparky_solana_raw_events
+            WHERE (COALESCE(slot, -1), signature) > (%s, %s)
+            ORDER BY COALESCE(slot, -1), signature;
+            """,
+            (progress["last_slot"], progress["last_signature"]),
+        ).fetchall()
+        # Rows written while the replay ran can sit below the cursor (backfill
+        # loads older slots). Those not yet derived into the new generation
+        # are picked up by insert time; the slack covers app/DB clock skew.
+        tail += conn.execute(
+            f"""
+            SELECT raw.signature, COALESCE(raw.slot, -1), raw.tx_blob, raw.tx_codec,
+                   (raw.payload->'raw')::text, raw.created_at
+            FROM sparky_solana_raw_events AS raw
+            WHERE raw.created_at >= to_timestamp(%s)
+              AND (COALESCE(raw.slot, -1), raw.signature) <= (%s, %s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM {REPLAY_TABLE} AS next
+                  WHERE next.source_signature = raw.signature
+              )
+            ORDER BY COALESCE(raw.slot, -1), raw.signature;
+            """,
+            (
+                float(progress.get("started_at") or 0) - REPLAY_CLOCK_SLACK_SECONDS,
+                progress["last_slot"],
+                progress["last_signature"],
+            ),
+        ).fetchall()
+        if tail:
+            progress["events"] += _insert_replay_events(
+                conn, _replay_rows(tail, derive(tail))
+            )
+            progress["processed"] += len(tail)
+
+        conn.execute(
+            f"""
+            CREATE INDEX idx_solana_events_star_created_next
+            ON {REPLAY_TABLE} (star, created_at DESC);
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE INDEX idx_solana_events_star_valid_next
+            ON {REPLAY_TABLE} (star, valid_from);
+            """
+        )
+        sequence = conn.execute(
+            "SELECT pg_get_serial_sequence(%s, 'id')",
+            (REPLAY_TABLE,),
+        ).fetchone()[0]
+        conn.execute("DROP TABLE sparky_solana_events;")
+        conn.execute(f"ALTER TABLE {REPLAY_TABLE} RENAME TO sparky_solana_events;")
+        conn.execute(
+            f"ALTER INDEX {REPLAY_TABLE}_pkey RENAME TO sparky_solana_events_pkey;"
+        )
+        conn.execute(
+            """
+            ALTER INDEX idx_solana_events_star_created_next
+            RENAME TO idx_solana_events_star_created;
+            """
+        )
+        conn.execute(
+            """
+            ALTER INDEX idx_solana_events_star_valid_next
+            RENAME TO idx_solana_events_star_valid;
+            """
+        )
+        if sequence:
+            conn.execute(f"ALTER SEQUENCE {sequence} RENAME TO sparky_solana_events_id_seq;")
+        _rebuild_star_state(conn)
+
+        progress["status"] = "done"
+        progress["finished_at"] = time.time()
+        conn.execute(
+            """
+            INSERT INTO sparky_solana_cursors (key, cursor, updated_at)
+            VALUES ('replay', %s, now())
+            ON CONFLICT (key)
+            DO UPDATE SET cursor = EXCLUDED.cursor, updated_at = now();
+            """,
+            (json.dumps(progress),),
+        )
+        conn.commit()
+    return progress
 
 
 def list_events(star: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -166,6 +735,8 @@ def list_events(star: str, limit: int = 20) -> List[Dict[str, Any]]:
                     payload = {"raw": payload}
             events.append(payload)
         return events
+    if _sqlite_available():
+        return sqlite_storage.list_events(star, limit)
 
     events = [event for event in _MEMORY["events"] if event.get("star") == star]
     events.sort(key=lambda item: item.get("valid_from") or "", reverse=True)
@@ -195,6 +766,8 @@ def list_recent_events(star: str, since: datetime) -> List[Dict[str, Any]]:
                     payload = {"raw": payload}
             events.append(payload)
         return events
+    if _sqlite_available():
+        return sqlite_storage.list_recent_events(star, since)
 
     events = []
     for event in _MEMORY["events"]:
@@ -231,6 +804,8 @@ def get_cursor(key: str) -> Optional[Dict[str, Any]]:
             except json.JSONDecodeError:
                 return None
         return payload
+    if _sqlite_available():
+        return sqlite_storage.get_cursor(key)
 
     return _MEMORY.get("cursor", {}).get(key)
 
@@ -249,6 +824,9 @@ def set_cursor(key: str, cursor: Dict[str, Any]) -> None:
                 (key, json.dumps(cursor)),
             )
         return
+    if _sqlite_available():
+        sqlite_storage.set_cursor(key, cursor)
+        return
 
     memory_cursor = _MEMORY.setdefault("cursor", {})
     memory_cursor[key] = cursor
@@ -260,6 +838,8 @@ def raw_count() -> int:
             _ensure_schema(conn)
             row = conn.execute("SELECT COUNT(*) FROM sparky_solana_raw_events").fetchone()
         return int(row[0]) if row else 0
+    if _sqlite_available():
+        return sqlite_storage.raw_count()
     return len(_MEMORY["raw"])
 
 
@@ -269,9 +849,80 @@ def event_count() -> int:
             _ensure_schema(conn)
             row = conn.execute("SELECT COUNT(*) FROM sparky_solana_events").fetchone()
         return int(row[0]) if row else 0
+    if _sqlite_available():
+        return sqlite_storage.event_count()
     return len(_MEMORY["events"])
 
 
+def star_states(stars: List[str], since: datetime) -> Dict[str, Dict[str, Any]]:
+    states: Dict[str, Dict[str, Any]] = {
+        star: {"history": [], "recent_count": 0} for star in stars
+    }
+    if _db_available():
+        # Whole hours come from the hourly counts; the hour `since` falls in
+        # is counted exactly from the events, so the window matches the
+        # other backends.
+        next_hour = _hour_bucket(since) + timedelta(hours=1)
+        with psycopg.connect(_dsn(), autocommit=True) as conn:
+            _ensure_schema(conn)
+            rows = conn.execute(
+                """
+                SELECT s.star,
+                       state.latest,
+                       COALESCE(
+                           (
+                               SELECT sum(count)
+                               FROM sparky_solana_star_counts
+                               WHERE star = s.star AND bucket >= %(next_hour)s
+                           ),
+                           0
+                       )
+                       + (
+                           SELECT count(*)
+                           FROM sparky_solana_events
+                           WHERE star = s.star
+                             AND valid_from >= %(since)s
+                             AND valid_from < %(next_hour)s
+                       )
+                FROM unnest(%(stars)s::text[]) AS s (star)
+                LEFT JOIN sparky_solana_star_state AS state ON state.star = s.star;
+                """,
+                {"since": since, "next_hour": next_hour, "stars": stars},
+            ).fetchall()
+        for star, latest, recent_count in rows:
+            if isinstance(latest, str):
+                try:
+                    latest = json.loads(latest)
+                except json.JSONDecodeError:
+                    latest = []
+            states[star] = {
+                "history": list(latest or []),
+                "recent_count": int(recent_count or 0),
+            }
+        return states
+    if _sqlite_available():
+        return sqlite_storage.star_states(stars, since, HISTORY_LIMIT)
+
+    for star in stars:
+        states[star] = {
+            "history": list_events(star, limit=HISTORY_LIMIT),
+            "recent_count": len(list_recent_events(star, since)),
+        }
+    return states
+
+
+def totals() -> Dict[str, int]:
+    if _db_available():
+        with psycopg.connect(_dsn(), autocommit=True) as conn:
+            _ensure_schema(conn)
+            rows = conn.execute("SELECT key, value FROM sparky_solana_totals").fetchall()
+        values = {key: int(value) for key, value in rows}
+        return {"raw": values.get("raw", 0), "events": values.get("events", 0)}
+    if _sqlite_available():
+        return sqlite_storage.totals()
+    return {"raw": len(_MEMORY["raw"]), "events": len(_MEMORY["events"])}
+
+
 def last_ingest_at() -> Optional[float]:
     cursor = get_cursor("last_ingest")
     if not cursor:
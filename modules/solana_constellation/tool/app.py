@@ -3,27 +3,15 @@ from __future__ import annotations
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from modules.solana_constellation.core.config import load_config
 from modules.solana_constellation.core.ingest import refresh_from_rpc
 from modules.solana_constellation.core.rpc import SolanaRpcError
-from modules.solana_constellation.core.storage import (
-    event_count,
-    last_ingest_at,
-    list_events,
-    list_recent_events,
-    raw_count,
-)
-from modules.solana_constellation.core.stars import (
-    STAR_DEFS,
-    STAR_ORDER,
-    build_risk_snapshot,
-    build_star_snapshot,
-    recent_window,
-)
+from modules.solana_constellation.core.snapshot import constellation_snapshot_json
+from modules.solana_constellation.core.stars import STAR_DEFS, STAR_ORDER
 from universe.settings import configure_templates, shared_templates_dir
 
 app = FastAPI(title="Solana Constellation")
@@ -42,33 +30,6 @@ if BRAND_DIR.exists():
     app.mount("/brand", StaticFiles(directory=BRAND_DIR), name="brand")
 
 
-def _constellation_snapshot() -> dict:
-    stars = []
-    for star_id in STAR_ORDER:
-        if star_id == "risk":
-            continue
-        history = list_events(star_id, limit=25)
-        recent = list_recent_events(star_id, since=recent_window(24 * 7))
-        stars.append(
-            build_star_snapshot(
-                star_id,
-                history,
-                recent_events=recent,
-            )
-        )
-    risk = build_risk_snapshot(stars)
-    stars.append(risk)
-    return {
-        "constellation": "solana",
-        "stars": stars,
-        "meta": {
-            "raw_events": raw_count(),
-            "canonical_events": event_count(),
-            "last_ingest_at": last_ingest_at(),
-        },
-    }
-
-
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request):
     base_path = request.url.path.rstrip("/")
@@ -84,7 +45,7 @@ def index(request: Request):
 
 @app.get("/api/stars")
 def api_stars():
-    return JSONResponse(_constellation_snapshot())
+    return Response(constellation_snapshot_json(), media_type="application/json")
 
 
 @app.post("/api/refresh")
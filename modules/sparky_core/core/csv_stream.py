@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+DELIMITERS = (",", ";", "\t", "|")
+SAMPLE_SIZE = 2048
+READ_CHUNK = 64 * 1024
+BLOCK_ROWS = 4096
+
+CsvSource = Union[str, bytes, bytearray, BinaryIO, Iterable[bytes]]
+
+
+class DefaultDialect(csv.Dialect):
+    delimiter = ","
+    quotechar = '"'
+    escapechar = None
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = "\n"
+    quoting = csv.QUOTE_MINIMAL
+
+
+_SNIFFED: Dict[Tuple[str, bool], type] = {}
+
+
+def _sniffed_dialect(delimiter: str, skipinitialspace: bool) -> type:
+    key = (delimiter, skipinitialspace)
+    dialect = _SNIFFED.get(key)
+    if dialect is None:
+        # Same attributes csv.Sniffer gives an unquoted sample.
+        class dialect(csv.Dialect):
+            _name = "sniffed"
+            lineterminator = "\r\n"
+            quoting = csv.QUOTE_MINIMAL
+
+        dialect.doublequote = False
+        dialect.delimiter = delimiter
+        dialect.quotechar = '"'
+        dialect.skipinitialspace = skipinitialspace
+        _SNIFFED[key] = dialect
+    return dialect
+
+
+def _fast_dialect(sample: str) -> type | None:
+    # Unquoted sample with one candidate delimiter on every line: the
+    # Sniffer's answer is fixed, so skip its per-character frequency tables.
+    if '"' in sample or "'" in sample:
+        return None
+    present = [delimiter for delimiter in DELIMITERS if delimiter in sample]
+    if len(present) != 1:
+        return None
+    delimiter = present[0]
+    lines = [line for line in sample.split("\n") if line]
+    count = lines[0].count(delimiter)
+    if any(line.count(delimiter) != count for line in lines):
+        return None
+    return _sniffed_dialect(delimiter, count == lines[0].count(f"{delimiter} "))
+
+
+@lru_cache(maxsize=256)
+def _sniff_sample(sample: str) -> Any:
+    fast = _fast_dialect(sample)
+    if fast is not None:
+        return fast
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=list(DELIMITERS))
+    except csv.Error:
+        return DefaultDialect()
+
+
+def sniff_dialect(sample: str) -> csv.Dialect:
+    return _sniff_sample(sample[:SAMPLE_SIZE])
+
+
+@lru_cache(maxsize=256)
+def _header_sample(sample: str) -> bool:
+    try:
+        return csv.Sniffer().has_header(sample)
+    except csv.Error:
+        return False
+
+
+def sniff_header(sample: str) -> bool:
+    return _header_sample(sample[:SAMPLE_SIZE])
+
+
+class _ChunkReader(io.RawIOBase):
+    def __init__(self, read: Callable[[int], bytes]) -> None:
+        self._read = read
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._pending or self._read(len(buffer))
+        if not data:
+            return 0
+        size = min(len(buffer), len(data))
+        buffer[:size] = data[:size]
+        self._pending = data[size:]
+        return size
+
+
+def iter_lines(source: CsvSource) -> Iterator[str]:
+    if isinstance(source, str):
+        yield from io.StringIO(source, newline="")
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        read: Callable[[int], bytes] = io.BytesIO(source).read
+    elif hasattr(source, "read"):
+        read = source.read
+    else:
+        chunks = iter(source)
+
+        def read(_size: int) -> bytes:
+            return next(chunks, b"")
+
+    # Incremental decoding keeps multi-byte characters intact across chunk
+    # boundaries; newline="" leaves quoted line breaks for the csv module.
+    # Closing the wrapper only closes _ChunkReader, never the caller's source.
+    yield from io.TextIOWrapper(
+        io.BufferedReader(_ChunkReader(read), READ_CHUNK),
+        encoding="utf-8",
+        errors="replace",
+        newline="",
+    )
+
+
+@dataclass
+class CsvInput:
+    dialect: Any
+    sample: str
+    rows: Iterator[List[str]]
+
+
+def open_csv(
+    source: CsvSource,
+    *,
+    dialect: Any = None,
+) -> Tuple[CsvInput | None, str | None]:
+    lines = iter_lines(source)
+    head: List[str] = []
+    size = 0
+    has_content = False
+    for line in lines:
+        head.append(line)
+        size += len(line)
+        has_content = has_content or bool(line.strip())
+        if has_content and size >= SAMPLE_SIZE:
+            break
+    if not has_content:
+        return None, "CSV is empty."
+
+    sample = "".join(head)[:SAMPLE_SIZE]
+    if dialect is None:
+        dialect = sniff_dialect(sample)
+
+    def all_lines() -> Iterator[str]:
+        yield from head
+        yield from lines
+
+    return CsvInput(dialect, sample, csv.reader(all_lines(), dialect=dialect)), None
+
+
+def non_blank(rows: Iterable[List[str]]) -> Iterator[List[str]]:
+    for row in rows:
+        if row and any(cell.strip() for cell in row):
+            yield row
+
+
+def split_header(
+    rows: Iterable[List[str]],
+    has_header: bool,
+) -> Tuple[List[str] | None, Iterator[List[str]]]:
+    rows = iter(rows)
+    if not has_header:
+        return None, rows
+    return next(rows, None), rows
+
+
+def open_rows(
+    source: CsvSource,
+    *,
+    has_header: bool,
+) -> Tuple[List[str] | None, Iterator[List[str]] | None, str | None]:
+    table, error = open_csv(source)
+    if error or table is None:
+        return None, None, error
+    header, rows = split_header(non_blank(table.rows), has_header)
+    return header, rows, None
+
+
+class RowLimit:
+    def __init__(self, rows: Iterable[List[str]], limit: int | None) -> None:
+        self._rows = iter(rows)
+        self.limit = limit
+        self.count = 0
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for row in self._rows:
+            if self.limit is not None and self.count >= self.limit:
+                # Only report truncation when a row was actually dropped.
+                self.truncated = True
+                return
+            self.count += 1
+            yield row
+
+
+class RowBlocks:
+    # Hands out rows a block at a time and tracks the table width, for scans
+    # that keep fixed-size state instead of the whole table.
+    def __init__(
+        self,
+        rows: Iterable[List[str]],
+        header: List[str] | None,
+        *,
+        max_cols: int | None = None,
+        block_rows: int = BLOCK_ROWS,
+    ) -> None:
+        self._rows = iter(rows)
+        self.header = header
+        self.max_cols = max_cols
+        self.block_rows = block_rows
+        self.width = len(header or [])
+        self.count = 0
+        self.error: str | None = None
+
+    def _too_wide(self) -> bool:
+        if self.max_cols is not None and self.width > self.max_cols:
+            self.error = f"Too many columns (limit {self.max_cols})."
+        return self.error is not None
+
+    def __iter__(self) -> Iterator[List[List[str]]]:
+        if self._too_wide():
+            return
+        while True:
+            block = list(itertools.islice(self._rows, self.block_rows))
+            if not block:
+                return
+            self.count += len(block)
+            self.width = max(self.width, max(map(len, block)))
+            if self._too_wide():
+                return
+            yield block
+
+    def names(self) -> List[str]:
+        return column_names(self.header, self.width)
+
+
+def column_names(header: List[str] | None, width: int) -> List[str]:
+    names = [cell.strip() or f"column_{idx + 1}" for idx, cell in enumerate(header or [])]
+    names.extend(f"column_{idx + 1}" for idx in range(len(names), width))
+    return names
+
+
+def read_table(
+    source: CsvSource,
+    *,
+    has_header: bool,
+    max_rows: int | None = None,
+    max_cols: int | None = None,
+) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
+    header, rows, error = open_rows(source, has_header=has_header)
+    if error or rows is None:
+        return None, None, False, error
+
+    limited = RowLimit(rows, max_rows)
+    return _named(header, list(limited), limited.truncated, max_cols)
+
+
+def limit_rows(
+    header: List[str] | None,
+    rows: List[List[str]],
+    *,
+    max_rows: int | None = None,
+    max_cols: int | None = None,
+) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
+    # Same result as read_table, for rows that were already read in full.
+    if max_rows is not None and len(rows) > max_rows:
+        return _named(header, rows[:max_rows], True, max_cols)
+    return _named(header, rows, False, max_cols)
+
+
+def _named(
+    header: List[str] | None,
+    data: List[List[str]],
+    truncated: bool,
+    max_cols: int | None,
+) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
+    width = max((len(row) for row in data), default=len(header or []))
+    names = column_names(header, width)
+    if max_cols is not None and len(names) > max_cols:
+        return None, None, False, f"Too many columns (limit {max_cols})."
+    return names, data, truncated, None
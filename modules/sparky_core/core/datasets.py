@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Hashable, List, Tuple, TypeVar
+
+from modules.sparky_core.core.csv_stream import (
+    SAMPLE_SIZE,
+    CsvSource,
+    limit_rows,
+    open_rows,
+    read_table,
+)
+from modules.sparky_core.core.structured_data import detect_format
+from modules.sparky_core.core.table import Table
+from modules.sparky_core.core.uploads import read_chunks
+
+T = TypeVar("T")
+
+TOKEN_LENGTH = 32
+SIZE_SAMPLE = 256
+
+_MISSING = object()
+_ENTRIES: "OrderedDict[Tuple[Hashable, ...], Tuple[Any, int]]" = OrderedDict()
+_STATE = {"bytes": 0}
+_GUARD = threading.Lock()
+
+
+@dataclass
+class Dataset:
+    token: str
+    raw: bytes
+    filename: str | None = None
+    content_type: str | None = None
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        value = default
+    return max(0, value)
+
+
+def cache_limit() -> int:
+    return _env_int("SPARKY_DATASET_CACHE_BYTES", 64_000_000)
+
+
+def spill_limit() -> int:
+    return _env_int("SPARKY_DATASET_SPILL_BYTES", 512_000_000)
+
+
+def spill_dir() -> Path | None:
+    raw = os.getenv("SPARKY_DATASET_SPILL_DIR", "").strip()
+    return Path(raw) if raw else None
+
+
+def dataset_token(raw: str | bytes | BinaryIO) -> str:
+    digest = hashlib.sha256()
+    if isinstance(raw, str):
+        digest.update(raw.encode("utf-8", "surrogatepass"))
+    elif isinstance(raw, (bytes, bytearray)):
+        digest.update(raw)
+    else:
+        for chunk in read_chunks(raw):
+            digest.update(chunk)
+        raw.seek(0)
+    return digest.hexdigest()[:TOKEN_LENGTH]
+
+
+def valid_token(token: str | None) -> bool:
+    return bool(token) and len(token) == TOKEN_LENGTH and all(
+        char in "0123456789abcdef" for char in token
+    )
+
+
+def _estimate_size(value: Any) -> int:
+    # Sampled, so sizing a large parsed table stays cheap; shared strings
+    # are counted once per cell, which errs on the side of evicting early.
+    if isinstance(value, Dataset):
+        return len(value.raw)
+    if isinstance(value, Table):
+        return _estimate_size(value.data) + _estimate_size(value.columns)
+    if isinstance(value, dict):
+        value = list(itertools.chain.from_iterable(value.items()))
+    if isinstance(value, (list, tuple)):
+        size = sys.getsizeof(value)
+        if value:
+            sample = value[:SIZE_SAMPLE]
+            size += sum(_estimate_size(item) for item in sample) * len(value) // len(sample)
+        return size
+    return sys.getsizeof(value)
+
+
+def _spill_path(directory: Path, key: Tuple[Hashable, ...]) -> Path:
+    name = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:40]
+    return directory / f"{name}.pickle"
+
+
+def _prune_spill(directory: Path) -> None:
+    files: List[Tuple[float, int, Path]] = []
+    for path in directory.glob("*.pickle"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    limit = spill_limit()
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+
+
+def _spill(key: Tuple[Hashable, ...], value: Any, size: int) -> None:
+    directory = spill_dir()
+    if directory is None:
+        return
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False)
+    except OSError:
+        return
+    try:
+        with handle:
+            pickle.dump((key, value, size), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(handle.name, _spill_path(directory, key))
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        try:
+            os.unlink(handle.name)
+        except OSError:
+            pass
+        return
+    _prune_spill(directory)
+
+
+def _unspill(key: Tuple[Hashable, ...]) -> Any:
+    directory = spill_dir()
+    if directory is None:
+        return _MISSING
+    path = _spill_path(directory, key)
+    try:
+        with path.open("rb") as handle:
+            stored_key, value, size = pickle.load(handle)
+        os.utime(path)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return _MISSING
+    if stored_key != key:
+        return _MISSING
+    _put(key, value, size)
+    return value
+
+
+def _put(key: Tuple[Hashable, ...], value: Any, size: int) -> None:
+    limit = cache_limit()
+    evicted: List[Tuple[Tuple[Hashable, ...], Any, int]] = []
+    with _GUARD:
+        previous = _ENTRIES.pop(key, None)
+        if previous is not None:
+            _STATE["bytes"] -= previous[1]
+        if size > limit:
+            evicted.append((key, value, size))
+        else:
+            _ENTRIES[key] = (value, size)
+            _STATE["bytes"] += size
+        while _STATE["bytes"] > limit and _ENTRIES:
+            old_key, (old_value, old_size) = _ENTRIES.popitem(last=False)
+            _STATE["bytes"] -= old_size
+            evicted.append((old_key, old_value, old_size))
+    # Spill outside the lock; pickling a large table takes a while.
+    for old_key, old_value, old_size in evicted:
+        _spill(old_key, old_value, old_size)
+
+
+def _get(key: Tuple[Hashable, ...]) -> Any:
+    with _GUARD:
+        entry = _ENTRIES.get(key)
+        if entry is not None:
+            _ENTRIES.move_to_end(key)
+            return entry[0]
+    return _unspill(key)
+
+
+def store_dataset(
+    raw: str | bytes,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> Dataset:
+    data = raw.encode("utf-8", "surrogatepass") if isinstance(raw, str) else bytes(raw)
+    dataset = Dataset(dataset_token(data), data, filename, content_type)
+    _put(("raw", dataset.token), dataset, len(data))
+    return dataset
+
+
+def store_upload(
+    handle: BinaryIO,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> Tuple[str, bool]:
+    # A spooled upload is hashed in chunks and parsed from the handle; its
+    # bytes are only read into memory and kept when they fit the cache.
+    token = dataset_token(handle)
+    size = handle.seek(0, os.SEEK_END)
+    handle.seek(0)
+    if size > cache_limit():
+        return token, False
+    data = b"".join(read_chunks(handle))
+    handle.seek(0)
+    _put(("raw", token), Dataset(token, data, filename, content_type), len(data))
+    return token, True
+
+
+def load_dataset(token: str | None) -> Tuple[Dataset | None, str | None]:
+    if not valid_token(token):
+        return None, "Unknown dataset token."
+    dataset = _get(("raw", token))
+    if dataset is _MISSING:
+        return None, "Dataset expired. Paste or upload the data again."
+    return dataset, None
+
+
+def cached_parse(token: str, key: Tuple[Hashable, ...], parse: Callable[[], T]) -> T:
+    # Parses are keyed by content hash plus the parse options, so a
+    # follow-up tool (or the same paste again) skips decoding and parsing.
+    entry_key = ("parsed", token) + key
+    value = _get(entry_key)
+    if value is _MISSING:
+        value = parse()
+        _put(entry_key, value, _estimate_size(value))
+    return value
+
+
+def _read_rows(
+    source: str | bytes, has_header: bool
+) -> Tuple[List[str] | None, List[List[str]] | None, str | None]:
+    header, rows, error = open_rows(source, has_header=has_header)
+    if error or rows is None:
+        return None, None, error
+    return header, list(rows), None
+
+
+def cached_read_table(
+    source: CsvSource,
+    *,
+    has_header: bool,
+    max_rows: int | None = None,
+    max_cols: int | None = None,
+) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
+    if not isinstance(source, (str, bytes, bytearray)):
+        return read_table(source, has_header=has_header, max_rows=max_rows, max_cols=max_cols)
+    # Rows are cached in full so tools with different limits share one parse;
+    # cached sources are already in memory, so they are bounded by the upload.
+    header, rows, error = cached_parse(
+        dataset_token(source),
+        ("csv", has_header),
+        lambda: _read_rows(source, has_header),
+    )
+    if error or rows is None:
+        return None, None, False, error
+    return limit_rows(header, rows, max_rows=max_rows, max_cols=max_cols)
+
+
+def resolve_csv_input(
+    csv_text: str | None,
+    token: str | None,
+) -> Tuple[str | bytes | None, str | None, str | None]:
+    # Pasted text wins and becomes the new dataset; otherwise the token
+    # from a previous step stands in for the upload.
+    if csv_text is not None and csv_text.strip():
+        return csv_text, store_dataset(csv_text).token, None
+    if not token:
+        return csv_text, None, None
+    dataset, error = load_dataset(token)
+    if error or dataset is None:
+        return None, None, error
+    head = dataset.raw[:SAMPLE_SIZE].decode("utf-8", errors="replace")
+    fmt = detect_format(head, filename=dataset.filename, content_type=dataset.content_type)
+    if fmt != "csv":
+        return None, None, "This dataset is not CSV; paste CSV data instead."
+    return dataset.raw, dataset.token, None
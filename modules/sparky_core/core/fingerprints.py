@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+import unicodedata
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+RUN_BLOCK = 4096
+POSITION_BITS = 40
+POSITION_MASK = (1 << POSITION_BITS) - 1
+_KEPT = 0
+
+
+def fingerprint_bits() -> int:
+    raw = os.getenv("SPARKY_DEDUPE_FINGERPRINT_BITS", "").strip()
+    return 128 if raw == "128" else 64
+
+
+def memory_keys() -> int:
+    raw = os.getenv("SPARKY_DEDUPE_MEMORY_KEYS", "").strip()
+    try:
+        value = int(raw) if raw else 1_000_000
+    except ValueError:
+        value = 1_000_000
+    return max(1, value)
+
+
+def normalizer(
+    *,
+    ignore_case: bool = False,
+    trim: bool = False,
+    unicode: bool = False,
+) -> Callable[[str], str] | None:
+    if not (ignore_case or trim or unicode):
+        return None
+
+    def normalize(value: str) -> str:
+        if unicode:
+            value = unicodedata.normalize("NFKC", value)
+        if trim:
+            value = value.strip()
+        if ignore_case:
+            value = value.lower()
+        return value
+
+    return normalize
+
+
+def text_fingerprint(value: str, bits: int) -> int:
+    digest = hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=bits // 8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+def cells_fingerprint(values: Sequence[str], bits: int) -> int:
+    # repr keeps ("a,b",) and ("a", "b") apart without an escaping pass.
+    return text_fingerprint(repr(tuple(values)), bits)
+
+
+@dataclass
+class DedupeStats:
+    total: int = 0
+    kept: int = 0
+    removed: int = 0
+    spilled_runs: int = 0
+
+
+def _write_run(items: List[int]) -> BinaryIO:
+    handle = tempfile.TemporaryFile()
+    items.sort()
+    for start in range(0, len(items), RUN_BLOCK):
+        pickle.dump(items[start : start + RUN_BLOCK], handle, protocol=pickle.HIGHEST_PROTOCOL)
+    handle.seek(0)
+    return handle
+
+
+def _read_run(handle: BinaryIO) -> Iterator[int]:
+    while True:
+        try:
+            block = pickle.load(handle)
+        except EOFError:
+            return
+        yield from block
+
+
+def _sorted_runs(values: Iterable[int], budget: int, stats: DedupeStats) -> List[BinaryIO]:
+    runs: List[BinaryIO] = []
+    buffer: List[int] = []
+    for value in values:
+        buffer.append(value)
+        if len(buffer) >= budget:
+            runs.append(_write_run(buffer))
+            buffer = []
+    if buffer:
+        runs.append(_write_run(buffer))
+    stats.spilled_runs += len(runs)
+    return runs
+
+
+def _kept_positions(
+    seen: Set[int],
+    fingerprints: Iterator[int],
+    start: int,
+    budget: int,
+    stats: DedupeStats,
+) -> Tuple[Iterator[int], List[BinaryIO]]:
+    # External sort of fingerprint and position packed into one int, so the
+    # sort buffer holds plain ints. Fingerprints already kept in memory go
+    # in under position 0 and sort first; for any other fingerprint the
+    # first position is kept.
+    runs = [_write_run([fingerprint << POSITION_BITS for fingerprint in seen])]
+    stats.spilled_runs += 1
+    seen.clear()
+    runs += _sorted_runs(
+        (
+            fingerprint << POSITION_BITS | position
+            for position, fingerprint in enumerate(fingerprints, start)
+        ),
+        budget,
+        stats,
+    )
+
+    def first_positions() -> Iterator[int]:
+        previous = None
+        for value in heapq.merge(*(_read_run(handle) for handle in runs)):
+            fingerprint = value >> POSITION_BITS
+            if fingerprint != previous:
+                previous = fingerprint
+                position = value & POSITION_MASK
+                if position != _KEPT:
+                    yield position
+
+    kept_runs = _sorted_runs(first_positions(), budget, stats)
+    return heapq.merge(*(_read_run(handle) for handle in kept_runs)), runs + kept_runs
+
+
+def dedupe_stream(
+    items: Iterable[T],
+    fingerprint: Callable[[T], int],
+    *,
+    reopen: Callable[[], Iterable[T]] | None = None,
+    stats: DedupeStats | None = None,
+    budget: int | None = None,
+) -> Iterator[T]:
+    # Keeps the first item per fingerprint, in input order. Only
+    # fingerprints are held; past `budget` of them the rest of the input is
+    # deduped by external sort and read a second time through `reopen`.
+    # Without `reopen` the set just keeps growing.
+    if stats is None:
+        stats = DedupeStats()
+    if budget is None:
+        budget = memory_keys()
+    seen: Set[int] = set()
+    iterator = iter(items)
+    for item in iterator:
+        stats.total += 1
+        value = fingerprint(item)
+        if value in seen:
+            stats.removed += 1
+            continue
+        seen.add(value)
+        stats.kept += 1
+        yield item
+        if reopen is not None and len(seen) >= budget:
+            break
+    else:
+        return
+
+    done = stats.total
+    # Positions start at 1 so they never collide with _KEPT.
+    rest = (fingerprint(item) for item in iterator)
+    positions, runs = _kept_positions(seen, rest, done + 1, budget, stats)
+    try:
+        next_kept = next(positions, None)
+        for position, item in enumerate(itertools.islice(reopen(), done, None), done + 1):
+            stats.total += 1
+            if position != next_kept:
+                stats.removed += 1
+                continue
+            stats.kept += 1
+            yield item
+            next_kept = next(positions, None)
+    finally:
+        for handle in runs:
+            handle.close()
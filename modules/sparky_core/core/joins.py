@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+JOIN_TYPES = ("inner", "left", "full", "anti")
+PARTITIONS = 16
+MAX_DEPTH = 3
+SPILL_BLOCK = 1024
+PARSED_GROWTH = 4
+
+Key = Tuple[str, ...]
+Row = List[str]
+Pair = Tuple[Row | None, Row | None]
+
+
+def memory_budget() -> int:
+    raw = os.getenv("SPARKY_JOIN_MEMORY_BYTES", "").strip()
+    try:
+        value = int(raw) if raw else 64_000_000
+    except ValueError:
+        value = 64_000_000
+    return max(1, value)
+
+
+def source_size(source: Any) -> int | None:
+    # Size of a pasted or uploaded source when it can be had without reading
+    # it; chunk iterators report None.
+    if isinstance(source, (str, bytes, bytearray)):
+        return len(source)
+    if hasattr(source, "seek") and hasattr(source, "tell"):
+        try:
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END)
+            source.seek(position)
+        except (OSError, ValueError):
+            return None
+        return size
+    return None
+
+
+def pick_build(left: Any, right: Any) -> str:
+    # The right side is the hash side by default, so output keeps the left
+    # order. The left takes over when it is the smaller input and the right
+    # would not fit the budget once parsed anyway.
+    left_size = source_size(left)
+    right_size = source_size(right)
+    if left_size is None or right_size is None or left_size >= right_size:
+        return "right"
+    return "left" if right_size * PARSED_GROWTH > memory_budget() else "right"
+
+
+def row_key(row: Sequence[str], columns: Sequence[int]) -> Key:
+    return tuple(row[idx] if idx < len(row) else "" for idx in columns)
+
+
+def _row_bytes(row: Sequence[str]) -> int:
+    # Rough CPython footprint of a list of short strings plus its dict slot.
+    return 120 + 57 * len(row) + sum(map(len, row))
+
+
+def _key_bytes(key: Key) -> int:
+    return 180 + 57 * len(key) + sum(map(len, key))
+
+
+class _Spill:
+    # Items routed to temp files by key hash; each level of a recursive
+    # split salts the hash so a skewed partition does not land in one file
+    # again.
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.files: List[BinaryIO] = [tempfile.TemporaryFile() for _ in range(PARTITIONS)]
+        self.buffers: List[List[Any]] = [[] for _ in range(PARTITIONS)]
+
+    def add(self, items: Iterable[Tuple[Key, Any]]) -> "_Spill":
+        depth = self.depth
+        buffers = self.buffers
+        for item in items:
+            index = hash((depth, item[0])) % PARTITIONS
+            buffer = buffers[index]
+            buffer.append(item)
+            if len(buffer) >= SPILL_BLOCK:
+                self._flush(index)
+        for index in range(PARTITIONS):
+            self._flush(index)
+        return self
+
+    def _flush(self, index: int) -> None:
+        if self.buffers[index]:
+            pickle.dump(self.buffers[index], self.files[index], protocol=pickle.HIGHEST_PROTOCOL)
+            self.buffers[index] = []
+
+    def read(self, index: int) -> Iterator[Tuple[Key, Any]]:
+        handle = self.files[index]
+        handle.seek(0)
+        while True:
+            try:
+                block = pickle.load(handle)
+            except EOFError:
+                return
+            yield from block
+
+    def close(self) -> None:
+        for handle in self.files:
+            handle.close()
+
+
+@dataclass
+class JoinStats:
+    matched: int = 0
+    left_unmatched: int = 0
+    right_unmatched: int = 0
+    left_width: int = 0
+    right_width: int = 0
+    partitions: int = 0
+
+
+def _keyed(
+    rows: Iterable[Row], columns: Sequence[int], stats: JoinStats, width: str
+) -> Iterator[Tuple[Key, Row]]:
+    # Tracks the widest row per side, so outer rows can be padded.
+    widest = getattr(stats, width)
+    for row in rows:
+        if len(row) > widest:
+            widest = len(row)
+            setattr(stats, width, widest)
+        yield row_key(row, columns), row
+
+
+def _probe(
+    table: Dict[Key, List[Row]],
+    probe: Iterable[Tuple[Key, Row]],
+    *,
+    build_is_left: bool,
+    how: str,
+    stats: JoinStats,
+) -> Iterator[Pair]:
+    pairs = how != "anti"
+    probe_outer = how == "full" or (not build_is_left and how in ("left", "anti"))
+    build_outer = how == "full" or (build_is_left and how in ("left", "anti"))
+    probe_side = "right_unmatched" if build_is_left else "left_unmatched"
+    build_side = "left_unmatched" if build_is_left else "right_unmatched"
+    matched: Set[Key] = set()
+
+    for key, row in probe:
+        matches = table.get(key)
+        if matches is None:
+            setattr(stats, probe_side, getattr(stats, probe_side) + 1)
+            if probe_outer:
+                yield (None, row) if build_is_left else (row, None)
+            continue
+        matched.add(key)
+        if not pairs:
+            continue
+        stats.matched += len(matches)
+        if build_is_left:
+            for other in matches:
+                yield other, row
+        else:
+            for other in matches:
+                yield row, other
+
+    for key, rows in table.items():
+        if key in matched:
+            continue
+        setattr(stats, build_side, getattr(stats, build_side) + len(rows))
+        if build_outer:
+            for row in rows:
+                yield (row, None) if build_is_left else (None, row)
+
+
+def _join(
+    build: Iterator[Tuple[Key, Row]],
+    probe: Iterable[Tuple[Key, Row]],
+    *,
+    build_is_left: bool,
+    how: str,
+    stats: JoinStats,
+    budget: int,
+    depth: int,
+) -> Iterator[Pair]:
+    table: Dict[Key, List[Row]] = {}
+    size = 0
+    for key, row in build:
+        rows = table.get(key)
+        if rows is None:
+            table[key] = [row]
+        else:
+            rows.append(row)
+        size += _row_bytes(row)
+        if size > budget and depth < MAX_DEPTH:
+            break
+    else:
+        yield from _probe(table, probe, build_is_left=build_is_left, how=how, stats=stats)
+        return
+
+    # Build side is over budget: grace hash join. Both sides are split by
+    # key hash so each partition pair can be joined on its own.
+    build_items = ((key, row) for key, rows in table.items() for row in rows)
+    build_spill = _Spill(depth).add(itertools.chain(build_items, build))
+    table = {}
+    probe_spill = _Spill(depth).add(probe)
+    stats.partitions += PARTITIONS
+    try:
+        for index in range(PARTITIONS):
+            yield from _join(
+                build_spill.read(index),
+                probe_spill.read(index),
+                build_is_left=build_is_left,
+                how=how,
+                stats=stats,
+                budget=budget,
+                depth=depth + 1,
+            )
+    finally:
+        build_spill.close()
+        probe_spill.close()
+
+
+def hash_join(
+    left_rows: Iterable[Row],
+    right_rows: Iterable[Row],
+    *,
+    left_key: Sequence[int],
+    right_key: Sequence[int],
+    how: str = "inner",
+    build: str = "right",
+    stats: JoinStats | None = None,
+    memory_bytes: int | None = None,
+) -> Iterator[Pair]:
+    # Yields (left, right) pairs, one per matching row pair, with None on
+    # the side an outer or anti row has no match on. Rows come out in probe
+    # order while the build side fits in memory, by partition otherwise.
+    if stats is None:
+        stats = JoinStats()
+    budget = memory_budget() if memory_bytes is None else memory_bytes
+    left = _keyed(left_rows, left_key, stats, "left_width")
+    right = _keyed(right_rows, right_key, stats, "right_width")
+    build_is_left = build == "left"
+    yield from _join(
+        left if build_is_left else right,
+        right if build_is_left else left,
+        build_is_left=build_is_left,
+        how=how,
+        stats=stats,
+        budget=budget,
+        depth=0,
+    )
+
+
+@dataclass
+class KeyOverlap:
+    left_unique: int = 0
+    right_unique: int = 0
+    matches: int = 0
+    left_only: int = 0
+    right_only: int = 0
+    rows: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(JOIN_TYPES, 0))
+    sample_matches: List[Key] = field(default_factory=list)
+    sample_left_only: List[Key] = field(default_factory=list)
+    sample_right_only: List[Key] = field(default_factory=list)
+
+
+def _tally(left: Counter, right: Counter, result: KeyOverlap, samples: int) -> None:
+    matches: List[Key] = []
+    left_only: List[Key] = []
+    inner = anti = 0
+    for key, count in left.items():
+        other = right.get(key)
+        if other is None:
+            left_only.append(key)
+            anti += count
+        else:
+            matches.append(key)
+            inner += count * other
+    right_only = [key for key in right if key not in left]
+    right_rows = sum(right[key] for key in right_only)
+
+    result.left_unique += len(left)
+    result.right_unique += len(right)
+    result.matches += len(matches)
+    result.left_only += len(left_only)
+    result.right_only += len(right_only)
+    result.rows["inner"] += inner
+    result.rows["left"] += inner + anti
+    result.rows["full"] += inner + anti + right_rows
+    result.rows["anti"] += anti
+    result.sample_matches = heapq.nsmallest(samples, result.sample_matches + matches)
+    result.sample_left_only = heapq.nsmallest(samples, result.sample_left_only + left_only)
+    result.sample_right_only = heapq.nsmallest(samples, result.sample_right_only + right_only)
+
+
+def _overlap(
+    left: Iterator[Tuple[Key, int]],
+    right: Iterator[Tuple[Key, int]],
+    result: KeyOverlap,
+    *,
+    samples: int,
+    budget: int,
+    depth: int,
+) -> None:
+    counts: List[Counter] = [Counter(), Counter()]
+    size = 0
+    for side, items in enumerate((left, right)):
+        counter = counts[side]
+        for key, count in items:
+            if key not in counter:
+                size += _key_bytes(key)
+            counter[key] += count
+            if size > budget and depth < MAX_DEPTH:
+                break
+        else:
+            continue
+        # Too many distinct keys: split both sides' counts by key hash.
+        left_spill = _Spill(depth).add(
+            itertools.chain(counts[0].items(), left if side == 0 else ())
+        )
+        right_spill = _Spill(depth).add(itertools.chain(counts[1].items(), right))
+        counts = []
+        try:
+            for index in range(PARTITIONS):
+                _overlap(
+                    left_spill.read(index),
+                    right_spill.read(index),
+                    result,
+                    samples=samples,
+                    budget=budget,
+                    depth=depth + 1,
+                )
+        finally:
+            left_spill.close()
+            right_spill.close()
+        return
+    _tally(counts[0], counts[1], result, samples)
+
+
+def key_overlap(
+    left_keys: Iterable[Key],
+    right_keys: Iterable[Key],
+    *,
+    samples: int = 5,
+    memory_bytes: int | None = None,
+) -> KeyOverlap:
+    # Key-level summary of a join, including the rows each join type would
+    # produce, from per-key counts rather than the rows themselves.
+    result = KeyOverlap()
+    _overlap(
+        ((key, 1) for key in left_keys),
+        ((key, 1) for key in right_keys),
+        result,
+        samples=samples,
+        budget=memory_budget() if memory_bytes is None else memory_bytes,
+        depth=0,
+    )
+    return result
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+from collections import Counter
+from dataclasses import dataclass
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+
+def normalize_number(raw: str) -> str:
+    compact = raw.strip().replace(" ", "")
+    if "," in compact and "." in compact:
+        last_comma = compact.rfind(",")
+        last_dot = compact.rfind(".")
+        if last_comma > last_dot:
+            compact = compact.replace(".", "")
+            compact = compact.replace(",", ".")
+        else:
+            compact = compact.replace(",", "")
+    elif "," in compact:
+        compact = compact.replace(",", ".")
+    return compact
+
+
+def to_float(normalized: str) -> float | None:
+    try:
+        value = float(normalized)
+    except ValueError:
+        return None
+    if value != value:
+        return None
+    return value
+
+
+def column_counts(rows: Sequence[Sequence[str]], index: int) -> Counter:
+    # Counter keeps first-appearance order, so per-distinct work can replay
+    # "first seen wins" rules without revisiting every cell.
+    try:
+        return Counter(map(itemgetter(index), rows))
+    except IndexError:
+        return Counter(row[index] if index < len(row) else "" for row in rows)
+
+
+@dataclass
+class SortedNumbers:
+    texts: List[str]
+    values: Any
+    ends: Any
+    count: int
+
+    def _slot(self, position: int) -> int:
+        if np is not None:
+            return int(np.searchsorted(self.ends, position, side="right"))
+        return bisect.bisect_right(self.ends, position)
+
+    def at(self, position: int) -> Decimal:
+        return Decimal(self.texts[self._slot(position)])
+
+    def median(self, start: int = 0, stop: int | None = None) -> Decimal:
+        stop = self.count if stop is None else stop
+        size = stop - start
+        mid = start + size // 2
+        if size % 2 == 1:
+            return self.at(mid)
+        return (self.at(mid - 1) + self.at(mid)) / Decimal(2)
+
+    def quartiles(self) -> Tuple[Decimal, Decimal]:
+        mid = self.count // 2
+        upper = mid if self.count % 2 == 0 else mid + 1
+        return self.median(0, mid), self.median(upper, self.count)
+
+    def sizes(self) -> List[int]:
+        if np is not None:
+            return np.diff(self.ends, prepend=0).tolist()
+        return [end - start for start, end in zip([0] + self.ends[:-1], self.ends)]
+
+    def outside(self, low: float, high: float, *, samples: int = 5) -> Tuple[int, List[str]]:
+        sizes = self.sizes()
+        if np is not None:
+            mask = (self.values < low) | (self.values > high)
+            total = int(np.asarray(sizes)[mask].sum())
+            slots = np.flatnonzero(mask)[:samples].tolist()
+        else:
+            slots = [idx for idx, value in enumerate(self.values) if value < low or value > high]
+            total = sum(sizes[idx] for idx in slots)
+        picked: List[str] = []
+        for slot in slots:
+            picked.extend([self.texts[slot]] * min(sizes[slot], samples - len(picked)))
+            if len(picked) >= samples:
+                break
+        return total, picked
+
+
+def sort_numbers(counts: Mapping[str, int], values: Mapping[str, float]) -> SortedNumbers:
+    texts = list(counts)
+    if np is not None:
+        floats = np.fromiter((values[text] for text in texts), dtype=np.float64, count=len(texts))
+        sizes = np.fromiter(counts.values(), dtype=np.int64, count=len(texts))
+        order = np.argsort(floats, kind="stable")
+        ends = np.cumsum(sizes[order])
+        return SortedNumbers(
+            [texts[idx] for idx in order.tolist()],
+            floats[order],
+            ends,
+            int(ends[-1]) if len(ends) else 0,
+        )
+    order = sorted(range(len(texts)), key=lambda idx: values[texts[idx]])
+    sorted_texts = [texts[idx] for idx in order]
+    ends = list(itertools.accumulate(counts[text] for text in sorted_texts))
+    return SortedNumbers(
+        sorted_texts,
+        [values[text] for text in sorted_texts],
+        ends,
+        ends[-1] if ends else 0,
+    )
+
+
+def extreme(values: Mapping[str, float]) -> Tuple[str | None, str | None]:
+    if not values:
+        return None, None
+    texts = list(values)
+    if np is not None:
+        floats = np.fromiter(values.values(), dtype=np.float64, count=len(texts))
+        return texts[int(floats.argmin())], texts[int(floats.argmax())]
+    low = min(range(len(texts)), key=lambda idx: values[texts[idx]])
+    high = max(range(len(texts)), key=lambda idx: (values[texts[idx]], -idx))
+    return texts[low], texts[high]
+
+
+def parse_counts(counts: Mapping[str, int]) -> Tuple[Dict[str, int], Dict[str, float]]:
+    # Parses each distinct cell once; returns normalized text -> count and
+    # normalized text -> float for the cells that are numbers.
+    numeric_counts: Dict[str, int] = {}
+    numeric_values: Dict[str, float] = {}
+    for raw, count in counts.items():
+        normalized = raw.strip()
+        if "," in normalized or " " in normalized:
+            normalized = normalize_number(normalized)
+        if normalized not in numeric_values:
+            value = to_float(normalized)
+            if value is None:
+                continue
+            numeric_values[normalized] = value
+        numeric_counts[normalized] = numeric_counts.get(normalized, 0) + count
+    return numeric_counts, numeric_values
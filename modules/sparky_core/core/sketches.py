@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import random
+from typing import Dict, Iterable, List, Set, Tuple
+
+HLL_PRECISION = 14
+KLL_K = 200
+CMS_WIDTH = 4096
+CMS_DEPTH = 4
+
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, values: Iterable[str]) -> None:
+        # blake2b rather than hash(), which is salted per process, so the
+        # same file always gets the same estimate.
+        shift = 64 - self.precision
+        mask = (1 << shift) - 1
+        registers = self.registers
+        blake2b = hashlib.blake2b
+        for value in values:
+            digest = blake2b(value.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+            hashed = int.from_bytes(digest, "little")
+            slot = hashed >> shift
+            rank = shift - (hashed & mask).bit_length() + 1
+            if rank > registers[slot]:
+                registers[slot] = rank
+
+    def count(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        zeros = self.registers.count(0)
+        if zeros:
+            # Linear counting is the better estimate while registers are sparse.
+            linear = size * math.log(size / zeros)
+            if linear <= 3 * size:
+                return round(linear)
+        return round(alpha * size * size / sum(map(_INVERSE_POWERS.__getitem__, self.registers)))
+
+
+class DistinctCounter:
+    # Exact until `limit` distinct values, then a HyperLogLog estimate, so
+    # small columns keep exact answers and large ones stay in fixed memory.
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.seen: Set[str] = set()
+        self.sketch: HyperLogLog | None = None
+
+    @property
+    def exact(self) -> bool:
+        return self.sketch is None
+
+    @property
+    def relative_error(self) -> float:
+        return 0.0 if self.sketch is None else self.sketch.relative_error
+
+    def update(self, values: Iterable[str]) -> None:
+        if self.sketch is not None:
+            self.sketch.update(values)
+            return
+        self.seen.update(values)
+        if len(self.seen) > self.limit:
+            self.sketch = HyperLogLog()
+            self.sketch.update(self.seen)
+            self.seen = set()
+
+    def count(self) -> int:
+        if self.sketch is None:
+            return len(self.seen)
+        return max(self.sketch.count(), self.limit + 1)
+
+
+class KllSketch:
+    def __init__(self, k: int = KLL_K, *, seed: int = 0) -> None:
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.count = 0
+        self._random = random.Random(seed)
+
+    @property
+    def rank_error(self) -> float:
+        # Normalized rank error at ~99% confidence for this k.
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def update(self, value: float, weight: int = 1) -> None:
+        # An item on level L stands for 2**L copies, so a repeated value is
+        # inserted once per set bit of its weight instead of once per copy.
+        self.count += weight
+        level = 0
+        while weight:
+            if weight & 1:
+                self._insert(level, value)
+            weight >>= 1
+            level += 1
+
+    def _insert(self, level: int, value: float) -> None:
+        while len(self.levels) <= level:
+            self.levels.append([])
+        self.levels[level].append(value)
+        while len(self.levels[level]) >= self._capacity(level):
+            items = sorted(self.levels[level])
+            keep = [items.pop(self._random.randrange(len(items)))] if len(items) % 2 else []
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            self.levels[level + 1].extend(items[self._random.randrange(2) :: 2])
+            self.levels[level] = keep
+            level += 1
+
+    def _weighted(self) -> List[Tuple[float, int]]:
+        return sorted(
+            (value, 1 << level) for level, values in enumerate(self.levels) for value in values
+        )
+
+    def quantile(self, fraction: float) -> float | None:
+        items = self._weighted()
+        if not items:
+            return None
+        target = fraction * self.count
+        total = 0
+        for value, weight in items:
+            total += weight
+            if total >= target:
+                return value
+        return items[-1][0]
+
+    def outside(self, low: float, high: float) -> int:
+        return sum(weight for value, weight in self._weighted() if value < low or value > high)
+
+
+class CountMinTopK:
+    # Count-min sketch (conservative update) plus a min-heap of the current
+    # heavy hitters; counts overestimate by at most error_rate * total with
+    # probability `confidence`.
+    def __init__(self, size: int, *, width: int = CMS_WIDTH, depth: int = CMS_DEPTH) -> None:
+        self.size = size
+        self.width = width
+        self.rows = [[0] * width for _ in range(depth)]
+        self.total = 0
+        self.candidates: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    @property
+    def error_rate(self) -> float:
+        return math.e / self.width
+
+    @property
+    def confidence(self) -> float:
+        return 1 - math.exp(-len(self.rows))
+
+    def add(self, value: str, count: int = 1) -> None:
+        # One independent 32-bit slice of the digest per row; deriving rows
+        # from two halves lets a pair of values collide in every row at once.
+        digest = hashlib.blake2b(
+            value.encode("utf-8", "surrogatepass"), digest_size=4 * len(self.rows)
+        ).digest()
+        slots = [
+            int.from_bytes(digest[offset : offset + 4], "little") % self.width
+            for offset in range(0, len(digest), 4)
+        ]
+        self.total += count
+        estimate = min(row[slot] for row, slot in zip(self.rows, slots)) + count
+        for row, slot in zip(self.rows, slots):
+            if row[slot] < estimate:
+                row[slot] = estimate
+
+        candidates = self.candidates
+        if value not in candidates and len(candidates) >= self.size:
+            floor, weakest = self._floor()
+            if estimate <= floor:
+                return
+            del candidates[weakest]
+            heapq.heappop(self._heap)
+        candidates[value] = estimate
+        heapq.heappush(self._heap, (estimate, value))
+        if len(self._heap) > 4 * self.size:
+            self._heap = [(kept, value) for value, kept in candidates.items()]
+            heapq.heapify(self._heap)
+
+    def _floor(self) -> Tuple[int, str]:
+        # Heap entries go stale when a candidate's estimate grows.
+        while True:
+            estimate, value = self._heap[0]
+            if self.candidates.get(value) == estimate:
+                return estimate, value
+            heapq.heappop(self._heap)
+
+    def top(self, count: int) -> List[Tuple[str, int]]:
+        return sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)[:count]
@@ -2,43 +2,26 @@ from __future__ import annotations
 
 import csv
 import io
+import itertools
 import json
 import zipfile
-from typing import Any, Dict, Iterable, List, Tuple
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple
 from xml.etree import ElementTree
 from xml.sax.saxutils import escape
 
+from modules.sparky_core.core.csv_stream import CsvSource, non_blank, open_csv, sniff_header
+from modules.sparky_core.core.table import Table
+from modules.sparky_core.core.uploads import read_chunks
+
 try:
     from openpyxl import Workbook, load_workbook
 except ImportError:  # pragma: no cover - optional dependency
     Workbook = None
     load_workbook = None
 
-
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
-
-
-def _has_header(raw_text: str, dialect: csv.Dialect) -> bool:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().has_header(sample)
-    except csv.Error:
-        return False
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_WRITE_BATCH = 1000
 
 
 def _clean_header(header: List[str]) -> List[str]:
@@ -98,19 +81,70 @@ def _column_letter(index: int) -> str:
 def _read_shared_strings(archive: zipfile.ZipFile) -> List[str]:
     if "xl/sharedStrings.xml" not in archive.namelist():
         return []
-    xml_data = archive.read("xl/sharedStrings.xml")
-    root = ElementTree.fromstring(xml_data)
-    ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
     strings: List[str] = []
-    for item in root.findall(f"{ns}si"):
-        parts = []
-        for node in item.findall(f".//{ns}t"):
-            if node.text:
-                parts.append(node.text)
-        strings.append("".join(parts))
+    with archive.open("xl/sharedStrings.xml") as handle:
+        for _, item in ElementTree.iterparse(handle):
+            if item.tag == f"{SHEET_NS}si":
+                strings.append("".join(node.text for node in item.iter(f"{SHEET_NS}t") if node.text))
+                item.clear()
     return strings
 
 
+def _cell_value(cell: ElementTree.Element, shared_strings: List[str]) -> Any:
+    cell_type = cell.get("t")
+    if cell_type == "s":
+        raw_value = cell.findtext(f"{SHEET_NS}v")
+        if raw_value is None:
+            return ""
+        try:
+            shared_index = int(raw_value)
+        except ValueError:
+            return ""
+        return shared_strings[shared_index] if shared_index < len(shared_strings) else ""
+    if cell_type == "inlineStr":
+        return "".join(node.text for node in cell.findall(f".//{SHEET_NS}t") if node.text)
+    if cell_type == "b":
+        return "TRUE" if cell.findtext(f"{SHEET_NS}v") == "1" else "FALSE"
+    raw_value = cell.findtext(f"{SHEET_NS}v")
+    return raw_value if raw_value is not None else ""
+
+
+class _SheetRows:
+    # Streams the first sheetData of a worksheet row by row; each row is
+    # cleared once read so the parsed tree never holds more than one.
+    def __init__(self, handle: BinaryIO, shared_strings: List[str]) -> None:
+        self._handle = handle
+        self._shared_strings = shared_strings
+        self.found = False
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        path: List[str] = []
+        sheet_data: ElementTree.Element | None = None
+        done = False
+        for event, elem in ElementTree.iterparse(self._handle, events=("start", "end")):
+            if event == "start":
+                path.append(elem.tag)
+                if len(path) == 2 and elem.tag == f"{SHEET_NS}sheetData" and not done:
+                    sheet_data = elem
+                    self.found = True
+                continue
+            path.pop()
+            if sheet_data is None:
+                continue
+            if elem is sheet_data:
+                sheet_data = None
+                done = True
+            elif len(path) == 2 and elem.tag == f"{SHEET_NS}row":
+                cell_map: Dict[int, Any] = {}
+                for idx, cell in enumerate(elem.findall(f"{SHEET_NS}c"), start=1):
+                    cell_ref = cell.get("r")
+                    col_index = _column_index(cell_ref) if cell_ref else idx
+                    cell_map[col_index] = _cell_value(cell, self._shared_strings)
+                sheet_data.clear()
+                if cell_map:
+                    yield [cell_map.get(idx, "") for idx in range(1, max(cell_map) + 1)]
+
+
 def _select_sheet_path(archive: zipfile.ZipFile) -> str | None:
     if "xl/worksheets/sheet1.xml" in archive.namelist():
         return "xl/worksheets/sheet1.xml"
@@ -131,222 +165,176 @@ def _looks_like_header_row(values: List[str]) -> bool:
     return has_alpha and unique
 
 
+def _sheet_table(rows: Iterable[List[Any]]) -> Tuple[Table, List[str], bool] | None:
+    # Blank rows are dropped but still count towards the sheet width, the
+    # way a sheet dimension does.
+    width = 0
+
+    def non_blank() -> Iterator[List[Any]]:
+        nonlocal width
+        for row in rows:
+            width = max(width, len(row))
+            if any(str(value).strip() for value in row):
+                yield row
+
+    kept = non_blank()
+    first = next(kept, None)
+    if first is None:
+        return None
+    header_detected = _looks_like_header_row(first)
+    if header_detected:
+        table = Table.from_ragged(kept, width=len(first))
+    else:
+        table = Table.from_ragged(itertools.chain([first], kept))
+    width = max(width, len(table.columns))
+    if header_detected:
+        header = _clean_header(first + [""] * (width - len(first)))
+    else:
+        header = [f"col_{idx}" for idx in range(1, width + 1)]
+    return table.renamed(header), header, header_detected
+
+
 def _parse_xlsx_openpyxl(
-    raw_bytes: bytes,
-) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, Any], str | None]:
+    source: BinaryIO,
+) -> Tuple[Table, List[str], Dict[str, Any], str | None]:
     if load_workbook is None:
-        return [], [], {}, "openpyxl not available."
+        return Table([], []), [], {}, "openpyxl not available."
     try:
-        workbook = load_workbook(io.BytesIO(raw_bytes), read_only=True, data_only=True)
+        workbook = load_workbook(source, read_only=True, data_only=True)
     except Exception:
-        return [], [], {}, "Invalid XLSX file."
+        return Table([], []), [], {}, "Invalid XLSX file."
 
     try:
         if not workbook.worksheets:
-            return [], [], {}, "XLSX does not contain any worksheets."
+            return Table([], []), [], {}, "XLSX does not contain any worksheets."
         sheet = workbook.worksheets[0]
-        max_cols = sheet.max_column or 0
-        if max_cols == 0:
-            return [], [], {}, "XLSX is empty."
-
-        rows_list: List[List[Any]] = []
-        for row in sheet.iter_rows(max_col=max_cols, values_only=True):
-            row_values = ["" if cell is None else str(cell) for cell in row]
-            if any(str(value).strip() for value in row_values):
-                rows_list.append(row_values)
-
-        if not rows_list:
-            return [], [], {}, "XLSX is empty."
-
-        header_values = [str(value) if value is not None else "" for value in rows_list[0]]
-        header_detected = _looks_like_header_row(header_values)
-        if header_detected:
-            header = _clean_header(header_values)
-            data_rows = rows_list[1:]
-        else:
-            header = [f"col_{idx}" for idx in range(1, max_cols + 1)]
-            data_rows = rows_list
-
-        rows: List[Dict[str, Any]] = []
-        for row in data_rows:
-            row_dict = {header[idx]: row[idx] if idx < len(row) else "" for idx in range(len(header))}
-            rows.append(row_dict)
+        # Sheets written without a dimension record (write-only workbooks)
+        # report no max_column; their rows stream ragged instead.
+        parsed = _sheet_table(
+            ["" if cell is None else str(cell) for cell in row]
+            for row in sheet.iter_rows(max_col=sheet.max_column or None, values_only=True)
+        )
+        if parsed is None:
+            return Table([], []), [], {}, "XLSX is empty."
+        table, header, header_detected = parsed
 
         report = {
             "format": "xlsx",
-            "row_count": len(rows),
+            "row_count": len(table),
             "column_count": len(header),
             "header_detected": header_detected,
             "sheet": sheet.title,
         }
-        return rows, header, report, None
+        return table, header, report, None
     finally:
         workbook.close()
 
 
 def parse_xlsx_bytes(
-    raw_bytes: bytes,
-) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, Any], str | None]:
+    raw_bytes: bytes | BinaryIO,
+) -> Tuple[Table, List[str], Dict[str, Any], str | None]:
+    source = io.BytesIO(raw_bytes) if isinstance(raw_bytes, (bytes, bytearray)) else raw_bytes
     if load_workbook is not None:
-        rows, header, report, error = _parse_xlsx_openpyxl(raw_bytes)
+        table, header, report, error = _parse_xlsx_openpyxl(source)
         if error is None:
-            return rows, header, report, None
+            return table, header, report, None
     try:
-        with zipfile.ZipFile(io.BytesIO(raw_bytes)) as archive:
+        with zipfile.ZipFile(source) as archive:
             sheet_path = _select_sheet_path(archive)
             if not sheet_path:
-                return [], [], {}, "XLSX does not contain any worksheets."
+                return Table([], []), [], {}, "XLSX does not contain any worksheets."
 
             shared_strings = _read_shared_strings(archive)
-            xml_data = archive.read(sheet_path)
-    except zipfile.BadZipFile:
-        return [], [], {}, "Invalid XLSX file."
-
-    root = ElementTree.fromstring(xml_data)
-    ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
-    sheet_data = root.find(f"{ns}sheetData")
-    if sheet_data is None:
-        return [], [], {}, "XLSX worksheet is empty."
-
-    row_dicts: List[Dict[int, Any]] = []
-    max_cols = 0
-    for row in sheet_data.findall(f"{ns}row"):
-        cell_map: Dict[int, Any] = {}
-        for idx, cell in enumerate(row.findall(f"{ns}c"), start=1):
-            cell_ref = cell.get("r")
-            col_index = _column_index(cell_ref) if cell_ref else idx
-            cell_type = cell.get("t")
-            value = ""
-            if cell_type == "s":
-                raw_value = cell.findtext(f"{ns}v")
-                if raw_value is not None:
-                    try:
-                        shared_index = int(raw_value)
-                        value = shared_strings[shared_index] if shared_index < len(shared_strings) else ""
-                    except ValueError:
-                        value = ""
-            elif cell_type == "inlineStr":
-                parts = []
-                for node in cell.findall(f".//{ns}t"):
-                    if node.text:
-                        parts.append(node.text)
-                value = "".join(parts)
-            elif cell_type == "b":
-                value = "TRUE" if cell.findtext(f"{ns}v") == "1" else "FALSE"
-            else:
-                raw_value = cell.findtext(f"{ns}v")
-                value = raw_value if raw_value is not None else ""
-            if value is None:
-                value = ""
-            cell_map[col_index] = value
-            if col_index > max_cols:
-                max_cols = col_index
-        if cell_map:
-            row_dicts.append(cell_map)
-
-    if not row_dicts:
-        return [], [], {}, "XLSX is empty."
-
-    rows_list: List[List[Any]] = []
-    for row_map in row_dicts:
-        row_values = [row_map.get(idx, "") for idx in range(1, max_cols + 1)]
-        if any(str(value).strip() for value in row_values):
-            rows_list.append(row_values)
-
-    if not rows_list:
-        return [], [], {}, "XLSX is empty."
-
-    header_values = [str(value) if value is not None else "" for value in rows_list[0]]
-    header_detected = _looks_like_header_row(header_values)
-    if header_detected:
-        header = _clean_header(header_values)
-        data_rows = rows_list[1:]
-    else:
-        header = [f"col_{idx}" for idx in range(1, max_cols + 1)]
-        data_rows = rows_list
-
-    rows: List[Dict[str, Any]] = []
-    for row in data_rows:
-        row_dict = {header[idx]: row[idx] if idx < len(row) else "" for idx in range(len(header))}
-        rows.append(row_dict)
+            with archive.open(sheet_path) as handle:
+                sheet = _SheetRows(handle, shared_strings)
+                parsed = _sheet_table(sheet)
+    except (zipfile.BadZipFile, ElementTree.ParseError):
+        return Table([], []), [], {}, "Invalid XLSX file."
+
+    if parsed is None:
+        if not sheet.found:
+            return Table([], []), [], {}, "XLSX worksheet is empty."
+        return Table([], []), [], {}, "XLSX is empty."
+    table, header, header_detected = parsed
 
     report = {
         "format": "xlsx",
-        "row_count": len(rows),
+        "row_count": len(table),
         "column_count": len(header),
         "header_detected": header_detected,
         "sheet": sheet_path.split("/")[-1].replace(".xml", ""),
     }
-    return rows, header, report, None
+    return table, header, report, None
 
 
-def _normalize_rows(data: Any) -> Tuple[List[Dict[str, Any]], List[str], str | None]:
+def _normalize_rows(data: Any) -> Tuple[Table, List[str], str | None]:
     if isinstance(data, dict) and "data" in data and isinstance(data["data"], list):
         data = data["data"]
 
     if isinstance(data, dict):
         columns = list(data.keys())
-        return [data], columns, None
+        return Table.from_records(columns, [data]), columns, None
 
     if isinstance(data, list):
         if not data:
-            return [], [], "No rows found."
+            return Table([], []), [], "No rows found."
         if all(isinstance(item, dict) for item in data):
             columns = _collect_columns(data)
-            return list(data), columns, None
+            return Table.from_records(columns, data), columns, None
         if all(isinstance(item, list) for item in data):
             max_len = max(len(item) for item in data)
             columns = [f"col_{idx}" for idx in range(1, max_len + 1)]
-            rows: List[Dict[str, Any]] = []
-            for item in data:
-                row = {columns[idx]: item[idx] if idx < len(item) else "" for idx in range(max_len)}
-                rows.append(row)
-            return rows, columns, None
+            return Table.from_rows(columns, data), columns, None
 
-    return [], [], "Unsupported JSON shape."
+    return Table([], []), [], "Unsupported JSON shape."
 
 
-def parse_json_text(raw_text: str) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, Any], str | None]:
+def parse_json_text(raw_text: str) -> Tuple[Table, List[str], Dict[str, Any], str | None]:
     try:
         data = json.loads(raw_text)
     except json.JSONDecodeError as exc:
-        return [], [], {}, f"Invalid JSON: {exc.msg}."
-    rows, columns, error = _normalize_rows(data)
-    report = {"format": "json", "row_count": len(rows), "column_count": len(columns)}
-    return rows, columns, report, error
-
-
-def parse_csv_text(raw_text: str) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, Any], str | None]:
-    if not raw_text.strip():
-        return [], [], {}, "CSV is empty."
-    dialect = _sniff_dialect(raw_text)
-    header_detected = _has_header(raw_text, dialect)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-
-    rows: List[Dict[str, Any]] = []
-    header: List[str] | None = None
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-        if header is None:
-            if header_detected:
-                header = _clean_header(row)
-                continue
-            header = [f"col_{idx}" for idx in range(1, len(row) + 1)]
-        row_dict = {header[idx]: row[idx] if idx < len(row) else "" for idx in range(len(header))}
-        rows.append(row_dict)
-
-    if header is None:
-        return [], [], {}, "CSV is empty."
+        return Table([], []), [], {}, f"Invalid JSON: {exc.msg}."
+    table, columns, error = _normalize_rows(data)
+    report = {"format": "json", "row_count": len(table), "column_count": len(columns)}
+    return table, columns, report, error
+
+
+def _open_csv_rows(
+    raw_text: CsvSource,
+) -> Tuple[List[str], Iterator[List[str]], Dict[str, Any], str | None]:
+    source, error = open_csv(raw_text)
+    if error or source is None:
+        return [], iter(()), {}, "CSV is empty."
+    dialect = source.dialect
+    header_detected = sniff_header(source.sample)
+
+    rows = non_blank(source.rows)
+    first = next(rows, None)
+    if first is None:
+        return [], iter(()), {}, "CSV is empty."
+    if header_detected:
+        header = _clean_header(first)
+    else:
+        header = [f"col_{idx}" for idx in range(1, len(first) + 1)]
+        rows = itertools.chain([first], rows)
 
     report = {
         "format": "csv",
-        "row_count": len(rows),
+        "row_count": 0,
         "column_count": len(header),
         "delimiter": getattr(dialect, "delimiter", ","),
         "header_detected": header_detected,
     }
-    return rows, header, report, None
+    return header, rows, report, None
+
+
+def parse_csv_text(raw_text: CsvSource) -> Tuple[Table, List[str], Dict[str, Any], str | None]:
+    header, rows, report, error = _open_csv_rows(raw_text)
+    if error:
+        return Table([], []), [], {}, error
+    table = Table.from_rows(header, rows)
+    report["row_count"] = len(table)
+    return table, header, report, None
 
 
 def detect_format(
@@ -377,12 +365,24 @@ def detect_format(
     return "csv"
 
 
+def _read_head(handle: BinaryIO) -> bytes:
+    head = b""
+    for chunk in read_chunks(handle, rewind=False):
+        head += chunk
+        if head.strip():
+            break
+    return head
+
+
 def parse_structured_text(
-    raw_text: str | bytes,
+    raw_text: str | bytes | BinaryIO,
     *,
     filename: str | None = None,
     content_type: str | None = None,
-) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, Any], str, str | None]:
+) -> Tuple[Table, List[str], Dict[str, Any], str, str | None]:
+    if not isinstance(raw_text, (str, bytes)):
+        return _parse_structured_file(raw_text, filename=filename, content_type=content_type)
+
     if isinstance(raw_text, bytes) and _looks_like_xlsx(filename, content_type):
         rows, columns, report, error = parse_xlsx_bytes(raw_text)
         return rows, columns, report, "xlsx", error
@@ -399,62 +399,145 @@ def parse_structured_text(
         if isinstance(raw_text, bytes):
             rows, columns, report, error = parse_xlsx_bytes(raw_text)
             return rows, columns, report, fmt, error
-        return [], [], {"format": "xlsx"}, fmt, "XLSX upload required."
-    return [], [], {"format": fmt}, fmt, "Unsupported format."
+        return Table([], []), [], {"format": "xlsx"}, fmt, "XLSX upload required."
+    return Table([], []), [], {"format": fmt}, fmt, "Unsupported format."
 
 
-def rows_to_csv(rows: List[Dict[str, Any]], columns: List[str]) -> str:
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=columns, lineterminator="\n")
-    writer.writeheader()
+def _parse_structured_file(
+    handle: BinaryIO,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> Tuple[Table, List[str], Dict[str, Any], str, str | None]:
+    # Uploads are read from their spooled file; CSV is decoded and parsed
+    # chunk by chunk and XLSX sheets row by row; only JSON needs the whole
+    # payload.
+    handle.seek(0)
+    if _looks_like_xlsx(filename, content_type):
+        rows, columns, report, error = parse_xlsx_bytes(handle)
+        return rows, columns, report, "xlsx", error
+
+    head = _read_head(handle)
+    fmt = detect_format(
+        head.decode("utf-8", errors="replace"),
+        filename=filename,
+        content_type=content_type,
+    )
+    if fmt == "csv":
+        rows, columns, report, error = parse_csv_text(
+            itertools.chain([head], read_chunks(handle, rewind=False))
+        )
+        return rows, columns, report, fmt, error
+    return parse_structured_text(
+        head + handle.read(), filename=filename, content_type=content_type
+    )
+
+
+@dataclass
+class RecordStream:
+    # Rows of an upload as dicts. CSV is read lazily, so report["row_count"]
+    # is only final once the records are exhausted; other formats are parsed
+    # up front.
+    columns: List[str]
+    records: Iterator[Dict[str, Any]]
+    report: Dict[str, Any]
+    fmt: str
+
+
+def _csv_records(
+    header: List[str], rows: Iterable[List[str]], report: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    width = len(header)
+    pad = [""] * width
+    count = 0
     for row in rows:
-        writer.writerow({col: row.get(col, "") for col in columns})
+        if len(row) < width:
+            row = row + pad[len(row) :]
+        count += 1
+        report["row_count"] = count
+        yield dict(zip(header, row))
+
+
+def open_records(
+    raw_text: str | bytes | BinaryIO,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> Tuple[RecordStream | None, str | None]:
+    source: CsvSource | None = None
+    if isinstance(raw_text, (str, bytes)):
+        if not (isinstance(raw_text, bytes) and _looks_like_xlsx(filename, content_type)):
+            text = raw_text.decode("utf-8", errors="replace") if isinstance(raw_text, bytes) else raw_text
+            if detect_format(text, filename=filename, content_type=content_type) == "csv":
+                source = text
+    elif not _looks_like_xlsx(filename, content_type):
+        raw_text.seek(0)
+        head = _read_head(raw_text)
+        fmt = detect_format(
+            head.decode("utf-8", errors="replace"),
+            filename=filename,
+            content_type=content_type,
+        )
+        if fmt == "csv":
+            source = itertools.chain([head], read_chunks(raw_text, rewind=False))
+
+    if source is None:
+        table, _, report, fmt, error = parse_structured_text(
+            raw_text, filename=filename, content_type=content_type
+        )
+        if error:
+            return None, error
+        return RecordStream(table.columns, (row.to_dict() for row in table), report, fmt), None
+
+    header, rows, report, error = _open_csv_rows(source)
+    if error:
+        return None, error
+    return RecordStream(header, _csv_records(header, rows, report), report, "csv"), None
+
+
+def _row_values(table: Table, columns: List[str], default: Any = "") -> Iterator[Tuple[Any, ...]]:
+    if not columns:
+        return iter([()] * len(table))
+    return zip(*(table.values(column, default) for column in columns))
+
+
+def rows_to_csv(table: Table, columns: List[str]) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(_row_values(table, columns))
     return output.getvalue()
 
 
-def rows_to_json(rows: List[Dict[str, Any]]) -> str:
-    return json.dumps(rows, ensure_ascii=True, indent=2)
+def rows_to_json(table: Table) -> str:
+    return json.dumps(table.records(), ensure_ascii=True, indent=2)
+
+
+def _sheet_row_xml(row_idx: int, values: Sequence[Any]) -> str:
+    cell_chunks = []
+    for col_idx, value in enumerate(values, start=1):
+        text = str(value) if value is not None else ""
+        if not text.strip():
+            continue
+        cell_ref = f"{_column_letter(col_idx)}{row_idx}"
+        safe = escape(text)
+        cell_chunks.append(
+            f'<c r="{cell_ref}" t="inlineStr"><is><t>{safe}</t></is></c>'
+        )
+    return f'<row r="{row_idx}">{"".join(cell_chunks)}</row>'
 
 
-def rows_to_xlsx_bytes(rows: List[Dict[str, Any]], columns: List[str]) -> bytes:
+def write_xlsx(table: Table, columns: List[str], output: BinaryIO) -> None:
     if Workbook is not None:
-        output = io.BytesIO()
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.title = "data"
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("data")
         sheet.append(columns)
-        for row in rows:
-            sheet.append([row.get(column, "") for column in columns])
+        for values in _row_values(table, columns):
+            sheet.append(list(values))
         workbook.save(output)
-        return output.getvalue()
+        return
 
-    sheet_rows = [columns]
-    for row in rows:
-        sheet_rows.append([row.get(column, "") for column in columns])
-
-    row_xml_chunks = []
-    for row_idx, values in enumerate(sheet_rows, start=1):
-        cell_chunks = []
-        for col_idx, value in enumerate(values, start=1):
-            text = str(value) if value is not None else ""
-            if not text.strip():
-                continue
-            cell_ref = f"{_column_letter(col_idx)}{row_idx}"
-            safe = escape(text)
-            cell_chunks.append(
-                f'<c r="{cell_ref}" t="inlineStr"><is><t>{safe}</t></is></c>'
-            )
-        row_xml = f'<row r="{row_idx}">{"".join(cell_chunks)}</row>'
-        row_xml_chunks.append(row_xml)
-
-    sheet_xml = (
-        '<?xml version="1.0" encoding="UTF-8"?>'
-        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
-        "<sheetData>"
-        f"{''.join(row_xml_chunks)}"
-        "</sheetData>"
-        "</worksheet>"
-    )
+    sheet_rows = itertools.chain([columns], _row_values(table, columns))
 
     content_types = (
         '<?xml version="1.0" encoding="UTF-8"?>'
@@ -496,57 +579,74 @@ def rows_to_xlsx_bytes(rows: List[Dict[str, Any]], columns: List[str]) -> bytes:
         "</Relationships>"
     )
 
-    output = io.BytesIO()
+    # Sheet XML goes into the zip entry in batches of rows instead of being
+    # built as one string.
     with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
         archive.writestr("[Content_Types].xml", content_types)
         archive.writestr("_rels/.rels", rels)
         archive.writestr("xl/workbook.xml", workbook)
         archive.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
-        archive.writestr("xl/worksheets/sheet1.xml", sheet_xml)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            for first_row in itertools.count(1, XLSX_WRITE_BATCH):
+                batch = list(itertools.islice(sheet_rows, XLSX_WRITE_BATCH))
+                if not batch:
+                    break
+                chunk = "".join(
+                    _sheet_row_xml(first_row + offset, values)
+                    for offset, values in enumerate(batch)
+                )
+                sheet.write(chunk.encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+
+
+def rows_to_xlsx_bytes(table: Table, columns: List[str]) -> bytes:
+    output = io.BytesIO()
+    write_xlsx(table, columns, output)
     return output.getvalue()
 
 
-def profile_rows(rows: List[Dict[str, Any]], columns: List[str]) -> Dict[str, Any]:
-    row_count = len(rows)
+def profile_rows(table: Table, columns: List[str]) -> Dict[str, Any]:
+    row_count = len(table)
     col_count = len(columns)
-    empty_rows = 0
     missing_cells = 0
+    row_empty = bytearray(b"\x01") * row_count
     column_stats: Dict[str, Dict[str, Any]] = {}
-    for column in columns:
-        column_stats[column] = {"missing": 0, "filled": 0, "samples": []}
-
-    for row in rows:
-        row_empty = True
-        for column in columns:
-            value = row.get(column)
-            if value is None or str(value).strip() == "":
-                missing_cells += 1
-                column_stats[column]["missing"] += 1
-            else:
-                row_empty = False
-                column_stats[column]["filled"] += 1
-                samples = column_stats[column]["samples"]
-                if len(samples) < 3:
-                    samples.append(str(value))
-        if row_empty:
-            empty_rows += 1
 
     for column in columns:
-        filled = column_stats[column]["filled"]
-        column_stats[column]["fill_rate"] = filled / row_count if row_count else 0
+        missing = 0
+        samples: List[str] = []
+        for index, value in enumerate(table.values(column)):
+            if value is None or str(value).strip() == "":
+                missing += 1
+                continue
+            row_empty[index] = 0
+            if len(samples) < 3:
+                samples.append(str(value))
+        filled = row_count - missing
+        missing_cells += missing
+        column_stats[column] = {
+            "missing": missing,
+            "filled": filled,
+            "samples": samples,
+            "fill_rate": filled / row_count if row_count else 0,
+        }
 
     return {
         "row_count": row_count,
         "column_count": col_count,
-        "empty_rows": empty_rows,
+        "empty_rows": sum(row_empty),
         "missing_cells": missing_cells,
         "columns": column_stats,
     }
 
 
-def row_signatures(rows: List[Dict[str, Any]], columns: List[str]) -> List[Tuple[str, ...]]:
-    signatures = []
-    for row in rows:
-        signature = tuple(str(row.get(col, "")).strip() for col in columns)
-        signatures.append(signature)
-    return signatures
+def row_signatures(table: Table, columns: List[str]) -> List[Tuple[str, ...]]:
+    if not columns:
+        return [()] * len(table)
+    stripped = ([str(value).strip() for value in table.values(column, "")] for column in columns)
+    return list(zip(*stripped))
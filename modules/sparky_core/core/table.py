@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+
+class _Absent:
+    # Pickles by reference, so spilled tables keep the identity checks.
+    __slots__ = ()
+
+    def __reduce__(self) -> str:
+        return "_ABSENT"
+
+
+_ABSENT = _Absent()
+
+SHARE_BLOCK = 4096
+SHARE_LIMIT = 4096
+
+
+def _share_block(
+    data: List[List[Any]],
+    shared: List[Dict[str, str] | None],
+    start: int,
+) -> None:
+    # Repeated cells in a low-cardinality column point at one string object;
+    # columns that turn out mostly unique stop paying for the lookup. Only
+    # strings are shared: 1, 1.0 and True hash alike but must stay apart.
+    for idx, values in enumerate(data):
+        cache = shared[idx]
+        if cache is None:
+            continue
+        values[start:] = [
+            cache.setdefault(value, value) if type(value) is str else value
+            for value in values[start:]
+        ]
+        if len(cache) > SHARE_LIMIT:
+            shared[idx] = None
+
+
+class RowView(Mapping):
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "Table", index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, column: str) -> Any:
+        position = self._table.position(column)
+        if position is None:
+            raise KeyError(column)
+        value = self._table.data[position][self._index]
+        if value is _ABSENT:
+            raise KeyError(column)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._index
+        for column, values in zip(self._table.columns, self._table.data):
+            if values[index] is not _ABSENT:
+                yield column
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        index = self._index
+        return {
+            column: values[index]
+            for column, values in zip(self._table.columns, self._table.data)
+            if values[index] is not _ABSENT
+        }
+
+
+class Table:
+    # One list per column under a shared header. Cells a JSON record did
+    # not have are stored as _ABSENT so records round-trip unchanged.
+    __slots__ = ("columns", "data", "row_count", "_positions")
+
+    def __init__(
+        self,
+        columns: List[str],
+        data: List[List[Any]],
+        row_count: int | None = None,
+    ) -> None:
+        self.columns = columns
+        self.data = data
+        if row_count is None:
+            row_count = len(data[0]) if data else 0
+        self.row_count = row_count
+        self._positions = {column: idx for idx, column in enumerate(columns)}
+
+    @classmethod
+    def from_rows(cls, columns: List[str], rows: Iterable[Sequence[Any]]) -> "Table":
+        width = len(columns)
+        data: List[List[Any]] = [[] for _ in range(width)]
+        appends = [values.append for values in data]
+        shared: List[Dict[str, str] | None] = [{} for _ in range(width)]
+        pad = [""] * width
+        row_count = 0
+        for row in rows:
+            if len(row) < width:
+                row = list(row) + pad[len(row) :]
+            for append, value in zip(appends, row):
+                append(value)
+            row_count += 1
+            if row_count % SHARE_BLOCK == 0:
+                _share_block(data, shared, row_count - SHARE_BLOCK)
+        _share_block(data, shared, row_count - row_count % SHARE_BLOCK)
+        return cls(columns, data, row_count)
+
+    @classmethod
+    def from_ragged(cls, rows: Iterable[Sequence[Any]], width: int = 0) -> "Table":
+        # For streamed sources whose width is only known at the end: columns
+        # are added as wider rows arrive, back-filled with "", and named
+        # col_N until the caller renames them.
+        data: List[List[Any]] = [[] for _ in range(width)]
+        appends: List[Any] = [values.append for values in data]
+        shared: List[Dict[str, str] | None] = [{} for _ in range(width)]
+        row_count = 0
+        for row in rows:
+            for _ in range(len(data), len(row)):
+                values = [""] * row_count
+                data.append(values)
+                appends.append(values.append)
+                shared.append({})
+            for idx, append in enumerate(appends):
+                append(row[idx] if idx < len(row) else "")
+            row_count += 1
+            if row_count % SHARE_BLOCK == 0:
+                _share_block(data, shared, row_count - SHARE_BLOCK)
+        _share_block(data, shared, row_count - row_count % SHARE_BLOCK)
+        columns = [f"col_{idx}" for idx in range(1, len(data) + 1)]
+        return cls(columns, data, row_count)
+
+    @classmethod
+    def from_records(cls, columns: List[str], records: Iterable[Dict[str, Any]]) -> "Table":
+        data: List[List[Any]] = [[] for _ in columns]
+        pairs = [(column, values.append) for column, values in zip(columns, data)]
+        row_count = 0
+        for record in records:
+            row_count += 1
+            for column, append in pairs:
+                append(record.get(column, _ABSENT))
+        return cls(columns, data, row_count)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __iter__(self) -> Iterator[RowView]:
+        for index in range(self.row_count):
+            yield RowView(self, index)
+
+    def renamed(self, columns: List[str]) -> "Table":
+        data = self.data + [[""] * self.row_count for _ in range(len(self.data), len(columns))]
+        return Table(columns, data, self.row_count)
+
+    def position(self, column: str) -> int | None:
+        return self._positions.get(column)
+
+    def row(self, index: int) -> RowView:
+        return RowView(self, index)
+
+    def values(self, column: str, default: Any = None) -> Iterator[Any]:
+        position = self._positions.get(column)
+        if position is None:
+            for _ in range(self.row_count):
+                yield default
+            return
+        for value in self.data[position]:
+            yield default if value is _ABSENT else value
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [row.to_dict() for row in self]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import BinaryIO, Iterator
+
+READ_CHUNK = 64 * 1024
+
+
+def spool_limit() -> int:
+    raw = os.getenv("SPARKY_UPLOAD_SPOOL_BYTES", "").strip()
+    try:
+        value = int(raw) if raw else 1_000_000
+    except ValueError:
+        value = 1_000_000
+    return max(0, value)
+
+
+def read_chunks(handle: BinaryIO, *, rewind: bool = True) -> Iterator[bytes]:
+    if rewind:
+        handle.seek(0)
+    while True:
+        chunk = handle.read(READ_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+class SpooledOutput:
+    # Text sink for csv.writer: kept in memory up to spool_limit(), then on
+    # disk, so results can be counted before the response starts streaming.
+    def __init__(self) -> None:
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_limit())
+
+    def write(self, text: str) -> int:
+        self._file.write(text.encode("utf-8"))
+        return len(text)
+
+    def binary(self) -> BinaryIO:
+        # For writers that produce bytes themselves (zip archives).
+        return self._file
+
+    def chunks(self) -> Iterator[bytes]:
+        try:
+            yield from read_chunks(self._file)
+        finally:
+            self._file.close()
+
+    def close(self) -> None:
+        self._file.close()
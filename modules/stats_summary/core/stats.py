@@ -1,29 +1,23 @@
 from __future__ import annotations
 
 import re
-from decimal import Decimal, InvalidOperation
+from collections import Counter
+from decimal import Decimal
 from typing import Dict, List, Tuple
 
+from modules.sparky_core.core.numeric import (
+    SortedNumbers,
+    normalize_number,
+    parse_counts,
+    sort_numbers,
+    to_float,
+)
 
-MAX_ITEMS = 1000
 
+MAX_ITEMS = 100_000
 
-def _normalize_number(value: str) -> str:
-    compact = value.strip().replace(" ", "")
-    if "," in compact and "." in compact:
-        last_comma = compact.rfind(",")
-        last_dot = compact.rfind(".")
-        if last_comma > last_dot:
-            compact = compact.replace(".", "")
-            compact = compact.replace(",", ".")
-        else:
-            compact = compact.replace(",", "")
-    elif "," in compact:
-        compact = compact.replace(",", ".")
-    return compact
 
-
-def _parse_decimal_list(raw: object) -> Tuple[List[Decimal] | None, str | None]:
+def _parse_number_list(raw: object) -> Tuple[SortedNumbers | None, str | None]:
     if raw is None:
         return None, "Numbers are required."
     text = str(raw).strip()
@@ -36,60 +30,50 @@ def _parse_decimal_list(raw: object) -> Tuple[List[Decimal] | None, str | None]:
     if len(tokens) > MAX_ITEMS:
         return None, f"Too many numbers (limit {MAX_ITEMS})."
 
-    values: List[Decimal] = []
-    for token in tokens:
-        normalized = _normalize_number(token)
-        try:
-            values.append(Decimal(normalized))
-        except (InvalidOperation, ValueError):
-            return None, f"Invalid number: {token}"
-    return values, None
-
-
-def _median(values: List[Decimal]) -> Decimal:
-    count = len(values)
-    mid = count // 2
-    if count % 2 == 1:
-        return values[mid]
-    return (values[mid - 1] + values[mid]) / Decimal(2)
+    counts = Counter(tokens)
+    numeric_counts, floats = parse_counts(counts)
+    if sum(numeric_counts.values()) != len(tokens):
+        for token in counts:
+            if to_float(normalize_number(token)) is None:
+                return None, f"Invalid number: {token}"
+    return sort_numbers(numeric_counts, floats), None
 
 
 def summarize_stats(raw: object) -> Tuple[Dict[str, object] | None, str | None]:
-    values, error = _parse_decimal_list(raw)
-    if error or values is None:
+    numbers, error = _parse_number_list(raw)
+    if error or numbers is None:
         return None, error
 
-    values.sort()
-    count = len(values)
-    total = sum(values, Decimal(0))
+    # Sums run over distinct values weighted by their counts, never one
+    # Decimal per item.
+    freq: Dict[Decimal, int] = {}
+    for text, size in zip(numbers.texts, numbers.sizes()):
+        value = Decimal(text)
+        freq[value] = freq.get(value, 0) + size
+    count = numbers.count
+    total = sum((value * size for value, size in freq.items()), Decimal(0))
     mean = total / Decimal(count)
-    median = _median(values)
+    median = numbers.median()
+    lowest = Decimal(numbers.texts[0])
+    highest = Decimal(numbers.texts[-1])
 
     if count == 1:
-        q1 = values[0]
-        q3 = values[0]
+        q1 = lowest
+        q3 = lowest
     else:
-        mid = count // 2
-        lower = values[:mid]
-        upper = values[mid:] if count % 2 == 0 else values[mid + 1 :]
-        q1 = _median(lower)
-        q3 = _median(upper)
+        q1, q3 = numbers.quartiles()
 
-    variance_pop = sum((value - mean) ** 2 for value in values) / Decimal(count)
+    squares = sum(((value - mean) ** 2 * size for value, size in freq.items()), Decimal(0))
+    variance_pop = squares / Decimal(count)
     stdev_pop = variance_pop.sqrt()
 
     if count > 1:
-        variance_sample = sum((value - mean) ** 2 for value in values) / Decimal(
-            count - 1
-        )
+        variance_sample = squares / Decimal(count - 1)
         stdev_sample = variance_sample.sqrt()
     else:
         variance_sample = None
         stdev_sample = None
 
-    freq: Dict[Decimal, int] = {}
-    for value in values:
-        freq[value] = freq.get(value, 0) + 1
     max_count = max(freq.values())
     if max_count == 1:
         modes: List[Decimal] = []
@@ -100,8 +84,8 @@ def summarize_stats(raw: object) -> Tuple[Dict[str, object] | None, str | None]:
     return {
         "count": count,
         "sum": str(total),
-        "min": str(values[0]),
-        "max": str(values[-1]),
+        "min": str(lowest),
+        "max": str(highest),
         "mean": str(mean),
         "median": str(median),
         "q1": str(q1),
@@ -1,23 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, BinaryIO, Dict, Tuple
 
 from modules.sparky_core.core.structured_data import (
     parse_structured_text,
     rows_to_csv,
     rows_to_json,
-    rows_to_xlsx_bytes,
+    write_xlsx,
 )
+from modules.sparky_core.core.uploads import SpooledOutput
 
 
 def translate_payload(
-    raw_text: str | bytes,
+    raw_text: str | bytes | BinaryIO,
     *,
     filename: str | None = None,
     content_type: str | None = None,
     output_format: str = "json",
-) -> Tuple[Dict[str, Any] | bytes | None, str | None, str]:
-    rows, columns, report, detected, error = parse_structured_text(
+) -> Tuple[Dict[str, Any] | SpooledOutput | None, str | None, str]:
+    table, columns, report, detected, error = parse_structured_text(
         raw_text,
         filename=filename,
         content_type=content_type,
@@ -29,19 +30,24 @@ def translate_payload(
     if normalized_format not in {"json", "csv", "xlsx"}:
         return None, "Output format must be json, csv, or xlsx.", "application/json"
     if normalized_format == "xlsx":
-        output_bytes = rows_to_xlsx_bytes(rows, columns)
+        workbook = SpooledOutput()
+        try:
+            write_xlsx(table, columns, workbook.binary())
+        except Exception:
+            workbook.close()
+            raise
         return (
-            output_bytes,
+            workbook,
             None,
             "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
-    output = rows_to_json(rows) if normalized_format == "json" else rows_to_csv(rows, columns)
+    output = rows_to_json(table) if normalized_format == "json" else rows_to_csv(table, columns)
     preview = output[:4000]
 
     result = {
         "detected_format": detected,
-        "rows": len(rows),
+        "rows": len(table),
         "columns": columns,
         "output_format": normalized_format,
         "output_preview": preview,
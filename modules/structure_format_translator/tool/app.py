@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import io
 import os
 from pathlib import Path
+from typing import BinaryIO
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from modules.sparky_core.core.uploads import SpooledOutput
 from modules.structure_format_translator.core.translate import translate_payload
 from universe.ads import attach_ads_globals
 from universe.flows import resolve_flow_links
@@ -52,15 +54,16 @@ async def translate(
     if not file and not (raw_text and raw_text.strip()):
         return JSONResponse({"error": "Upload a file or paste data."}, status_code=400)
 
-    payload_input: str | bytes = raw_text or ""
+    payload_input: str | BinaryIO = raw_text or ""
     filename = None
     content_type = None
     if file is not None:
         filename = file.filename
         content_type = file.content_type
-        payload_input = await file.read()
+        payload_input = file.file
 
-    payload, error, media_type = translate_payload(
+    payload, error, media_type = await run_in_threadpool(
+        translate_payload,
         payload_input,
         filename=filename,
         content_type=content_type,
@@ -68,10 +71,10 @@ async def translate(
     )
     if error:
         return JSONResponse({"error": error}, status_code=400)
-    if isinstance(payload, (bytes, bytearray)):
+    if isinstance(payload, SpooledOutput):
         filename_out = "translated.xlsx"
         return StreamingResponse(
-            io.BytesIO(payload),
+            payload.chunks(),
             media_type=media_type,
             headers={"Content-Disposition": f'attachment; filename="{filename_out}"'},
         )
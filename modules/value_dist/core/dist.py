@@ -1,75 +1,32 @@
 from __future__ import annotations
 
-import csv
-import io
-from typing import Dict, List, Tuple
+import itertools
+import math
+from typing import BinaryIO, Dict, List, Tuple
 
+from modules.sparky_core.core.csv_stream import RowBlocks, open_rows
+from modules.sparky_core.core.datasets import cached_read_table
+from modules.sparky_core.core.numeric import column_counts
+from modules.sparky_core.core.sketches import CountMinTopK, DistinctCounter
 
-MAX_ROWS = 5000
+
+MAX_ROWS = 500_000
 MAX_COLS = 200
 MAX_UNIQUE = 2000
+MIN_CANDIDATES = 64
 NULL_TOKENS = {"", "null", "none", "na", "n/a", "nan"}
 
 
-class _DefaultDialect(csv.Dialect):
-    delimiter = ","
-    quotechar = '"'
-    escapechar = None
-    doublequote = True
-    skipinitialspace = False
-    lineterminator = "\n"
-    quoting = csv.QUOTE_MINIMAL
-
-
-def _sniff_dialect(raw_text: str) -> csv.Dialect:
-    sample = raw_text[:2048]
-    try:
-        return csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-    except csv.Error:
-        return _DefaultDialect()
-
-
 def _is_null(value: str) -> bool:
     return value.strip().lower() in NULL_TOKENS
 
 
 def _read_csv(
-    raw_text: str, *, has_header: bool
+    raw_text: str | bytes | BinaryIO, *, has_header: bool
 ) -> Tuple[List[str] | None, List[List[str]] | None, bool, str | None]:
-    if not raw_text.strip():
-        return None, None, False, "CSV is empty."
-
-    dialect = _sniff_dialect(raw_text)
-    reader = csv.reader(io.StringIO(raw_text), dialect=dialect)
-    rows: List[List[str]] = []
-    header: List[str] | None = None
-    truncated = False
-
-    for row in reader:
-        if not row or not any(cell.strip() for cell in row):
-            continue
-        if header is None and has_header:
-            header = [cell.strip() or f"column_{idx + 1}" for idx, cell in enumerate(row)]
-            continue
-        rows.append(row)
-        if len(rows) >= MAX_ROWS:
-            truncated = True
-            break
-
-    if header is None:
-        max_cols = max((len(row) for row in rows), default=0)
-        header = [f"column_{idx + 1}" for idx in range(max_cols)]
-    else:
-        max_cols = max((len(row) for row in rows), default=len(header))
-        if max_cols > len(header):
-            header.extend(
-                f"column_{idx + 1}" for idx in range(len(header), max_cols)
-            )
-
-    if len(header) > MAX_COLS:
-        return None, None, False, f"Too many columns (limit {MAX_COLS})."
-
-    return header, rows, truncated, None
+    return cached_read_table(
+        raw_text, has_header=has_header, max_rows=MAX_ROWS, max_cols=MAX_COLS
+    )
 
 
 def _resolve_column(header: List[str], column_raw: str) -> Tuple[int | None, str | None]:
@@ -88,13 +45,91 @@ def _resolve_column(header: List[str], column_raw: str) -> Tuple[int | None, str
     return None, "Column name not found in header."
 
 
+def _stream_distribution(
+    raw_text: str | bytes | BinaryIO,
+    column: str,
+    *,
+    has_header: bool,
+    top_n: int,
+) -> Tuple[Dict[str, object] | None, str | None]:
+    header, rows, error = open_rows(raw_text, has_header=has_header)
+    if error or rows is None:
+        return None, error
+    blocks = RowBlocks(rows, header, max_cols=MAX_COLS)
+    stream = iter(blocks)
+    first = next(stream, None)
+    if blocks.error:
+        return None, blocks.error
+    column_idx, error = _resolve_column(blocks.names(), column)
+    if error or column_idx is None:
+        return None, error
+
+    # Counts stay exact until MAX_UNIQUE distinct values, then move to a
+    # count-min sketch that only remembers the heavy hitters.
+    counts: Dict[str, int] = {}
+    sketch: CountMinTopK | None = None
+    distinct = DistinctCounter(MAX_UNIQUE)
+    nulls = 0
+    for block in itertools.chain([first] if first else [], stream):
+        present: Dict[str, int] = {}
+        for value, count in column_counts(block, column_idx).items():
+            if _is_null(value):
+                nulls += count
+                continue
+            clean = value.strip()
+            present[clean] = present.get(clean, 0) + count
+        distinct.update(present)
+        for clean, count in present.items():
+            if sketch is not None:
+                sketch.add(clean, count)
+                continue
+            counts[clean] = counts.get(clean, 0) + count
+            if len(counts) > MAX_UNIQUE:
+                sketch = CountMinTopK(max(MIN_CANDIDATES, top_n * 4))
+                for seen, seen_count in counts.items():
+                    sketch.add(seen, seen_count)
+                counts = {}
+    if blocks.error:
+        return None, blocks.error
+
+    if sketch is None:
+        items = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        count_error, confidence = 0, 1.0
+    else:
+        items = sketch.top(top_n)
+        count_error = math.ceil(sketch.error_rate * sketch.total)
+        confidence = round(sketch.confidence, 4)
+
+    return {
+        "rows": blocks.count,
+        "column": blocks.names()[column_idx],
+        "column_index": column_idx + 1,
+        "unique_values": distinct.count(),
+        "unique_overflow": not distinct.exact,
+        "nulls": nulls,
+        "top_values": [{"value": value, "count": count} for value, count in items],
+        "other_count": 0,
+        "truncated": False,
+        "approximate": True,
+        "error_bounds": {
+            "unique_relative_error": round(distinct.relative_error, 4),
+            "count_error": count_error,
+            "count_confidence": confidence,
+        },
+    }, None
+
+
 def value_distribution(
-    raw_text: str,
+    raw_text: str | bytes | BinaryIO,
     column: str,
     *,
     has_header: bool = True,
     top_n: int = 10,
+    approximate: bool = False,
 ) -> Tuple[Dict[str, object] | None, str | None]:
+    if approximate:
+        return _stream_distribution(raw_text, column, has_header=has_header, top_n=top_n)
+
     header, rows, truncated, error = _read_csv(raw_text, has_header=has_header)
     if error or header is None or rows is None:
         return None, error
@@ -107,22 +142,17 @@ def value_distribution(
     other_count = 0
     nulls = 0
 
-    for row in rows:
-        value = row[column_idx] if column_idx < len(row) else ""
+    for value, count in column_counts(rows, column_idx).items():
         if _is_null(value):
-            nulls += 1
+            nulls += count
             continue
         clean = value.strip()
-        if not clean:
-            nulls += 1
-            continue
         if clean in counts:
-            counts[clean] += 1
+            counts[clean] += count
+        elif len(counts) < MAX_UNIQUE:
+            counts[clean] = count
         else:
-            if len(counts) < MAX_UNIQUE:
-                counts[clean] = 1
-            else:
-                other_count += 1
+            other_count += count
 
     items = sorted(counts.items(), key=lambda item: item[1], reverse=True)
     top_items = [
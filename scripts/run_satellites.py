@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from universe.satellites.runner import OrbitRunner, run_all_once
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run satellite orbits.")
+    parser.add_argument("--once", action="store_true", help="Run every orbit once and exit.")
+    args = parser.parse_args()
+
+    if args.once:
+        results = asyncio.run(run_all_once())
+        for satellite_id, ok in results.items():
+            print("Orbit", satellite_id, "ok" if ok else "failed")
+        return
+    asyncio.run(OrbitRunner().run_forever())
+
+
+if __name__ == "__main__":
+    main()
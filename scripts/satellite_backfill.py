@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+
+from universe.satellite_series import backfill_metrics
+from universe.satellites import list_satellites
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill the satellite metric series from stored snapshots.",
+    )
+    parser.add_argument(
+        "satellites",
+        nargs="*",
+        help="Satellite ids to backfill (default: every registered satellite).",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    satellites = args.satellites or [satellite["id"] for satellite in list_satellites()]
+    for satellite_id in satellites:
+        written = backfill_metrics(satellite_id, batch_size=max(1, args.batch_size))
+        print("Backfill", satellite_id, f"points={written}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from modules.solana_constellation.core.backfill import backfill_address
+
+
+def _time_arg(value: str) -> int:
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load historical transactions for Solana watch addresses.",
+    )
+    parser.add_argument("addresses", nargs="+", help="Addresses to backfill, one job each.")
+    parser.add_argument("--since-slot", type=int, default=None, help="Oldest slot to load.")
+    parser.add_argument("--until-slot", type=int, default=None, help="Newest slot to load.")
+    parser.add_argument("--since", type=_time_arg, default=None, help="Oldest block time (ISO or epoch).")
+    parser.add_argument("--until", type=_time_arg, default=None, help="Newest block time (ISO or epoch).")
+    parser.add_argument("--before", default=None, help="Start paging below this signature.")
+    parser.add_argument("--restart", action="store_true", help="Discard a saved checkpoint and start over.")
+    args = parser.parse_args()
+
+    def report(progress: Dict[str, Any]) -> None:
+        print(
+            "Backfill",
+            progress.get("address"),
+            f"status={progress.get('status')}",
+            f"pages={progress.get('pages')}",
+            f"signatures={progress.get('signatures')}",
+            f"transactions={progress.get('transactions')}",
+            f"missing={progress.get('missing')}",
+            f"oldest_slot={progress.get('oldest_slot')}",
+            flush=True,
+        )
+
+    failed = False
+    for address in args.addresses:
+        result = backfill_address(
+            address,
+            since_slot=args.since_slot,
+            until_slot=args.until_slot,
+            since_time=args.since,
+            until_time=args.until,
+            before=args.before,
+            resume=not args.restart,
+            on_progress=report,
+        )
+        print(
+            "Backfill",
+            address,
+            result.get("detail"),
+            f"raw_added={result.get('raw_added')}",
+            f"events_added={result.get('events_added')}",
+            flush=True,
+        )
+        failed = failed or not result.get("ok")
+    if failed:
+        raise SystemExit("Backfill stopped early; rerun to resume from the checkpoint.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+
+from modules.solana_constellation.core.storage import COMPACT_BATCH_SIZE, compact_raw_events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rewrite legacy Solana raw events into the compressed format.",
+    )
+    parser.add_argument("--batch-size", type=int, default=COMPACT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    total = compact_raw_events(
+        batch_size=args.batch_size,
+        on_batch=lambda done: print("Compacted", f"rows={done}", flush=True),
+    )
+    print("Raw compaction", f"rows={total}")
+
+
+if __name__ == "__main__":
+    main()
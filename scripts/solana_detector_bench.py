@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from modules.solana_constellation.core.config import load_config
+from modules.solana_constellation.core.detectors import (
+    compile_watch,
+    detect_events,
+    index_transaction,
+)
+from modules.solana_constellation.core.storage import decode_raw
+
+
+def _dsn() -> str | None:
+    return (
+        os.getenv("SPARKY_SOLANA_DSN")
+        or os.getenv("SPARKY_DB_DSN")
+        or os.getenv("DATABASE_URL")
+    )
+
+
+def _load_from_file(path: str, limit: int) -> List[Dict[str, Any]]:
+    transactions: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            transactions.append(item.get("raw", item))
+            if len(transactions) >= limit:
+                break
+    return transactions
+
+
+def _load_from_db(limit: int) -> List[Dict[str, Any]]:
+    dsn = _dsn()
+    if not dsn:
+        raise SystemExit("Missing SPARKY_SOLANA_DSN, SPARKY_DB_DSN or DATABASE_URL.")
+    try:
+        import psycopg
+    except Exception as exc:  # pragma: no cover - optional dependency
+        raise SystemExit("psycopg is required to read recorded transactions.") from exc
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        rows = conn.execute(
+            """
+            SELECT tx_blob, tx_codec, payload->'raw'
+            FROM sparky_solana_raw_events
+            ORDER BY slot DESC NULLS LAST
+            LIMIT %s;
+            """,
+            (limit,),
+        ).fetchall()
+    transactions: List[Dict[str, Any]] = []
+    for blob, codec, legacy in rows:
+        raw = decode_raw(blob, codec, legacy)
+        if raw:
+            transactions.append(raw)
+    return transactions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure detector throughput.")
+    parser.add_argument("--file", help="JSONL of recorded transactions (default: read the DB).")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.file:
+        transactions = _load_from_file(args.file, args.limit)
+    else:
+        transactions = _load_from_db(args.limit)
+    if not transactions:
+        raise SystemExit("No recorded transactions found.")
+
+    watch = compile_watch(load_config())
+    events = 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for position, entry in enumerate(transactions):
+            tx = index_transaction(str(position), entry)
+            events += len(detect_events(tx, watch))
+    elapsed = time.perf_counter() - start
+    processed = len(transactions) * args.rounds
+    print(
+        "Detector bench",
+        f"transactions={processed}",
+        f"events={events}",
+        f"seconds={elapsed:.3f}",
+        f"tx_per_second={processed / elapsed:.0f}",
+    )
+
+
+if __name__ == "__main__":
+    main()
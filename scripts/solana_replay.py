@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Dict
+
+from modules.solana_constellation.core.replay import REPLAY_BATCH_SIZE, replay_events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-derive Solana events from stored raw transactions.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Detector processes (default: CPU count).")
+    parser.add_argument("--batch-size", type=int, default=REPLAY_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Discard an unfinished replay and start over.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    baseline: Dict[str, int] = {}
+
+    def report(progress: Dict[str, Any]) -> None:
+        total = progress.get("total") or 0
+        done = progress.get("processed", 0)
+        baseline.setdefault("processed", done)
+        percent = f"{done / total * 100:.1f}%" if total else "-"
+        rate = (done - baseline["processed"]) / max(time.perf_counter() - started, 1e-6)
+        print(
+            "Replay",
+            f"generation={progress.get('generation')}",
+            f"status={progress.get('status')}",
+            f"processed={done}/{total}",
+            f"progress={percent}",
+            f"events={progress.get('events', 0)}",
+            f"rate={rate:.0f}/s",
+            flush=True,
+        )
+
+    result = replay_events(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        resume=not args.restart,
+        on_progress=report,
+    )
+    if not result.get("ok"):
+        raise SystemExit(result.get("detail") or "Replay failed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from universe import satellite_http
+
+BODY = b'{"rates": [1, 2, 3]}'
+ETAG = '"v1"'
+
+
+class _Server(ThreadingHTTPServer):
+    # Keep-alive handler threads must not hold up server_close.
+    daemon_threads = True
+    block_on_close = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen: list = []
+
+    def do_GET(self) -> None:
+        self.seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.path.startswith("/redirect"):
+            self._reply(302, b"", {"Location": "/etag"})
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self._reply(304, b"", {"ETag": ETAG})
+            return
+        body = BODY
+        headers = {"ETag": ETAG, "Content-Type": "application/json; charset=utf-8"}
+        if self.path.startswith("/gzip"):
+            body = gzip.compress(BODY)
+            headers["Content-Encoding"] = "gzip"
+        self._reply(200, body, headers)
+
+    def _reply(self, status: int, body: bytes, headers: dict) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    for name in ("SPARKY_SATELLITE_DB_DSN", "SPARKY_ADMIN_DB_DSN", "SPARKY_DB_DSN", "DATABASE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(satellite_http, "_CACHE", {})
+    _Handler.seen = []
+    httpd = _Server(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_revalidates_with_etag(server):
+    first = satellite_http.fetch(f"{server}/etag", user_agent="test")
+    assert first.status == 200
+    assert first.changed
+    assert first.json() == {"rates": [1, 2, 3]}
+
+    second = satellite_http.fetch(f"{server}/etag", user_agent="test")
+    assert second.status == 304
+    assert not second.changed
+    assert second.body == BODY
+    assert second.content_hash == first.content_hash
+    assert _Handler.seen == [("/etag", None), ("/etag", ETAG)]
+
+
+def test_fetch_decodes_gzip(server):
+    result = satellite_http.fetch(f"{server}/gzip", user_agent="test")
+    assert result.body == BODY
+    assert result.charset == "utf-8"
+
+
+def test_fetch_follows_redirects(server):
+    result = satellite_http.fetch(f"{server}/redirect", user_agent="test")
+    assert result.status == 200
+    assert result.url == f"{server}/redirect"
+    assert [path for path, _ in _Handler.seen] == ["/redirect", "/etag"]
+
+
+def test_fetch_many_reports_errors_per_url(server):
+    results = satellite_http.fetch_many(
+        [f"{server}/etag", "ftp://example.invalid/x"], user_agent="test"
+    )
+    assert results[0][0] is not None and results[0][1] is None
+    assert results[1][0] is None and "Unsupported URL scheme" in results[1][1]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.solana_constellation.core import endpoints, rpc
+
+
+class _Server(ThreadingHTTPServer):
+    # Keep-alive handler threads must not hold up server_close.
+    daemon_threads = True
+    block_on_close = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(payload)
+        mode = self.server.mode
+        if mode == "http429":
+            self._reply(429, {"error": "slow down"}, {"Retry-After": "7"})
+            return
+        if isinstance(payload, list):
+            if mode == "no-batch":
+                self._reply(200, {"jsonrpc": "2.0", "error": {"code": -32600}, "id": None})
+                return
+            self._reply(200, [self._item(entry, batch=True) for entry in payload])
+            return
+        self._reply(200, self._item(payload, batch=False))
+
+    def _item(self, entry: dict, *, batch: bool) -> dict:
+        signature = entry["params"][0]
+        if signature == "rate" and batch:
+            return {"jsonrpc": "2.0", "id": entry["id"], "error": {"code": 429}}
+        if signature == "bad" or (signature == "flaky" and batch):
+            return {"jsonrpc": "2.0", "id": entry["id"], "error": {"code": -32000}}
+        if signature == "unknown":
+            return {"jsonrpc": "2.0", "id": entry["id"], "result": None}
+        return {"jsonrpc": "2.0", "id": entry["id"], "result": {"signature": signature}}
+
+    def _reply(self, status: int, body, headers: dict | None = None) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _start(mode: str = "ok") -> ThreadingHTTPServer:
+    httpd = _Server(("127.0.0.1", 0), _Handler)
+    httpd.mode = mode
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    return httpd
+
+
+@pytest.fixture
+def rpc_servers(monkeypatch):
+    servers = []
+
+    def configure(*modes: str):
+        for mode in modes:
+            servers.append(_start(mode))
+        urls = ",".join(f"http://127.0.0.1:{httpd.server_address[1]}" for httpd in servers)
+        monkeypatch.setenv("SOLANA_RPC_URLS", urls)
+        monkeypatch.setenv("SOLANA_PUBLIC_RPC_FALLBACK", "off")
+        monkeypatch.delenv("SOLANA_RPC_FALLBACK_URLS", raising=False)
+        monkeypatch.delenv("HELIUS_API_KEY", raising=False)
+        monkeypatch.setattr(endpoints, "_MANAGER", endpoints.EndpointManager())
+        monkeypatch.setattr(endpoints.random, "choices", lambda population, **_: population[:1])
+        return servers
+
+    yield configure
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_batch_returns_results_in_request_order(rpc_servers):
+    (server,) = rpc_servers("ok")
+    results = rpc.get_transactions(["a", "unknown", "b"], batch_size=10)
+    assert results == [{"signature": "a"}, None, {"signature": "b"}]
+    assert len(server.requests) == 1
+
+
+def test_batch_error_items_fall_back_to_single_requests(rpc_servers):
+    (server,) = rpc_servers("ok")
+    results = rpc.get_transactions(["a", "flaky", "b"], batch_size=10)
+    assert results == [{"signature": "a"}, {"signature": "flaky"}, {"signature": "b"}]
+    assert isinstance(server.requests[0], list)
+    assert server.requests[1]["params"][0] == "flaky"
+
+
+def test_batch_item_that_keeps_failing_raises(rpc_servers):
+    rpc_servers("ok")
+    with pytest.raises(rpc.SolanaRpcError):
+        rpc.get_transactions(["a", "bad"], batch_size=10)
+
+
+def test_rate_limited_batch_item_raises(rpc_servers):
+    rpc_servers("ok")
+    with pytest.raises(rpc.SolanaRpcError, match="rate limited"):
+        rpc.get_transactions(["a", "rate"], batch_size=10)
+
+
+def test_batch_unsupported_falls_back_to_single_requests(rpc_servers):
+    (server,) = rpc_servers("no-batch")
+    results = rpc.get_transactions(["a", "b"], batch_size=10)
+    assert results == [{"signature": "a"}, {"signature": "b"}]
+    assert len(server.requests) == 3
+
+
+def test_http_429_backs_off_endpoint_and_fails_over(rpc_servers):
+    limited, healthy = rpc_servers("http429", "ok")
+    results = rpc.get_transactions(["a", "b"], batch_size=10)
+    assert results == [{"signature": "a"}, {"signature": "b"}]
+    assert len(limited.requests) == 1
+    health = {row["url"]: row for row in endpoints.endpoint_health()}
+    limited_row = health[f"http://127.0.0.1:{limited.server_address[1]}"]
+    assert limited_row["state"] == "closed"
+    assert 0 < limited_row["retry_after_in"] <= 7
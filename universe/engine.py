@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from importlib import import_module
 import json
 import logging
 import os
 import re
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 from urllib.parse import parse_qsl, urlencode, urlsplit
@@ -53,15 +55,14 @@ from universe.seo import (
     seo_site_json_ld,
     sitemap_xml,
 )
-from universe.satellite_finance_orbit import fetch_latest_snapshot
+from universe.satellite_finance_orbit import cached_latest_snapshot as cached_finance_snapshot
 from universe.satellite_crypto_orbit import (
-    ensure_latest_snapshot as ensure_crypto_snapshot,
+    latest_snapshot as cached_crypto_snapshot,
     refresh_token_valid as crypto_token_valid,
     run_crypto_orbit,
 )
 from universe.satellite_bavaria_holiday_orbit import (
-    ensure_latest_snapshot as ensure_bavaria_snapshot,
-    fetch_latest_snapshot as fetch_bavaria_snapshot,
+    cached_latest_snapshot as cached_bavaria_snapshot,
 )
 from universe.holiday_digest import (
     active_subscription_for_email as holiday_subscription_for_email,
@@ -92,11 +93,14 @@ from universe.monitoring import (
     stripe_configured,
     verify_stripe_event,
 )
+from universe.satellite_series import metric_range
 from universe.satellites import list_satellites
+from universe.satellites.runner import OrbitRunner, orbit_status, runner_enabled
 from universe.settings import configure_templates
 from universe.stations import get_station, list_stations
 from universe.telemetry import attach_telemetry
 from modules.solana_constellation.core.ingest import refresh_from_rpc
+from modules.solana_constellation.core.endpoints import endpoint_health as solana_endpoint_health
 from modules.solana_constellation.core.rpc import SolanaRpcError
 
 logger = logging.getLogger(__name__)
@@ -545,8 +549,20 @@ def import_attr(path: str) -> Any:
     return getattr(module, attr)
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    runner = OrbitRunner() if runner_enabled() else None
+    if runner is not None:
+        runner.start()
+    try:
+        yield
+    finally:
+        if runner is not None:
+            await runner.stop()
+
+
 def build_app() -> FastAPI:
-    app = FastAPI(title="Sparky Universe")
+    app = FastAPI(title="Sparky Universe", lifespan=_lifespan)
     mount_map = build_mount_map()
     admin_prefix = admin_path()
     app.add_middleware(WwwRedirectMiddleware)
@@ -790,6 +806,8 @@ def build_app() -> FastAPI:
                 "request": request,
                 "modules": items,
                 "satellites": list_satellites(),
+                "orbits": orbit_status(),
+                "rpc_endpoints": solana_endpoint_health(),
                 "overrides_source": overrides_source(),
                 "db_check": db_check,
                 "admin_base": admin_prefix,
@@ -926,7 +944,7 @@ def build_app() -> FastAPI:
 
     @app.get("/satellites/finance-orbit", response_class=HTMLResponse)
     def finance_orbit_public(request: Request):
-        snapshot, snapshot_error = fetch_latest_snapshot()
+        snapshot, snapshot_error = cached_finance_snapshot()
         data_entries = snapshot.get("data", []) if snapshot else []
         repo_entry = next(
             (item for item in data_entries if item.get("key") == "REPO_RATE"),
@@ -962,14 +980,14 @@ def build_app() -> FastAPI:
 
     @app.get("/satellites/finance-orbit/latest")
     def finance_orbit_latest():
-        snapshot, snapshot_error = fetch_latest_snapshot()
+        snapshot, snapshot_error = cached_finance_snapshot()
         if snapshot_error:
             raise HTTPException(status_code=503, detail=snapshot_error)
         return JSONResponse(snapshot or {})
 
     @app.get("/satellites/crypto-orbit", response_class=HTMLResponse)
     def crypto_orbit_public(request: Request):
-        snapshot, snapshot_error = ensure_crypto_snapshot()
+        snapshot, snapshot_error = cached_crypto_snapshot()
         data_entries = snapshot.get("data", []) if snapshot else []
         top_entry = data_entries[0] if data_entries else None
         snapshot_json = (
@@ -1002,11 +1020,42 @@ def build_app() -> FastAPI:
 
     @app.get("/satellites/crypto-orbit/latest")
     def crypto_orbit_latest():
-        snapshot, snapshot_error = ensure_crypto_snapshot()
+        snapshot, snapshot_error = cached_crypto_snapshot()
         if snapshot_error and not snapshot:
             raise HTTPException(status_code=503, detail=snapshot_error)
         return JSONResponse(snapshot or {})
 
+    @app.get("/satellites/{slug}/series")
+    def satellite_series(slug: str, metric: str, days: int = 30, bucket: int = 0):
+        satellite = next(
+            (item for item in list_satellites() if item.get("slug") == slug),
+            None,
+        )
+        if satellite is None:
+            raise HTTPException(status_code=404, detail="Unknown satellite")
+        days = max(1, min(days, 366))
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=days)
+        points, error = metric_range(
+            satellite["id"],
+            metric,
+            start,
+            end,
+            bucket_seconds=max(0, bucket) or None,
+        )
+        if error:
+            raise HTTPException(status_code=503, detail=error)
+        return JSONResponse(
+            {
+                "satellite": satellite["id"],
+                "metric": metric,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "bucket_seconds": max(0, bucket) or None,
+                "points": points,
+            }
+        )
+
     @app.get("/story/axiom", response_class=HTMLResponse)
     def story_axiom(request: Request):
         entries_dir = Path(__file__).parent.parent / "brand" / "Story" / "entries"
@@ -1037,7 +1086,7 @@ def build_app() -> FastAPI:
 
     @app.get("/satellites/bavaria-holiday-orbit", response_class=HTMLResponse)
     def bavaria_holiday_orbit_public(request: Request):
-        snapshot, snapshot_error = ensure_bavaria_snapshot()
+        snapshot, snapshot_error = cached_bavaria_snapshot()
         data_entries = snapshot.get("data", []) if snapshot else []
         snapshot_json = (
             json.dumps(snapshot, indent=2, ensure_ascii=True) if snapshot else ""
@@ -1066,7 +1115,7 @@ def build_app() -> FastAPI:
 
     @app.get("/satellites/bavaria-holiday-orbit/latest")
     def bavaria_holiday_orbit_latest():
-        snapshot, _, snapshot_error = fetch_bavaria_snapshot()
+        snapshot, snapshot_error = cached_bavaria_snapshot()
         if snapshot_error and not snapshot:
             raise HTTPException(status_code=503, detail=snapshot_error)
         return JSONResponse(snapshot or {})
@@ -100,8 +100,13 @@ def _digest_token(subscriber_id: str) -> str | None:
     ).hexdigest()
 
 
-def build_unsubscribe_url(subscriber_id: str, base_url: str) -> str | None:
-    token = _digest_token(subscriber_id)
+def build_unsubscribe_url(
+    subscriber_id: str, base_url: str, *, token: str | None = None
+) -> str | None:
+    # Digest runs pass a token from _digest_tokens, which signs a whole chunk
+    # with one keyed HMAC.
+    if token is None:
+        token = _digest_token(subscriber_id)
     if not token:
         return None
     return f"{base_url}/satellites/bavaria-holiday-orbit/unsubscribe?id={subscriber_id}&sig={token}"
@@ -151,6 +156,12 @@ def _ensure_schema(conn: Any) -> None:
         );
         """
     )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_sparky_holiday_deliveries_sub
+        ON sparky_holiday_deliveries (subscriber_id, status);
+        """
+    )
 
 
 def create_checkout_session(email: str, success_url: str, cancel_url: str) -> Tuple[str | None, str | None]:
@@ -287,42 +298,147 @@ def _next_month(target_date: date) -> date:
     return date(year, month, 1)
 
 
-def _send_email(to_email: str, subject: str, body: str) -> Tuple[bool, str | None]:
-    settings = _smtp_settings()
-    if not settings["host"] or not settings["sender"]:
-        return False, "SMTP not configured"
+def _digest_chunk_size() -> int:
+    raw = os.getenv("SPARKY_HOLIDAY_DIGEST_CHUNK", "200").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return 200
+    return max(1, value)
+
+
+def _digest_tokens(subscriber_ids: List[str]) -> Dict[str, str]:
+    secret = _digest_secret()
+    if not secret:
+        return {}
+    keyed = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+    tokens: Dict[str, str] = {}
+    for subscriber_id in subscriber_ids:
+        mac = keyed.copy()
+        mac.update(subscriber_id.encode("utf-8"))
+        tokens[subscriber_id] = mac.hexdigest()
+    return tokens
+
+
+def _render_digest_body(
+    holidays: List[Dict[str, Any]],
+    month_label: str,
+    year_label: int,
+) -> str:
+    body_lines = [
+        f"Holidays for {month_label} {year_label} (CZ + Bavaria)",
+        "",
+    ]
+    if holidays:
+        for entry in holidays:
+            marker = " (overlap)" if entry.get("overlap") else ""
+            body_lines.append(
+                f"- {entry.get('date')} · {entry.get('local_name') or entry.get('name')}"
+                f" · {entry.get('country')}{marker}"
+            )
+    else:
+        body_lines.append("No holidays found for this month.")
+    return "\n".join(body_lines)
+
+
+def _build_message(sender: str, to_email: str, subject: str, body: str) -> EmailMessage:
     message = EmailMessage()
-    message["From"] = settings["sender"]
+    message["From"] = sender
     message["To"] = to_email
     message["Subject"] = subject
     message.set_content(body)
+    return message
+
+
+def _send_batch(messages: List[Tuple[str, str, str]]) -> List[Tuple[bool, str | None]]:
+    settings = _smtp_settings()
+    if not settings["host"] or not settings["sender"]:
+        return [(False, "SMTP not configured")] * len(messages)
+    results: List[Tuple[bool, str | None]] = []
     try:
         with smtplib.SMTP(settings["host"], settings["port"], timeout=12) as server:
             if settings["tls"]:
                 server.starttls()
             if settings["user"] and settings["password"]:
                 server.login(settings["user"], settings["password"])
-            server.send_message(message)
-        return True, None
+            for to_email, subject, body in messages:
+                message = _build_message(settings["sender"], to_email, subject, body)
+                try:
+                    server.send_message(message)
+                    results.append((True, None))
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except Exception as exc:
+                    results.append((False, str(exc)))
     except Exception as exc:
-        return False, str(exc)
+        detail = str(exc)
+        results.extend([(False, detail)] * (len(messages) - len(results)))
+    return results
 
 
-def _record_delivery(
+def _record_deliveries(
     conn: Any,
-    subscriber_id: str,
-    status: str,
-    detail: str | None,
-    payload: Dict[str, Any],
+    rows: List[Tuple[str, str, str | None, Dict[str, Any]]],
 ) -> None:
-    conn.execute(
-        """
-        INSERT INTO sparky_holiday_deliveries (
-            id, subscriber_id, status, detail, payload, sent_at
-        ) VALUES (%s, %s, %s, %s, %s::jsonb, now());
-        """,
-        (str(uuid.uuid4()), subscriber_id, status, detail, json.dumps(payload)),
-    )
+    if not rows:
+        return
+    with conn.cursor() as cur:
+        cur.executemany(
+            """
+            INSERT INTO sparky_holiday_deliveries (
+                id, subscriber_id, status, detail, payload, sent_at
+            ) VALUES (%s, %s, %s, %s, %s::jsonb, now());
+            """,
+            [
+                (str(uuid.uuid4()), subscriber_id, status, detail, json.dumps(payload))
+                for subscriber_id, status, detail, payload in rows
+            ],
+        )
+
+
+def _deliver_chunk(
+    conn: Any,
+    chunk: List[Tuple[Any, str]],
+    *,
+    subject: str,
+    body: str,
+    base_url: str,
+    target_prefix: str,
+) -> Tuple[int, int]:
+    ids = [str(subscriber_id) for subscriber_id, _ in chunk]
+    tokens = _digest_tokens(ids) if base_url else {}
+    messages: List[Tuple[str, str, str]] = []
+    for subscriber_id, email in chunk:
+        token = tokens.get(str(subscriber_id))
+        personalized = body
+        if token:
+            unsubscribe_url = build_unsubscribe_url(str(subscriber_id), base_url, token=token)
+            personalized = f"{body}\n\nUnsubscribe: {unsubscribe_url}"
+        messages.append((email, subject, personalized))
+
+    outcomes = _send_batch(messages)
+    sent_ids: List[str] = []
+    deliveries: List[Tuple[str, str, str | None, Dict[str, Any]]] = []
+    payload = {"month": target_prefix}
+    for subscriber_id, (ok, detail) in zip(ids, outcomes):
+        if ok:
+            sent_ids.append(subscriber_id)
+            deliveries.append((subscriber_id, "sent", None, payload))
+        else:
+            deliveries.append((subscriber_id, "failed", detail, payload))
+
+    with conn.transaction():
+        if sent_ids:
+            conn.execute(
+                """
+                UPDATE sparky_holiday_subscribers
+                SET last_sent_at = now()
+                WHERE id = ANY(%s::uuid[]);
+                """,
+                (sent_ids,),
+            )
+        _record_deliveries(conn, deliveries)
+    return len(sent_ids), len(ids) - len(sent_ids)
 
 
 def run_holiday_digest() -> Dict[str, int]:
@@ -339,6 +455,7 @@ def run_holiday_digest() -> Dict[str, int]:
         return results
 
     next_month_date = _next_month(date.today())
+    following_month_date = _next_month(next_month_date)
     month_label = month_name[next_month_date.month]
     year_label = next_month_date.year
     target_prefix = f"{year_label}-{next_month_date.month:02d}-"
@@ -350,71 +467,55 @@ def run_holiday_digest() -> Dict[str, int]:
         if str(entry.get("date", "")).startswith(target_prefix):
             holidays.append(entry)
 
-    with psycopg.connect(_dsn(), autocommit=True) as conn:
-        _ensure_schema(conn)
-        subscribers = conn.execute(
-            """
-            SELECT id, email, last_sent_at
-            FROM sparky_holiday_subscribers
-            WHERE status = 'active';
-            """
-        ).fetchall()
-
-        for subscriber_id, email, last_sent_at in subscribers:
-            if last_sent_at and last_sent_at.year == year_label and last_sent_at.month == next_month_date.month:
-                continue
-            results["checked"] += 1
-
-            body_lines = [
-                f"Holidays for {month_label} {year_label} (CZ + Bavaria)",
-                "",
-            ]
-            if holidays:
-                for entry in holidays:
-                    marker = " (overlap)" if entry.get("overlap") else ""
-                    body_lines.append(
-                        f"- {entry.get('date')} · {entry.get('local_name') or entry.get('name')}"
-                        f" · {entry.get('country')}{marker}"
-                    )
-            else:
-                body_lines.append("No holidays found for this month.")
-
-            base_url = os.getenv("SPARKY_PUBLIC_BASE_URL", "").strip().rstrip("/")
-            unsubscribe_url = build_unsubscribe_url(str(subscriber_id), base_url) if base_url else None
-            if unsubscribe_url:
-                body_lines.extend(["", f"Unsubscribe: {unsubscribe_url}"])
-
-            ok, detail = _send_email(
-                email,
-                f"Sparky holidays · {month_label} {year_label}",
-                "\n".join(body_lines),
+    subject = f"Sparky holidays · {month_label} {year_label}"
+    body = _render_digest_body(holidays, month_label, year_label)
+    base_url = os.getenv("SPARKY_PUBLIC_BASE_URL", "").strip().rstrip("/")
+    chunk_size = _digest_chunk_size()
+
+    # Recipients who already have a "sent" delivery for this month are
+    # filtered server-side, so a crashed run resumes where it stopped.
+    with psycopg.connect(_dsn(), autocommit=True) as read_conn, psycopg.connect(
+        _dsn(), autocommit=True
+    ) as write_conn:
+        _ensure_schema(write_conn)
+        with read_conn.cursor(name="sparky_holiday_digest", withhold=True) as cur:
+            cur.itersize = chunk_size
+            cur.execute(
+                """
+                SELECT s.id, s.email
+                FROM sparky_holiday_subscribers s
+                WHERE s.status = 'active'
+                  AND (
+                    s.last_sent_at IS NULL
+                    OR s.last_sent_at < %s
+                    OR s.last_sent_at >= %s
+                  )
+                  AND NOT EXISTS (
+                    SELECT 1
+                    FROM sparky_holiday_deliveries d
+                    WHERE d.subscriber_id = s.id
+                      AND d.status = 'sent'
+                      AND d.payload->>'month' = %s
+                  )
+                ORDER BY s.id;
+                """,
+                (next_month_date, following_month_date, target_prefix),
             )
-            if ok:
-                results["sent"] += 1
-                conn.execute(
-                    """
-                    UPDATE sparky_holiday_subscribers
-                    SET last_sent_at = now()
-                    WHERE id = %s;
-                    """,
-                    (subscriber_id,),
-                )
-                _record_delivery(
-                    conn,
-                    str(subscriber_id),
-                    "sent",
-                    None,
-                    {"month": target_prefix},
-                )
-            else:
-                results["failed"] += 1
-                _record_delivery(
-                    conn,
-                    str(subscriber_id),
-                    "failed",
-                    detail,
-                    {"month": target_prefix},
+            while True:
+                chunk = cur.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                results["checked"] += len(chunk)
+                sent, failed = _deliver_chunk(
+                    write_conn,
+                    chunk,
+                    subject=subject,
+                    body=body,
+                    base_url=base_url,
+                    target_prefix=target_prefix,
                 )
+                results["sent"] += sent
+                results["failed"] += failed
 
     return results
 
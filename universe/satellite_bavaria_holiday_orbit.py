@@ -1,16 +1,17 @@
 from __future__ import annotations
 
-import json
 import os
-import time
 from datetime import date, datetime, timezone
 from typing import Any, Dict, Iterable, List, Tuple
-from urllib.request import Request, urlopen
 
-try:  # Optional if running without DB yet.
-    import psycopg
-except Exception:  # pragma: no cover
-    psycopg = None
+from universe.satellite_http import combined_hash, fetch_many
+from universe.satellites.orbit import (
+    ensure_latest_snapshot as ensure_orbit_snapshot,
+    fetch_latest_snapshot as orbit_latest,
+    latest_snapshot as cached_latest,
+    register_orbit,
+    run_orbit,
+)
 
 
 SATELLITE_ID = "sparky-bavaria-holiday-orbit"
@@ -22,55 +23,7 @@ COUNTRY_DE = "DE"
 REGION_BAVARIA = "DE-BY"
 
 DEFAULT_API_URL = "https://date.nager.at/api/v3/PublicHolidays/{year}/{country}"
-
-_SCHEMA_READY = False
-_LAST_RUN: Dict[str, Any] = {"ts": 0.0, "ok": None, "detail": ""}
-
-
-def _dsn() -> str | None:
-    return (
-        os.getenv("SPARKY_SATELLITE_DB_DSN")
-        or os.getenv("SPARKY_ADMIN_DB_DSN")
-        or os.getenv("SPARKY_DB_DSN")
-        or os.getenv("DATABASE_URL")
-    )
-
-
-def _db_available() -> bool:
-    return bool(_dsn()) and psycopg is not None
-
-
-def _ensure_schema(conn: Any) -> None:
-    global _SCHEMA_READY
-    if _SCHEMA_READY:
-        return
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS sparky_satellite_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            satellite TEXT NOT NULL,
-            source TEXT NOT NULL,
-            period TEXT NOT NULL,
-            collected_at TIMESTAMPTZ NOT NULL,
-            payload JSONB NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
-        );
-        """
-    )
-    conn.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_sparky_satellite_latest
-        ON sparky_satellite_snapshots (satellite, collected_at DESC);
-        """
-    )
-    _SCHEMA_READY = True
-
-
-def _fetch_json(url: str, timeout: int = 12) -> Any:
-    req = Request(url, headers={"User-Agent": "SparkyHolidayOrbit/1.0"})
-    with urlopen(req, timeout=timeout) as resp:
-        charset = resp.headers.get_content_charset() or "utf-8"
-        return json.loads(resp.read().decode(charset, errors="replace"))
+USER_AGENT = "SparkyHolidayOrbit/1.0"
 
 
 def _build_url(year: int, country: str) -> str:
@@ -114,20 +67,6 @@ def _entries_for_country(payload: List[Dict[str, Any]], country: str) -> List[Di
     return entries
 
 
-def _fetch_holidays(year: int) -> Tuple[List[Dict[str, Any]], str | None]:
-    try:
-        cz_payload = _fetch_json(_build_url(year, COUNTRY_CZ))
-        de_payload = _fetch_json(_build_url(year, COUNTRY_DE))
-    except Exception as exc:
-        return [], f"Holiday fetch failed: {exc}"
-    if not isinstance(cz_payload, list) or not isinstance(de_payload, list):
-        return [], "Holiday response format is invalid."
-
-    entries = _entries_for_country(cz_payload, COUNTRY_CZ)
-    entries.extend(_entries_for_country(de_payload, COUNTRY_DE))
-    return entries, None
-
-
 def _mark_overlap(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     entries_list = list(entries)
     cz_dates = {entry.get("date") for entry in entries_list if entry.get("country") == COUNTRY_CZ}
@@ -138,18 +77,31 @@ def _mark_overlap(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return entries_list
 
 
-def build_bavaria_holiday_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+def _collect_snapshot() -> Tuple[Dict[str, Any] | None, str | None, str | None]:
     today = date.today()
     years = [today.year, today.year + 1]
+    requests = [
+        (year, country) for year in years for country in (COUNTRY_CZ, COUNTRY_DE)
+    ]
+    fetched = fetch_many(
+        [_build_url(year, country) for year, country in requests],
+        user_agent=USER_AGENT,
+    )
+
     all_entries: List[Dict[str, Any]] = []
-    for year in years:
-        entries, error = _fetch_holidays(year)
-        if error:
-            return None, error
-        all_entries.extend(entries)
+    for (_, country), (result, error) in zip(requests, fetched):
+        if error or result is None:
+            return None, None, f"Holiday fetch failed: {error}"
+        try:
+            payload = result.json()
+        except ValueError as exc:
+            return None, None, f"Holiday fetch failed: {exc}"
+        if not isinstance(payload, list):
+            return None, None, "Holiday response format is invalid."
+        all_entries.extend(_entries_for_country(payload, country))
 
     if not all_entries:
-        return None, "No holiday data returned."
+        return None, None, "No holiday data returned."
 
     deduped: Dict[str, Dict[str, Any]] = {}
     for entry in all_entries:
@@ -169,93 +121,37 @@ def build_bavaria_holiday_snapshot() -> Tuple[Dict[str, Any] | None, str | None]
             "years": years,
         },
     }
-    return payload, None
-
-
-def store_snapshot(payload: Dict[str, Any]) -> None:
-    dsn = _dsn()
-    if not dsn or psycopg is None:
-        raise RuntimeError("DB not configured")
-    with psycopg.connect(dsn, autocommit=True) as conn:
-        _ensure_schema(conn)
-        conn.execute(
-            """
-            INSERT INTO sparky_satellite_snapshots (
-                satellite, source, period, collected_at, payload
-            ) VALUES (%s, %s, %s, now(), %s::jsonb);
-            """,
-            (
-                payload.get("satellite"),
-                payload.get("source"),
-                payload.get("period"),
-                json.dumps(payload),
-            ),
-        )
+    content_hash = combined_hash(result for result, _ in fetched if result)
+    return payload, content_hash, None
 
 
-def run_bavaria_holiday_orbit() -> Tuple[Dict[str, Any] | None, str | None]:
-    if not _db_available():
-        detail = "DB not configured"
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": detail})
-        return None, detail
+def build_bavaria_holiday_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+    payload, _, error = _collect_snapshot()
+    return payload, error
+
 
-    payload, error = build_bavaria_holiday_snapshot()
-    if error:
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": error})
-        return None, error
+ORBIT = register_orbit(
+    SATELLITE_ID,
+    source=SOURCE,
+    period=PERIOD,
+    build=_collect_snapshot,
+    interval_seconds=7 * 24 * 60 * 60,
+)
 
-    try:
-        store_snapshot(payload)
-    except Exception as exc:
-        detail = f"DB write failed: {exc}"
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": detail})
-        return None, detail
 
-    _LAST_RUN.update({"ts": time.time(), "ok": True, "detail": "Snapshot stored"})
-    return payload, None
+def run_bavaria_holiday_orbit() -> Tuple[Dict[str, Any] | None, str | None]:
+    return run_orbit(SATELLITE_ID)
 
 
 def fetch_latest_snapshot() -> Tuple[Dict[str, Any] | None, datetime | None, str | None]:
-    dsn = _dsn()
-    if not dsn or psycopg is None:
-        return None, None, "DB not configured"
-    try:
-        with psycopg.connect(dsn, autocommit=True) as conn:
-            _ensure_schema(conn)
-            row = conn.execute(
-                """
-                SELECT payload, collected_at
-                FROM sparky_satellite_snapshots
-                WHERE satellite = %s
-                ORDER BY collected_at DESC
-                LIMIT 1;
-                """,
-                (SATELLITE_ID,),
-            ).fetchone()
-        if not row:
-            return None, None, "No snapshots stored yet."
-        payload = row[0]
-        collected_at = row[1]
-        if isinstance(payload, str):
-            payload = json.loads(payload)
-        return payload, collected_at, None
-    except Exception as exc:
-        return None, None, f"DB read failed: {exc}"
+    return orbit_latest(SATELLITE_ID)
+
+
+def cached_latest_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+    return cached_latest(SATELLITE_ID)
 
 
 def ensure_latest_snapshot(
     max_age_days: int = 7,
 ) -> Tuple[Dict[str, Any] | None, str | None]:
-    payload, collected_at, error = fetch_latest_snapshot()
-    if payload and collected_at:
-        now = datetime.now(timezone.utc)
-        age_days = (now - collected_at).days
-        if age_days <= max_age_days:
-            return payload, None
-
-    refresh_payload, refresh_error = run_bavaria_holiday_orbit()
-    if refresh_payload:
-        return refresh_payload, None
-    if payload:
-        return payload, refresh_error
-    return None, refresh_error or error
+    return ensure_orbit_snapshot(SATELLITE_ID, max_age_days * 24 * 60 * 60)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+
+STALE_RECHECK_SECONDS = 60
+
+Loader = Callable[[], Tuple[Dict[str, Any] | None, datetime | None, str | None]]
+Refresher = Callable[[], Tuple[Dict[str, Any] | None, str | None]]
+
+_ENTRIES: Dict[str, Dict[str, Any]] = {}
+_LOCKS: Dict[str, threading.Lock] = {}
+_GUARD = threading.Lock()
+
+
+def _lock_for(satellite_id: str) -> threading.Lock:
+    with _GUARD:
+        lock = _LOCKS.get(satellite_id)
+        if lock is None:
+            lock = threading.Lock()
+            _LOCKS[satellite_id] = lock
+        return lock
+
+
+def _put(
+    satellite_id: str,
+    payload: Dict[str, Any] | None,
+    expires_at: float,
+    error: str | None = None,
+    *,
+    unchecked: bool = False,
+) -> None:
+    with _GUARD:
+        _ENTRIES[satellite_id] = {
+            "payload": payload,
+            "error": error,
+            "expires_at": expires_at,
+            "unchecked": unchecked,
+        }
+
+
+def invalidate(satellite_id: str) -> None:
+    with _GUARD:
+        _ENTRIES.pop(satellite_id, None)
+
+
+def _fresh_entry(
+    satellite_id: str, now: float, refreshing: bool = False
+) -> Dict[str, Any] | None:
+    with _GUARD:
+        entry = _ENTRIES.get(satellite_id)
+    if not entry or now >= entry["expires_at"]:
+        return None
+    # A stale snapshot parked by a read-only caller must not hold back a
+    # caller that is allowed to refresh it.
+    if refreshing and entry["unchecked"]:
+        return None
+    return entry
+
+
+def _reload(
+    satellite_id: str,
+    loader: Loader,
+    max_age_seconds: int,
+    refresh: Refresher | None,
+) -> Tuple[Dict[str, Any] | None, str | None]:
+    now = time.time()
+    entry = _fresh_entry(satellite_id, now, refresh is not None)
+    if entry:
+        return entry["payload"], entry["error"]
+
+    payload, collected_at, error = loader()
+    if payload is not None and collected_at is not None:
+        expires_at = collected_at.timestamp() + max_age_seconds
+        if expires_at > now:
+            _put(satellite_id, payload, expires_at)
+            return payload, None
+
+    if refresh is None:
+        _put(satellite_id, payload, now + STALE_RECHECK_SECONDS, error, unchecked=True)
+        return payload, error
+
+    refresh_payload, refresh_error = refresh()
+    now = time.time()
+    if refresh_payload:
+        _put(satellite_id, refresh_payload, now + max_age_seconds)
+        return refresh_payload, None
+    if payload:
+        _put(satellite_id, payload, now + STALE_RECHECK_SECONDS, refresh_error)
+        return payload, refresh_error
+    detail = refresh_error or error
+    _put(satellite_id, None, now + STALE_RECHECK_SECONDS, detail)
+    return None, detail
+
+
+def cached_snapshot(
+    satellite_id: str,
+    *,
+    loader: Loader,
+    max_age_seconds: int,
+    refresh: Refresher | None = None,
+) -> Tuple[Dict[str, Any] | None, str | None]:
+    entry = _fresh_entry(satellite_id, time.time(), refresh is not None)
+    if entry:
+        return entry["payload"], entry["error"]
+
+    with _GUARD:
+        stale = _ENTRIES.get(satellite_id)
+    lock = _lock_for(satellite_id)
+    if stale is not None and stale["payload"] is not None:
+        # Single flight: one caller refreshes, the rest keep serving the
+        # stale snapshot instead of queueing behind the upstream fetch.
+        if not lock.acquire(blocking=False):
+            return stale["payload"], stale["error"]
+    else:
+        lock.acquire()
+    try:
+        return _reload(satellite_id, loader, max_age_seconds, refresh)
+    finally:
+        lock.release()
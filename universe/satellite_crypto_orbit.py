@@ -1,17 +1,18 @@
 from __future__ import annotations
 
-import json
 import os
-import time
 from datetime import datetime, timezone
 from typing import Any, Dict, Tuple
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
-try:  # Optional if running without DB yet.
-    import psycopg
-except Exception:  # pragma: no cover
-    psycopg = None
+from universe.satellite_http import fetch
+from universe.satellites.orbit import (
+    ensure_latest_snapshot as ensure_orbit_snapshot,
+    fetch_latest_snapshot as orbit_latest,
+    latest_snapshot as cached_latest,
+    register_orbit,
+    run_orbit,
+)
 
 
 SATELLITE_ID = "sparky-crypto-orbit"
@@ -31,55 +32,7 @@ COIN_IDS = [
     "chainlink",
 ]
 DEFAULT_MARKET_URL = "https://api.coingecko.com/api/v3/coins/markets"
-
-_SCHEMA_READY = False
-_LAST_RUN: Dict[str, Any] = {"ts": 0.0, "ok": None, "detail": ""}
-
-
-def _dsn() -> str | None:
-    return (
-        os.getenv("SPARKY_SATELLITE_DB_DSN")
-        or os.getenv("SPARKY_ADMIN_DB_DSN")
-        or os.getenv("SPARKY_DB_DSN")
-        or os.getenv("DATABASE_URL")
-    )
-
-
-def _db_available() -> bool:
-    return bool(_dsn()) and psycopg is not None
-
-
-def _ensure_schema(conn: Any) -> None:
-    global _SCHEMA_READY
-    if _SCHEMA_READY:
-        return
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS sparky_satellite_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            satellite TEXT NOT NULL,
-            source TEXT NOT NULL,
-            period TEXT NOT NULL,
-            collected_at TIMESTAMPTZ NOT NULL,
-            payload JSONB NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
-        );
-        """
-    )
-    conn.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_sparky_satellite_latest
-        ON sparky_satellite_snapshots (satellite, collected_at DESC);
-        """
-    )
-    _SCHEMA_READY = True
-
-
-def _fetch_json(url: str, timeout: int = 12) -> Any:
-    req = Request(url, headers={"User-Agent": "SparkyCryptoOrbit/1.0"})
-    with urlopen(req, timeout=timeout) as resp:
-        charset = resp.headers.get_content_charset() or "utf-8"
-        return json.loads(resp.read().decode(charset, errors="replace"))
+USER_AGENT = "SparkyCryptoOrbit/1.0"
 
 
 def _build_market_url() -> str:
@@ -103,18 +56,19 @@ def _collected_at() -> str:
     )
 
 
-def build_crypto_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+def _collect_snapshot() -> Tuple[Dict[str, Any] | None, str | None, str | None]:
     url = os.getenv("SPARKY_COINGECKO_URL", "").strip() or _build_market_url()
     if not url:
-        return None, "CoinGecko URL is not configured."
+        return None, None, "CoinGecko URL is not configured."
 
     try:
-        payload = _fetch_json(url)
+        result = fetch(url, user_agent=USER_AGENT)
+        payload = result.json()
     except Exception as exc:
-        return None, f"CoinGecko fetch failed: {exc}"
+        return None, None, f"CoinGecko fetch failed: {exc}"
 
     if not isinstance(payload, list):
-        return None, "CoinGecko response format is invalid."
+        return None, None, "CoinGecko response format is invalid."
 
     data: list[Dict[str, Any]] = []
     for item in payload:
@@ -139,7 +93,7 @@ def build_crypto_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
         )
 
     if not data:
-        return None, "No crypto data returned from CoinGecko."
+        return None, None, "No crypto data returned from CoinGecko."
 
     snapshot = {
         "satellite": SATELLITE_ID,
@@ -149,96 +103,38 @@ def build_crypto_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
         "currency": VS_CURRENCY,
         "data": data,
     }
-    return snapshot, None
-
-
-def store_snapshot(payload: Dict[str, Any]) -> None:
-    dsn = _dsn()
-    if not dsn or psycopg is None:
-        raise RuntimeError("DB not configured")
-    with psycopg.connect(dsn, autocommit=True) as conn:
-        _ensure_schema(conn)
-        conn.execute(
-            """
-            INSERT INTO sparky_satellite_snapshots (
-                satellite, source, period, collected_at, payload
-            ) VALUES (%s, %s, %s, now(), %s::jsonb);
-            """,
-            (
-                payload.get("satellite"),
-                payload.get("source"),
-                payload.get("period"),
-                json.dumps(payload),
-            ),
-        )
+    return snapshot, result.content_hash, None
 
 
-def run_crypto_orbit() -> Tuple[Dict[str, Any] | None, str | None]:
-    if not _db_available():
-        detail = "DB not configured"
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": detail})
-        return None, detail
+def build_crypto_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+    snapshot, _, error = _collect_snapshot()
+    return snapshot, error
 
-    payload, error = build_crypto_orbit_snapshot()
-    if error:
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": error})
-        return None, error
 
-    try:
-        store_snapshot(payload)
-    except Exception as exc:
-        detail = f"DB write failed: {exc}"
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": detail})
-        return None, detail
+ORBIT = register_orbit(
+    SATELLITE_ID,
+    source=SOURCE,
+    period=PERIOD,
+    build=_collect_snapshot,
+)
 
-    _LAST_RUN.update({"ts": time.time(), "ok": True, "detail": "Snapshot stored"})
-    return payload, None
+
+def run_crypto_orbit() -> Tuple[Dict[str, Any] | None, str | None]:
+    return run_orbit(SATELLITE_ID)
 
 
 def fetch_latest_snapshot() -> Tuple[Dict[str, Any] | None, datetime | None, str | None]:
-    dsn = _dsn()
-    if not dsn or psycopg is None:
-        return None, None, "DB not configured"
-    try:
-        with psycopg.connect(dsn, autocommit=True) as conn:
-            _ensure_schema(conn)
-            row = conn.execute(
-                """
-                SELECT payload, collected_at
-                FROM sparky_satellite_snapshots
-                WHERE satellite = %s
-                ORDER BY collected_at DESC
-                LIMIT 1;
-                """,
-                (SATELLITE_ID,),
-            ).fetchone()
-        if not row:
-            return None, None, "No snapshots stored yet."
-        payload = row[0]
-        collected_at = row[1]
-        if isinstance(payload, str):
-            payload = json.loads(payload)
-        return payload, collected_at, None
-    except Exception as exc:
-        return None, None, f"DB read failed: {exc}"
+    return orbit_latest(SATELLITE_ID)
+
+
+def latest_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+    return cached_latest(SATELLITE_ID)
 
 
 def ensure_latest_snapshot(
     max_age_seconds: int = 3600,
 ) -> Tuple[Dict[str, Any] | None, str | None]:
-    payload, collected_at, error = fetch_latest_snapshot()
-    if payload and collected_at:
-        now = datetime.now(timezone.utc)
-        age = (now - collected_at).total_seconds()
-        if age <= max_age_seconds:
-            return payload, None
-
-    refresh_payload, refresh_error = run_crypto_orbit()
-    if refresh_payload:
-        return refresh_payload, None
-    if payload:
-        return payload, refresh_error
-    return None, refresh_error or error
+    return ensure_orbit_snapshot(SATELLITE_ID, max_age_seconds)
 
 
 def refresh_token_valid(token: str | None) -> bool:
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import re
-import time
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
 from typing import Any, Dict, Iterable, Tuple
-from urllib.request import Request, urlopen
 
-try:  # Optional if running without DB yet.
-    import psycopg
-except Exception:  # pragma: no cover
-    psycopg = None
+from universe.satellite_http import fetch_many
+from universe.satellites.orbit import (
+    fetch_latest_snapshot as orbit_latest,
+    last_run,
+    latest_snapshot as cached_latest,
+    register_orbit,
+    run_orbit,
+)
 
 
 SATELLITE_ID = "sparky-finance-orbit-cz"
@@ -23,59 +26,11 @@ DEFAULT_EXCHANGE_URL = (
     "https://www.cnb.cz/en/financial_markets/foreign_exchange_market/"
     "exchange_rate_fixing/daily.txt"
 )
-
-_SCHEMA_READY = False
-_LAST_RUN: Dict[str, Any] = {"ts": 0.0, "ok": None, "detail": ""}
+USER_AGENT = "SparkyFinanceOrbit/1.0"
 
 DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
 
 
-def _dsn() -> str | None:
-    return (
-        os.getenv("SPARKY_SATELLITE_DB_DSN")
-        or os.getenv("SPARKY_ADMIN_DB_DSN")
-        or os.getenv("SPARKY_DB_DSN")
-        or os.getenv("DATABASE_URL")
-    )
-
-
-def _db_available() -> bool:
-    return bool(_dsn()) and psycopg is not None
-
-
-def _ensure_schema(conn: Any) -> None:
-    global _SCHEMA_READY
-    if _SCHEMA_READY:
-        return
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS sparky_satellite_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            satellite TEXT NOT NULL,
-            source TEXT NOT NULL,
-            period TEXT NOT NULL,
-            collected_at TIMESTAMPTZ NOT NULL,
-            payload JSONB NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
-        );
-        """
-    )
-    conn.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_sparky_satellite_latest
-        ON sparky_satellite_snapshots (satellite, collected_at DESC);
-        """
-    )
-    _SCHEMA_READY = True
-
-
-def _fetch_text(url: str, timeout: int = 12) -> str:
-    req = Request(url, headers={"User-Agent": "SparkyFinanceOrbit/1.0"})
-    with urlopen(req, timeout=timeout) as resp:
-        charset = resp.headers.get_content_charset() or "utf-8"
-        return resp.read().decode(charset, errors="replace")
-
-
 def _parse_decimal(value: str) -> Decimal | None:
     raw = value.strip().replace(" ", "")
     if not raw:
@@ -222,15 +177,14 @@ def _parse_repo_rate_csv(raw: str) -> Tuple[Decimal, str | None, str | None] | N
     return rate_dec, valid_from, valid_to
 
 
-def _fetch_repo_rate() -> Tuple[Decimal, str | None, str | None] | None:
-    url = os.getenv("SPARKY_CNB_REPO_URL", "").strip()
-    if url:
-        raw = _fetch_text(url)
-        parsed = _parse_repo_rate_json(raw) or _parse_repo_rate_csv(raw)
-        if parsed:
-            return parsed
-        raise ValueError("Unable to parse repo rate response.")
+def _parse_repo_rate(raw: str) -> Tuple[Decimal, str | None, str | None]:
+    parsed = _parse_repo_rate_json(raw) or _parse_repo_rate_csv(raw)
+    if parsed:
+        return parsed
+    raise ValueError("Unable to parse repo rate response.")
+
 
+def _repo_rate_from_env() -> Tuple[Decimal, str | None, str | None] | None:
     rate = os.getenv("SPARKY_CNB_REPO_RATE", "").strip()
     valid_from = os.getenv("SPARKY_CNB_REPO_VALID_FROM", "").strip()
     valid_to = os.getenv("SPARKY_CNB_REPO_VALID_TO", "").strip()
@@ -240,27 +194,36 @@ def _fetch_repo_rate() -> Tuple[Decimal, str | None, str | None] | None:
     return rate_dec, _parse_iso_date(valid_from), _parse_iso_date(valid_to)
 
 
-def build_finance_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+def _collect_snapshot() -> Tuple[Dict[str, Any] | None, str | None, str | None]:
     exchange_url = os.getenv("SPARKY_CNB_EXCHANGE_URL", DEFAULT_EXCHANGE_URL).strip()
     if not exchange_url:
-        return None, "CNB exchange rate URL is not configured."
+        return None, None, "CNB exchange rate URL is not configured."
 
-    try:
-        exchange_raw = _fetch_text(exchange_url)
-    except Exception as exc:
-        return None, f"Exchange rates fetch failed: {exc}"
+    repo_url = os.getenv("SPARKY_CNB_REPO_URL", "").strip()
+    urls = [exchange_url, repo_url] if repo_url else [exchange_url]
+    fetched = fetch_many(urls, user_agent=USER_AGENT)
 
-    rates, rate_date, error = _parse_daily_rates(exchange_raw)
+    exchange_result, exchange_error = fetched[0]
+    if exchange_error or exchange_result is None:
+        return None, None, f"Exchange rates fetch failed: {exchange_error}"
+
+    rates, rate_date, error = _parse_daily_rates(exchange_result.text())
     if error:
-        return None, error
+        return None, None, error
 
     try:
-        repo_data = _fetch_repo_rate()
+        if repo_url:
+            repo_result, repo_error = fetched[1]
+            if repo_error or repo_result is None:
+                raise RuntimeError(repo_error)
+            repo_data = _parse_repo_rate(repo_result.text())
+        else:
+            repo_data = _repo_rate_from_env()
     except Exception as exc:
-        return None, f"Repo rate fetch failed: {exc}"
+        return None, None, f"Repo rate fetch failed: {exc}"
 
     if not repo_data:
-        return None, "Repo rate is not configured."
+        return None, None, "Repo rate is not configured."
 
     repo_rate, valid_from, valid_to = repo_data
 
@@ -298,78 +261,39 @@ def build_finance_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
         "period": PERIOD,
         "data": data,
     }
-    return payload, None
-
-
-def store_snapshot(payload: Dict[str, Any]) -> None:
-    dsn = _dsn()
-    if not dsn or psycopg is None:
-        raise RuntimeError("DB not configured")
-    with psycopg.connect(dsn, autocommit=True) as conn:
-        _ensure_schema(conn)
-        conn.execute(
-            """
-            INSERT INTO sparky_satellite_snapshots (
-                satellite, source, period, collected_at, payload
-            ) VALUES (%s, %s, %s, now(), %s::jsonb);
-            """,
-            (
-                payload.get("satellite"),
-                payload.get("source"),
-                payload.get("period"),
-                json.dumps(payload),
-            ),
-        )
+    # The repo rate may come from env instead of a URL, so hash the parsed
+    # data rather than the raw responses.
+    content_hash = hashlib.sha256(
+        json.dumps(data, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return payload, content_hash, None
 
 
-def run_finance_orbit() -> Tuple[Dict[str, Any] | None, str | None]:
-    if not _db_available():
-        detail = "DB not configured"
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": detail})
-        return None, detail
+def build_finance_orbit_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+    payload, _, error = _collect_snapshot()
+    return payload, error
 
-    payload, error = build_finance_orbit_snapshot()
-    if error:
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": error})
-        return None, error
 
-    try:
-        store_snapshot(payload)
-    except Exception as exc:
-        detail = f"DB write failed: {exc}"
-        _LAST_RUN.update({"ts": time.time(), "ok": False, "detail": detail})
-        return None, detail
+ORBIT = register_orbit(
+    SATELLITE_ID,
+    source=SOURCE,
+    period=PERIOD,
+    build=_collect_snapshot,
+)
+
 
-    _LAST_RUN.update({"ts": time.time(), "ok": True, "detail": "Snapshot stored"})
-    return payload, None
+def run_finance_orbit() -> Tuple[Dict[str, Any] | None, str | None]:
+    return run_orbit(SATELLITE_ID)
 
 
 def fetch_latest_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
-    dsn = _dsn()
-    if not dsn or psycopg is None:
-        return None, "DB not configured"
-    try:
-        with psycopg.connect(dsn, autocommit=True) as conn:
-            _ensure_schema(conn)
-            row = conn.execute(
-                """
-                SELECT payload
-                FROM sparky_satellite_snapshots
-                WHERE satellite = %s
-                ORDER BY collected_at DESC
-                LIMIT 1;
-                """,
-                (SATELLITE_ID,),
-            ).fetchone()
-        if not row:
-            return None, "No snapshots stored yet."
-        payload = row[0]
-        if isinstance(payload, str):
-            return json.loads(payload), None
-        return payload, None
-    except Exception as exc:
-        return None, f"DB read failed: {exc}"
+    payload, _, error = orbit_latest(SATELLITE_ID)
+    return payload, error
+
+
+def cached_latest_snapshot() -> Tuple[Dict[str, Any] | None, str | None]:
+    return cached_latest(SATELLITE_ID)
 
 
 def last_finance_orbit_run() -> Dict[str, Any]:
-    return dict(_LAST_RUN)
+    return last_run(SATELLITE_ID)
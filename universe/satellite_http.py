@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urljoin, urlsplit
+
+try:  # Optional if running without DB yet.
+    import psycopg
+except Exception:  # pragma: no cover
+    psycopg = None
+
+
+DEFAULT_TIMEOUT = 12
+MAX_REDIRECTS = 3
+REDIRECT_STATUS = {301, 302, 303, 307, 308}
+
+_LOCAL = threading.local()
+_CACHE: Dict[str, Dict[str, Any]] = {}
+_CACHE_LOCK = threading.Lock()
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+_SCHEMA_READY = False
+
+
+class SatelliteHttpError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    url: str
+    status: int
+    body: bytes
+    charset: str
+    content_hash: str
+    changed: bool
+
+    def text(self) -> str:
+        return self.body.decode(self.charset, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text())
+
+
+def _dsn() -> str | None:
+    return (
+        os.getenv("SPARKY_SATELLITE_DB_DSN")
+        or os.getenv("SPARKY_ADMIN_DB_DSN")
+        or os.getenv("SPARKY_DB_DSN")
+        or os.getenv("DATABASE_URL")
+    )
+
+
+def _db_available() -> bool:
+    return bool(_dsn()) and psycopg is not None
+
+
+def _concurrency() -> int:
+    raw = os.getenv("SPARKY_SATELLITE_HTTP_CONCURRENCY", "4").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return 4
+    return max(1, value)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=_concurrency(),
+                thread_name_prefix="sparky-satellite-http",
+            )
+        return _EXECUTOR
+
+
+def _ensure_schema(conn: Any) -> None:
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sparky_satellite_http_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT NOT NULL,
+            charset TEXT NOT NULL,
+            body BYTEA NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    _SCHEMA_READY = True
+
+
+def _load_validator(url: str) -> Dict[str, Any] | None:
+    with _CACHE_LOCK:
+        cached = _CACHE.get(url)
+    if cached is not None or not _db_available():
+        return cached
+    try:
+        with psycopg.connect(_dsn(), autocommit=True) as conn:
+            _ensure_schema(conn)
+            row = conn.execute(
+                """
+                SELECT etag, last_modified, content_hash, charset, body
+                FROM sparky_satellite_http_cache
+                WHERE url = %s;
+                """,
+                (url,),
+            ).fetchone()
+    except Exception:
+        return None
+    if not row:
+        return None
+    cached = {
+        "etag": row[0],
+        "last_modified": row[1],
+        "content_hash": row[2],
+        "charset": row[3],
+        "body": bytes(row[4]),
+    }
+    with _CACHE_LOCK:
+        _CACHE[url] = cached
+    return cached
+
+
+def _store_validator(url: str, entry: Dict[str, Any]) -> None:
+    with _CACHE_LOCK:
+        _CACHE[url] = entry
+    if not _db_available():
+        return
+    try:
+        with psycopg.connect(_dsn(), autocommit=True) as conn:
+            _ensure_schema(conn)
+            conn.execute(
+                """
+                INSERT INTO sparky_satellite_http_cache (
+                    url, etag, last_modified, content_hash, charset, body, updated_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, now())
+                ON CONFLICT (url) DO UPDATE SET
+                    etag = EXCLUDED.etag,
+                    last_modified = EXCLUDED.last_modified,
+                    content_hash = EXCLUDED.content_hash,
+                    charset = EXCLUDED.charset,
+                    body = EXCLUDED.body,
+                    updated_at = now();
+                """,
+                (
+                    url,
+                    entry.get("etag"),
+                    entry.get("last_modified"),
+                    entry["content_hash"],
+                    entry["charset"],
+                    entry["body"],
+                ),
+            )
+    except Exception:
+        return
+
+
+def _connection(scheme: str, netloc: str, timeout: int) -> http.client.HTTPConnection:
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = {}
+        _LOCAL.connections = connections
+    key = (scheme, netloc)
+    conn = connections.get(key)
+    if conn is None:
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=timeout)
+        connections[key] = conn
+    return conn
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    connections = getattr(_LOCAL, "connections", None) or {}
+    conn = connections.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _request(
+    url: str,
+    headers: Dict[str, str],
+    timeout: int,
+) -> Tuple[int, http.client.HTTPMessage, bytes]:
+    parts = urlsplit(url)
+    if parts.scheme not in {"http", "https"}:
+        raise SatelliteHttpError(f"Unsupported URL scheme: {parts.scheme or url}")
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    # A pooled keep-alive connection may have been closed by the server
+    # between runs; retry once on a fresh socket before giving up.
+    for attempt in range(2):
+        conn = _connection(parts.scheme, parts.netloc, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.RemoteDisconnected, ConnectionError, BrokenPipeError):
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt:
+                raise
+            continue
+        except Exception:
+            _drop_connection(parts.scheme, parts.netloc)
+            raise
+        if resp.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        return resp.status, resp.msg, body
+    raise SatelliteHttpError(f"Request failed: {url}")
+
+
+def fetch(url: str, *, user_agent: str, timeout: int = DEFAULT_TIMEOUT) -> FetchResult:
+    cached = _load_validator(url)
+    headers = {
+        "User-Agent": user_agent,
+        "Accept-Encoding": "gzip",
+        "Connection": "keep-alive",
+    }
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    target = url
+    for _ in range(MAX_REDIRECTS + 1):
+        status, resp_headers, body = _request(target, headers, timeout)
+        location = resp_headers.get("Location")
+        if status in REDIRECT_STATUS and location:
+            target = urljoin(target, location)
+            continue
+        break
+    else:
+        raise SatelliteHttpError(f"Too many redirects: {url}")
+
+    if status == 304 and cached:
+        return FetchResult(
+            url=url,
+            status=status,
+            body=cached["body"],
+            charset=cached["charset"],
+            content_hash=cached["content_hash"],
+            changed=False,
+        )
+    if status >= 400:
+        raise SatelliteHttpError(f"HTTP Error {status}")
+
+    if (resp_headers.get("Content-Encoding") or "").lower() == "gzip":
+        body = gzip.decompress(body)
+    charset = resp_headers.get_content_charset() or "utf-8"
+    content_hash = hashlib.sha256(body).hexdigest()
+    changed = not cached or cached.get("content_hash") != content_hash
+    _store_validator(
+        url,
+        {
+            "etag": resp_headers.get("ETag"),
+            "last_modified": resp_headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "charset": charset,
+            "body": body,
+        },
+    )
+    return FetchResult(
+        url=url,
+        status=status,
+        body=body,
+        charset=charset,
+        content_hash=content_hash,
+        changed=changed,
+    )
+
+
+def fetch_many(
+    urls: Iterable[str],
+    *,
+    user_agent: str,
+    timeout: int = DEFAULT_TIMEOUT,
+) -> List[Tuple[FetchResult | None, str | None]]:
+    url_list = list(urls)
+    if len(url_list) == 1:
+        futures = None
+    else:
+        executor = _executor()
+        futures = [
+            executor.submit(fetch, url, user_agent=user_agent, timeout=timeout)
+            for url in url_list
+        ]
+
+    results: List[Tuple[FetchResult | None, str | None]] = []
+    for index, url in enumerate(url_list):
+        try:
+            if futures is None:
+                result = fetch(url, user_agent=user_agent, timeout=timeout)
+            else:
+                result = futures[index].result()
+        except Exception as exc:
+            results.append((None, str(exc)))
+            continue
+        results.append((result, None))
+    return results
+
+
+def combined_hash(results: Iterable[FetchResult]) -> str:
+    digest = hashlib.sha256()
+    for result in results:
+        digest.update(result.url.encode("utf-8"))
+        digest.update(result.content_hash.encode("ascii"))
+    return digest.hexdigest()
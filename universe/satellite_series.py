@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+try:  # Optional if running without DB yet.
+    import psycopg
+except Exception:  # pragma: no cover
+    psycopg = None
+
+
+NUMERIC_FIELDS = ("price", "market_cap", "volume_24h", "change_24h_pct")
+MAX_POINTS = 5000
+
+_SCHEMA_READY = False
+
+
+def _dsn() -> str | None:
+    return (
+        os.getenv("SPARKY_SATELLITE_DB_DSN")
+        or os.getenv("SPARKY_ADMIN_DB_DSN")
+        or os.getenv("SPARKY_DB_DSN")
+        or os.getenv("DATABASE_URL")
+    )
+
+
+def _db_available() -> bool:
+    return bool(_dsn()) and psycopg is not None
+
+
+def ensure_schema(conn: Any) -> None:
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sparky_satellite_metrics (
+            satellite TEXT NOT NULL,
+            metric_key TEXT NOT NULL,
+            ts TIMESTAMPTZ NOT NULL,
+            value DOUBLE PRECISION NOT NULL
+        );
+        """
+    )
+    # Covering index: range scans are index-only and cost O(points returned).
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_sparky_satellite_metrics_range
+        ON sparky_satellite_metrics (satellite, metric_key, ts) INCLUDE (value);
+        """
+    )
+    _SCHEMA_READY = True
+
+
+def _as_float(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_metrics(payload: Dict[str, Any]) -> List[Tuple[str, float]]:
+    metrics: List[Tuple[str, float]] = []
+    for entry in payload.get("data", []):
+        if not isinstance(entry, dict):
+            continue
+        key = str(entry.get("key") or "").strip()
+        if not key:
+            continue
+        value = _as_float(entry.get("value"))
+        if value is not None:
+            metrics.append((key, value))
+        for field in NUMERIC_FIELDS:
+            field_value = _as_float(entry.get(field))
+            if field_value is not None:
+                metrics.append((f"{key}.{field}", field_value))
+    return metrics
+
+
+def write_metrics(conn: Any, satellite: str, ts: datetime, payload: Dict[str, Any]) -> int:
+    rows = [
+        (satellite, metric_key, ts, value)
+        for metric_key, value in extract_metrics(payload)
+    ]
+    if not rows:
+        return 0
+    ensure_schema(conn)
+    with conn.cursor() as cur:
+        cur.executemany(
+            """
+            INSERT INTO sparky_satellite_metrics (satellite, metric_key, ts, value)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (satellite, metric_key, ts) DO NOTHING;
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+def metric_range(
+    satellite: str,
+    metric_key: str,
+    start: datetime,
+    end: datetime,
+    *,
+    bucket_seconds: int | None = None,
+) -> Tuple[List[Dict[str, Any]], str | None]:
+    if not _db_available():
+        return [], "DB not configured"
+    try:
+        with psycopg.connect(_dsn(), autocommit=True) as conn:
+            ensure_schema(conn)
+            if bucket_seconds:
+                rows = conn.execute(
+                    """
+                    SELECT
+                        to_timestamp(
+                            floor(extract(epoch FROM ts) / %s) * %s
+                        ) AS bucket,
+                        min(value), max(value), avg(value), count(*),
+                        (array_agg(value ORDER BY ts))[1],
+                        (array_agg(value ORDER BY ts DESC))[1]
+                    FROM sparky_satellite_metrics
+                    WHERE satellite = %s AND metric_key = %s
+                      AND ts >= %s AND ts < %s
+                    GROUP BY bucket
+                    ORDER BY bucket
+                    LIMIT %s;
+                    """,
+                    (
+                        bucket_seconds,
+                        bucket_seconds,
+                        satellite,
+                        metric_key,
+                        start,
+                        end,
+                        MAX_POINTS,
+                    ),
+                ).fetchall()
+                points = [
+                    {
+                        "ts": row[0].isoformat(),
+                        "min": row[1],
+                        "max": row[2],
+                        "avg": row[3],
+                        "count": row[4],
+                        "open": row[5],
+                        "close": row[6],
+                    }
+                    for row in rows
+                ]
+            else:
+                rows = conn.execute(
+                    """
+                    SELECT ts, value
+                    FROM sparky_satellite_metrics
+                    WHERE satellite = %s AND metric_key = %s
+                      AND ts >= %s AND ts < %s
+                    ORDER BY ts
+                    LIMIT %s;
+                    """,
+                    (satellite, metric_key, start, end, MAX_POINTS),
+                ).fetchall()
+                points = [{"ts": row[0].isoformat(), "value": row[1]} for row in rows]
+    except Exception as exc:
+        return [], f"DB read failed: {exc}"
+
+    previous: float | None = None
+    for point in points:
+        current = point.get("close", point.get("value"))
+        point["change_pct"] = None
+        if previous:
+            point["change_pct"] = round((current - previous) / previous * 100, 6)
+        previous = current
+    return points, None
+
+
+def backfill_metrics(satellite: str, batch_size: int = 500) -> int:
+    if not _db_available():
+        return 0
+    written = 0
+    with psycopg.connect(_dsn(), autocommit=True) as read_conn, psycopg.connect(
+        _dsn(), autocommit=True
+    ) as write_conn:
+        ensure_schema(write_conn)
+        with read_conn.cursor(name="sparky_satellite_backfill", withhold=True) as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                """
+                SELECT collected_at, payload
+                FROM sparky_satellite_snapshots
+                WHERE satellite = %s
+                ORDER BY collected_at;
+                """,
+                (satellite,),
+            )
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                with write_conn.transaction():
+                    for collected_at, payload in batch:
+                        if isinstance(payload, str):
+                            payload = json.loads(payload)
+                        written += write_metrics(write_conn, satellite, collected_at, payload)
+    return written
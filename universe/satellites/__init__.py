@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import logging
+from importlib import import_module
 from typing import Dict, List
 
+logger = logging.getLogger(__name__)
+
 
 _SATELLITES: List[Dict[str, str]] = [
     {
         "id": "sparky-finance-orbit-cz",
+        "module": "universe.satellite_finance_orbit",
         "slug": "finance-orbit",
         "title": "Sparky Finance Orbit · CZ Core",
         "description": "Daily exchange rates and the CNB repo rate in a clean JSON snapshot.",
@@ -15,6 +20,7 @@ _SATELLITES: List[Dict[str, str]] = [
     },
     {
         "id": "sparky-crypto-orbit",
+        "module": "universe.satellite_crypto_orbit",
         "slug": "crypto-orbit",
         "title": "Sparky Crypto Orbit · Top 10",
         "description": "Hourly crypto market snapshot for the top 10 coins in USD.",
@@ -24,6 +30,7 @@ _SATELLITES: List[Dict[str, str]] = [
     },
     {
         "id": "sparky-bavaria-holiday-orbit",
+        "module": "universe.satellite_bavaria_holiday_orbit",
         "slug": "bavaria-holiday-orbit",
         "title": "Sparky Bavaria State Holiday Orbit · CZ + BY",
         "description": "Public holiday calendar for Czechia and Bavaria (Germany), combined.",
@@ -36,3 +43,18 @@ _SATELLITES: List[Dict[str, str]] = [
 
 def list_satellites() -> List[Dict[str, str]]:
     return list(_SATELLITES)
+
+
+def load_orbits() -> List[str]:
+    loaded: List[str] = []
+    for satellite in _SATELLITES:
+        module_path = satellite.get("module")
+        if not module_path:
+            continue
+        try:
+            import_module(module_path)
+        except Exception:
+            logger.exception("Failed to load orbit %s (%s)", satellite.get("id"), module_path)
+            continue
+        loaded.append(satellite["id"])
+    return loaded
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from universe.satellite_cache import cached_snapshot, invalidate
+from universe.satellite_series import write_metrics
+
+try:  # Optional if running without DB yet.
+    import psycopg
+except Exception:  # pragma: no cover
+    psycopg = None
+
+
+PERIOD_SECONDS = {
+    "hourly": 60 * 60,
+    "daily": 24 * 60 * 60,
+    "weekly": 7 * 24 * 60 * 60,
+    "yearly": 365 * 24 * 60 * 60,
+}
+
+Builder = Callable[[], Tuple[Dict[str, Any] | None, str | None, str | None]]
+
+
+@dataclass(frozen=True)
+class Orbit:
+    satellite_id: str
+    source: str
+    period: str
+    build: Builder
+    interval_seconds: int
+    max_age_seconds: int
+
+
+_ORBITS: Dict[str, Orbit] = {}
+_LAST_RUN: Dict[str, Dict[str, Any]] = {}
+_SCHEMA_READY = False
+
+
+def register_orbit(
+    satellite_id: str,
+    *,
+    source: str,
+    period: str,
+    build: Builder,
+    interval_seconds: int | None = None,
+    max_age_seconds: int | None = None,
+) -> Orbit:
+    period_seconds = PERIOD_SECONDS.get(period, PERIOD_SECONDS["daily"])
+    orbit = Orbit(
+        satellite_id=satellite_id,
+        source=source,
+        period=period,
+        build=build,
+        interval_seconds=interval_seconds or period_seconds,
+        max_age_seconds=max_age_seconds or interval_seconds or period_seconds,
+    )
+    _ORBITS[satellite_id] = orbit
+    return orbit
+
+
+def get_orbit(satellite_id: str) -> Orbit | None:
+    return _ORBITS.get(satellite_id)
+
+
+def registered_orbits() -> List[Orbit]:
+    return list(_ORBITS.values())
+
+
+def _dsn() -> str | None:
+    return (
+        os.getenv("SPARKY_SATELLITE_DB_DSN")
+        or os.getenv("SPARKY_ADMIN_DB_DSN")
+        or os.getenv("SPARKY_DB_DSN")
+        or os.getenv("DATABASE_URL")
+    )
+
+
+def db_available() -> bool:
+    return bool(_dsn()) and psycopg is not None
+
+
+def _ensure_schema(conn: Any) -> None:
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sparky_satellite_snapshots (
+            id BIGSERIAL PRIMARY KEY,
+            satellite TEXT NOT NULL,
+            source TEXT NOT NULL,
+            period TEXT NOT NULL,
+            collected_at TIMESTAMPTZ NOT NULL,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_sparky_satellite_latest
+        ON sparky_satellite_snapshots (satellite, collected_at DESC);
+        """
+    )
+    conn.execute(
+        """
+        ALTER TABLE sparky_satellite_snapshots
+        ADD COLUMN IF NOT EXISTS content_hash TEXT;
+        """
+    )
+    _SCHEMA_READY = True
+
+
+def store_snapshot(payload: Dict[str, Any], content_hash: str | None = None) -> bool:
+    dsn = _dsn()
+    if not dsn or psycopg is None:
+        raise RuntimeError("DB not configured")
+    satellite_id = str(payload.get("satellite") or "")
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        _ensure_schema(conn)
+        if content_hash:
+            latest = conn.execute(
+                """
+                SELECT id, content_hash
+                FROM sparky_satellite_snapshots
+                WHERE satellite = %s
+                ORDER BY collected_at DESC
+                LIMIT 1;
+                """,
+                (satellite_id,),
+            ).fetchone()
+            if latest and latest[1] == content_hash:
+                conn.execute(
+                    """
+                    UPDATE sparky_satellite_snapshots
+                    SET collected_at = now()
+                    WHERE id = %s;
+                    """,
+                    (latest[0],),
+                )
+                invalidate(satellite_id)
+                return False
+        with conn.transaction():
+            row = conn.execute(
+                """
+                INSERT INTO sparky_satellite_snapshots (
+                    satellite, source, period, collected_at, payload, content_hash
+                ) VALUES (%s, %s, %s, now(), %s::jsonb, %s)
+                RETURNING collected_at;
+                """,
+                (
+                    satellite_id,
+                    payload.get("source"),
+                    payload.get("period"),
+                    json.dumps(payload),
+                    content_hash,
+                ),
+            ).fetchone()
+            write_metrics(conn, satellite_id, row[0], payload)
+    invalidate(satellite_id)
+    return True
+
+
+def fetch_latest_snapshot(
+    satellite_id: str,
+) -> Tuple[Dict[str, Any] | None, datetime | None, str | None]:
+    dsn = _dsn()
+    if not dsn or psycopg is None:
+        return None, None, "DB not configured"
+    try:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            _ensure_schema(conn)
+            row = conn.execute(
+                """
+                SELECT payload, collected_at
+                FROM sparky_satellite_snapshots
+                WHERE satellite = %s
+                ORDER BY collected_at DESC
+                LIMIT 1;
+                """,
+                (satellite_id,),
+            ).fetchone()
+        if not row:
+            return None, None, "No snapshots stored yet."
+        payload = row[0]
+        collected_at = row[1]
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        return payload, collected_at, None
+    except Exception as exc:
+        return None, None, f"DB read failed: {exc}"
+
+
+def _record_run(satellite_id: str, ok: bool, detail: str) -> None:
+    _LAST_RUN[satellite_id] = {"ts": time.time(), "ok": ok, "detail": detail}
+
+
+def last_run(satellite_id: str) -> Dict[str, Any]:
+    return dict(_LAST_RUN.get(satellite_id) or {"ts": 0.0, "ok": None, "detail": ""})
+
+
+def run_orbit(satellite_id: str) -> Tuple[Dict[str, Any] | None, str | None]:
+    orbit = _ORBITS.get(satellite_id)
+    if orbit is None:
+        return None, f"Unknown satellite: {satellite_id}"
+    if not db_available():
+        detail = "DB not configured"
+        _record_run(satellite_id, False, detail)
+        return None, detail
+
+    payload, content_hash, error = orbit.build()
+    if error or payload is None:
+        detail = error or "Snapshot build failed"
+        _record_run(satellite_id, False, detail)
+        return None, detail
+
+    try:
+        stored = store_snapshot(payload, content_hash)
+    except Exception as exc:
+        detail = f"DB write failed: {exc}"
+        _record_run(satellite_id, False, detail)
+        return None, detail
+
+    _record_run(satellite_id, True, "Snapshot stored" if stored else "Upstream unchanged")
+    return payload, None
+
+
+def latest_snapshot(
+    satellite_id: str,
+    max_age_seconds: int | None = None,
+) -> Tuple[Dict[str, Any] | None, str | None]:
+    orbit = _ORBITS.get(satellite_id)
+    if max_age_seconds is None:
+        max_age_seconds = orbit.max_age_seconds if orbit else PERIOD_SECONDS["daily"]
+    return cached_snapshot(
+        satellite_id,
+        loader=lambda: fetch_latest_snapshot(satellite_id),
+        max_age_seconds=max_age_seconds,
+    )
+
+
+def ensure_latest_snapshot(
+    satellite_id: str,
+    max_age_seconds: int | None = None,
+) -> Tuple[Dict[str, Any] | None, str | None]:
+    orbit = _ORBITS.get(satellite_id)
+    if orbit is None:
+        return latest_snapshot(satellite_id, max_age_seconds)
+    return cached_snapshot(
+        satellite_id,
+        loader=lambda: fetch_latest_snapshot(satellite_id),
+        max_age_seconds=max_age_seconds or orbit.max_age_seconds,
+        refresh=lambda: run_orbit(satellite_id),
+    )
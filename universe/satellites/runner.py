@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from universe.satellites import load_orbits
+from universe.satellites.orbit import (
+    Orbit,
+    fetch_latest_snapshot,
+    last_run,
+    registered_orbits,
+    run_orbit,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60 * 60
+JITTER_RATIO = 0.1
+STARTUP_SPREAD_SECONDS = 5
+
+_METRICS: Dict[str, Dict[str, Any]] = {}
+
+
+def _flag(name: str, default: str = "off") -> bool:
+    value = os.getenv(name, default).strip().lower()
+    return value in {"1", "true", "yes", "on"}
+
+
+def runner_enabled() -> bool:
+    return _flag("SPARKY_SATELLITE_RUNNER")
+
+
+def _metrics_for(satellite_id: str) -> Dict[str, Any]:
+    return _METRICS.setdefault(
+        satellite_id,
+        {
+            "runs": 0,
+            "failures": 0,
+            "consecutive_failures": 0,
+            "last_duration_ms": None,
+            "last_ok": None,
+            "last_detail": "",
+            "next_run_at": None,
+        },
+    )
+
+
+def orbit_status() -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for orbit in registered_orbits():
+        rows.append(
+            {
+                "id": orbit.satellite_id,
+                "period": orbit.period,
+                "interval_seconds": orbit.interval_seconds,
+                "last_run": last_run(orbit.satellite_id),
+                **dict(_metrics_for(orbit.satellite_id)),
+            }
+        )
+    return rows
+
+
+def _jitter(seconds: float) -> float:
+    return seconds * (1 + random.uniform(-JITTER_RATIO, JITTER_RATIO))
+
+
+def _backoff(orbit: Orbit, failures: int) -> float:
+    delay = BASE_BACKOFF_SECONDS * (2 ** max(0, failures - 1))
+    return min(delay, MAX_BACKOFF_SECONDS, orbit.interval_seconds)
+
+
+def _initial_delay(orbit: Orbit) -> float:
+    _, collected_at, _ = fetch_latest_snapshot(orbit.satellite_id)
+    spread = random.uniform(0, STARTUP_SPREAD_SECONDS)
+    if collected_at is None:
+        return spread
+    age = time.time() - collected_at.timestamp()
+    return max(0.0, orbit.interval_seconds - age) + spread
+
+
+async def run_orbit_once(orbit: Orbit) -> bool:
+    metrics = _metrics_for(orbit.satellite_id)
+    start = time.perf_counter()
+    try:
+        payload, error = await asyncio.to_thread(run_orbit, orbit.satellite_id)
+    except Exception as exc:
+        logger.exception("Orbit %s crashed.", orbit.satellite_id)
+        payload, error = None, str(exc)
+    ok = payload is not None
+    metrics["runs"] += 1
+    metrics["last_duration_ms"] = int((time.perf_counter() - start) * 1000)
+    metrics["last_ok"] = ok
+    metrics["last_detail"] = last_run(orbit.satellite_id).get("detail") or error or ""
+    if ok:
+        metrics["consecutive_failures"] = 0
+    else:
+        metrics["failures"] += 1
+        metrics["consecutive_failures"] += 1
+        logger.warning("Orbit %s failed: %s", orbit.satellite_id, error)
+    return ok
+
+
+async def _orbit_loop(orbit: Orbit, stop: asyncio.Event) -> None:
+    metrics = _metrics_for(orbit.satellite_id)
+    delay = await asyncio.to_thread(_initial_delay, orbit)
+    while True:
+        metrics["next_run_at"] = time.time() + delay
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+            return
+        except asyncio.TimeoutError:
+            pass
+        if await run_orbit_once(orbit):
+            delay = _jitter(orbit.interval_seconds)
+        else:
+            delay = _jitter(_backoff(orbit, metrics["consecutive_failures"]))
+
+
+async def run_all_once() -> Dict[str, bool]:
+    load_orbits()
+    orbits = registered_orbits()
+    results = await asyncio.gather(*(run_orbit_once(orbit) for orbit in orbits))
+    return {orbit.satellite_id: ok for orbit, ok in zip(orbits, results)}
+
+
+class OrbitRunner:
+    def __init__(self) -> None:
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        load_orbits()
+        for orbit in registered_orbits():
+            self._tasks.append(
+                asyncio.create_task(
+                    _orbit_loop(orbit, self._stop),
+                    name=f"orbit:{orbit.satellite_id}",
+                )
+            )
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_forever(self) -> None:
+        self.start()
+        await asyncio.gather(*self._tasks, return_exceptions=True)